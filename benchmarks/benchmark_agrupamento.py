@@ -0,0 +1,114 @@
+# -----------------------------------------------------------------------------
+# Micro-benchmark do agrupamento das seções dos editais (função
+# "agrupar_secoes" do arquivo extrator.py). Compara o agrupamento atual, que
+# entrega cada Secao/Subsecao sem copiá-la, com a implementação anterior, que
+# fazia um deepcopy de cada seção e de cada subseção, e verifica se os
+# resultados são idênticos. Mede o tempo por documento e o pico de memória.
+#
+# Uso (na raiz do projeto): python -m benchmarks.benchmark_agrupamento [pasta com PDFs] [repetições]
+# -----------------------------------------------------------------------------
+
+import os
+import sys
+import json
+import time
+import copy
+import tracemalloc
+import src.utils.pdf as pdf
+import src.modulos.preproc.extrator as ext
+from src.classes.documentos import Secao, Subsecao
+
+
+def agrupar_secoes_com_copias(secoes_extraidas):
+    """
+    Implementação anterior do agrupamento (sem spans), mantida somente para comparação
+        :param secoes_extraidas: Seções que foram extraídas do documento
+        :return: Lista contendo as seções agrupadas
+    """
+    ultima_secao_lida = '0'
+
+    secao = None
+    secoes_agrupadas = []
+
+    for s in secoes_extraidas:
+        secao_atual = s[0].split('.')
+
+        if secao_atual[0] != ultima_secao_lida:
+            if ultima_secao_lida != '0':
+                secoes_agrupadas.append(copy.deepcopy(secao))
+
+            ultima_secao_lida = secao_atual[0]
+            secao = Secao(s[0] + ' ')
+            secao.titulo = s[3]
+            secao.inserir_pagina(s[1])
+        else:
+            subsecao = Subsecao(s[0] + ' ')
+            subsecao.descricao = s[3]
+            subsecao.pagina = s[1]
+            secao.inserir_subsecao(copy.deepcopy(subsecao))
+
+            if s[1] not in secao.paginas:
+                secao.inserir_pagina(s[1])
+
+    return secoes_agrupadas
+
+
+def medir(funcao, secoes_extraidas, repeticoes):
+    """
+    Mede o menor tempo de execução e o pico de memória de uma função de agrupamento
+        :param funcao: Função de agrupamento que será medida
+        :param secoes_extraidas: Seções extraídas do documento (com as descrições preenchidas)
+        :param repeticoes: Quantidade de vezes que a medição do tempo será repetida
+        :return: Menor tempo em segundos; pico de memória em bytes; seções agrupadas serializadas em JSON
+    """
+    melhor = None
+
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(secoes_extraidas)
+        tempo = time.perf_counter() - inicio
+
+        if melhor is None or tempo < melhor:
+            melhor = tempo
+
+    # O tracemalloc deixa a execução mais lenta, por isso a memória é medida numa execução separada
+    tracemalloc.start()
+    secoes_agrupadas = funcao(secoes_extraidas)
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return melhor, pico, json.dumps(secoes_agrupadas, default=lambda o: o.__mydict__)
+
+
+def main():
+    caminho = sys.argv[1] if len(sys.argv) > 1 else 'editais_testes'
+    repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    identicos = True
+
+    print(f"\n{'Documento':<20} {'Seções':>6} {'Com cópias':>11} {'Atual':>9} {'Pico com cópias':>16} {'Pico atual':>11}")
+
+    for nome in sorted(os.listdir(caminho)):
+        if not nome.lower().endswith('.pdf'):
+            continue
+
+        doc = pdf.ler_pdf(os.path.join(caminho, nome))[0]
+
+        if not doc:
+            continue
+
+        termos = ext.separar_em_termos(doc)
+        secoes_extraidas = ext.extrair_secoes(ext.encontrar_secoes_candidatas(termos))
+        ext.preencher_descricao(secoes_extraidas, termos)
+
+        tempo_anterior, pico_anterior, js_anterior = medir(agrupar_secoes_com_copias, secoes_extraidas, repeticoes)
+        tempo_atual, pico_atual, js_atual = medir(ext.agrupar_secoes, secoes_extraidas, repeticoes)
+        identicos = identicos and js_anterior == js_atual
+
+        print(f"{os.path.splitext(nome)[0]:<20} {len(secoes_extraidas):>6} {tempo_anterior * 1000:>8.2f} ms "
+              f"{tempo_atual * 1000:>6.2f} ms {pico_anterior / 1024:>13.0f} KB {pico_atual / 1024:>8.0f} KB")
+
+    print(f"\nResultados idênticos: {identicos}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# -----------------------------------------------------------------------------
+# Micro-benchmark da limpeza do texto extraído dos editais (filtragem de termos
+# e remoção de caracteres estranhos). Compara a limpeza atual (função
+# "limpar_documento" do arquivo pdf.py) com a implementação anterior, que
+# percorria as páginas caractere por caractere, e verifica se os resultados
+# são idênticos.
+#
+# Uso (na raiz do projeto): python -m benchmarks.benchmark_limpeza [pasta com PDFs] [repetições]
+# -----------------------------------------------------------------------------
+
+import os
+import sys
+import time
+import src.utils.pdf as pdf
+
+
+def limpar_documento_por_caractere(doc, filtro):
+    """
+    Implementação anterior da limpeza, mantida somente para comparação
+        :param doc: Dicionário com o documento que será limpo
+        :param filtro: Filtro que será aplicado no documento
+    """
+    for pag in doc.keys():
+        conteudo_filtrado = [c for c in doc[pag].split() if c not in filtro]
+        doc[pag] = ' '.join(conteudo_filtrado)
+
+    for pag in doc.keys():
+        doc[pag] = ''.join([str(c) for c in doc[pag] if c in pdf.CARACTERES_MANTER])
+
+
+def medir(funcao, documentos, filtro, repeticoes):
+    """
+    Mede o menor tempo de execução de uma função de limpeza sobre todos os documentos
+        :param funcao: Função de limpeza que será medida
+        :param documentos: Lista de dicionários com os documentos extraídos (sem limpeza)
+        :param filtro: Filtro que será aplicado nos documentos
+        :param repeticoes: Quantidade de vezes que a medição será repetida
+        :return: Menor tempo em segundos; documentos limpos
+    """
+    melhor = None
+    limpos = None
+
+    for _ in range(repeticoes):
+        copias = [dict(d) for d in documentos]
+
+        inicio = time.perf_counter()
+
+        for d in copias:
+            funcao(d, filtro)
+
+        tempo = time.perf_counter() - inicio
+
+        if melhor is None or tempo < melhor:
+            melhor = tempo
+
+        limpos = copias
+
+    return melhor, limpos
+
+
+def main():
+    caminho = sys.argv[1] if len(sys.argv) > 1 else 'editais_testes'
+    repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    filtro = ['-', '_']
+    documentos = []
+
+    for nome in sorted(os.listdir(caminho)):
+        if nome.lower().endswith('.pdf'):
+            caminho_arquivo = os.path.join(caminho, nome)
+
+            with open(caminho_arquivo, 'rb') as arq_pdf:
+                documentos.append(pdf.ler_pypdf2(arq_pdf, caminho_arquivo)[0])
+
+    qtd_paginas = sum(len(d) for d in documentos)
+    qtd_caracteres = sum(len(p) for d in documentos for p in d.values())
+
+    tempo_anterior, limpos_anterior = medir(limpar_documento_por_caractere, documentos, filtro, repeticoes)
+    tempo_atual, limpos_atual = medir(pdf.limpar_documento, documentos, filtro, repeticoes)
+
+    print(f"\nDocumentos: {len(documentos)} | Páginas: {qtd_paginas} | Caracteres: {qtd_caracteres}")
+    print(f"Limpeza caractere por caractere: {tempo_anterior * 1000:.1f} ms")
+    print(f"Limpeza atual..................: {tempo_atual * 1000:.1f} ms ({tempo_anterior / tempo_atual:.1f}x)")
+    print(f"Resultados idênticos...........: {limpos_anterior == limpos_atual}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+# -----------------------------------------------------------------------------
+# Benchmark do pré-processamento dos editais. Mede o tempo de cada etapa da
+# leitura (extração do texto com "ler_pdf" e separação das seções com as
+# funções do arquivo extrator.py), a quantidade de páginas por segundo e o pico
+# de memória de cada etapa. O resultado é gerado em JSON, para que possa ser
+# comparado entre versões do sistema.
+#
+# Os documentos podem ser ampliados sinteticamente (opção --fator): cada PDF é
+# copiado para um arquivo temporário com as páginas repetidas N vezes. Também
+# podem ser medidos editais sintéticos (opção --sinteticos), gerados pelo
+# arquivo gerador_editais.py. Com a opção --pasta '' somente os editais
+# sintéticos são medidos.
+#
+# Uso (na raiz do projeto):
+#   python -m benchmarks.benchmark_preproc [--pasta editais_testes] [--fator 1] [--repeticoes 3]
+#                                          [--processos 1] [--saida resultado.json] [--comparar anterior.json]
+#                                          [--sinteticos 0] [--paginas 30] [--profundidade 3]
+#                                          [--percentual-grudado 0.2] [--percentual-repeticao 0.2] [--sem-pdf]
+# -----------------------------------------------------------------------------
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import contextlib
+import subprocess
+import tracemalloc
+import PyPDF2
+import src.utils.pdf as pdf
+import src.modulos.preproc.extrator as ext
+import benchmarks.gerador_editais as ger_editais
+
+try:
+    # Não existe no Windows
+    import resource
+except ImportError:
+    resource = None
+
+
+# Etapas medidas, na ordem em que são executadas
+ETAPAS = ['ler_pdf', 'separar_em_termos', 'encontrar_secoes_candidatas', 'extrair_secoes', 'preencher_descricao',
+          'agrupar_secoes']
+
+
+def ampliar_pdf(caminho_arquivo, fator, pasta_destino):
+    """
+    Gera uma cópia ampliada de um arquivo PDF, com as páginas repetidas
+        :param caminho_arquivo: Caminho do arquivo PDF original
+        :param fator: Quantidade de vezes que as páginas serão repetidas
+        :param pasta_destino: Pasta onde a cópia será gravada
+        :return: Caminho da cópia ampliada
+    """
+    caminho_copia = os.path.join(pasta_destino, f"x{fator}_{os.path.basename(caminho_arquivo)}")
+
+    with open(caminho_arquivo, 'rb') as arq_pdf:
+        pdf_lido = PyPDF2.PdfFileReader(arq_pdf, strict=False)
+        pdf_gravado = PyPDF2.PdfFileWriter()
+
+        for _ in range(fator):
+            for i in range(pdf_lido.getNumPages()):
+                pdf_gravado.addPage(pdf_lido.getPage(i))
+
+        with open(caminho_copia, 'wb') as arq_copia:
+            pdf_gravado.write(arq_copia)
+
+    return caminho_copia
+
+
+def executar_etapas(ler_documento, medir_memoria=False):
+    """
+    Executa as etapas da leitura de um documento e mede cada uma delas
+        :param ler_documento: Função sem parâmetros que devolve o documento ({página: conteúdo}) e se foi validado
+        :param medir_memoria: Se True, mede o pico de memória de cada etapa (tracemalloc). Obs.: O tracemalloc deixa a
+                              execução bem mais lenta, por isso os tempos medidos junto com a memória são descartados
+        :return: Dicionário com o tempo (ou o pico de memória) de cada etapa; quantidade de páginas; se foi validado;
+        quantidade de seções extraídas
+    """
+    medidas = {}
+
+    def medir(etapa, funcao, *args):
+        if medir_memoria:
+            tracemalloc.reset_peak()
+            retorno = funcao(*args)
+            medidas[etapa] = tracemalloc.get_traced_memory()[1]
+        else:
+            inicio = time.perf_counter()
+            retorno = funcao(*args)
+            medidas[etapa] = time.perf_counter() - inicio
+
+        return retorno
+
+    doc, validado = medir('ler_pdf', ler_documento)
+    termos = medir('separar_em_termos', ext.separar_em_termos, doc)
+    sec_cand = medir('encontrar_secoes_candidatas', ext.encontrar_secoes_candidatas, termos)
+    sec_extraidas = medir('extrair_secoes', ext.extrair_secoes, sec_cand)
+    medir('preencher_descricao', ext.preencher_descricao, sec_extraidas, termos)
+    secoes_agrupadas = medir('agrupar_secoes', ext.agrupar_secoes, sec_extraidas)
+
+    return medidas, len(doc), validado, len(secoes_agrupadas)
+
+
+def medir_documento(nome, ler_documento, repeticoes):
+    """
+    Mede as etapas da leitura de um documento
+        :param nome: Nome do documento
+        :param ler_documento: Função sem parâmetros que devolve o documento ({página: conteúdo}) e se foi validado
+        :param repeticoes: Quantidade de vezes que a medição dos tempos será repetida. É guardado o menor tempo de cada
+                           etapa
+        :return: Dicionário com as medidas do documento
+    """
+    tempos = None
+    qtd_paginas = 0
+    validado = False
+    qtd_secoes = 0
+
+    for _ in range(repeticoes):
+        medidas, qtd_paginas, validado, qtd_secoes = executar_etapas(ler_documento)
+
+        if tempos is None:
+            tempos = medidas
+        else:
+            tempos = {e: min(tempos[e], medidas[e]) for e in ETAPAS}
+
+    tracemalloc.start()
+    memoria, _, _, _ = executar_etapas(ler_documento, True)
+    tracemalloc.stop()
+
+    tempo_total = sum(tempos.values())
+
+    return {'nome': nome,
+            'paginas': qtd_paginas,
+            'validado': validado,
+            'secoes': qtd_secoes,
+            'tempo_total_s': tempo_total,
+            'paginas_por_segundo': qtd_paginas / tempo_total if tempo_total > 0 else None,
+            'tempo_etapas_s': tempos,
+            'pico_memoria_etapas_bytes': memoria}
+
+
+def obter_versao():
+    """
+    Obtém o commit atual do repositório, para identificar a versão medida
+        :return: Hash do commit ou None se não for possível obtê-lo
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def totalizar(documentos):
+    """
+    Totaliza as medidas de todos os documentos
+        :param documentos: Lista com as medidas de cada documento (função "medir_documento")
+        :return: Dicionário com as medidas totais
+    """
+    qtd_paginas = sum(d['paginas'] for d in documentos)
+    tempo_etapas = {e: sum(d['tempo_etapas_s'][e] for d in documentos) for e in ETAPAS}
+    tempo_total = sum(tempo_etapas.values())
+
+    return {'documentos': len(documentos),
+            'paginas': qtd_paginas,
+            'tempo_total_s': tempo_total,
+            'paginas_por_segundo': qtd_paginas / tempo_total if tempo_total > 0 else None,
+            'tempo_etapas_s': tempo_etapas,
+            'paginas_por_segundo_etapas': {e: qtd_paginas / t if t > 0 else None for e, t in tempo_etapas.items()},
+            'pico_memoria_etapas_bytes': {e: max(d['pico_memoria_etapas_bytes'][e] for d in documentos)
+                                          for e in ETAPAS}}
+
+
+def comparar(atual, anterior):
+    """
+    Imprime a comparação dos tempos totais de cada etapa com um resultado anterior
+        :param atual: Resultado atual do benchmark
+        :param anterior: Resultado anterior do benchmark (lido do JSON)
+    """
+    print(f"\nComparação com a versão {anterior.get('versao')} (tempo anterior / tempo atual):", file=sys.stderr)
+
+    if anterior.get('parametros') != atual['parametros']:
+        print(f"  *> Atenção: Os parâmetros são diferentes! Anterior: {anterior.get('parametros')}", file=sys.stderr)
+
+    for e in ETAPAS + ['total']:
+        if e == 'total':
+            t_atual = atual['total']['tempo_total_s']
+            t_anterior = anterior['total']['tempo_total_s']
+        else:
+            t_atual = atual['total']['tempo_etapas_s'][e]
+            t_anterior = anterior['total']['tempo_etapas_s'].get(e)
+
+        if t_anterior is None or t_atual == 0:
+            continue
+
+        print(f"  {e:.<30}: {t_anterior * 1000:10.1f} ms -> {t_atual * 1000:10.1f} ms ({t_anterior / t_atual:.2f}x)",
+              file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do pré-processamento dos editais')
+    parser.add_argument('--pasta', default='editais_testes', help='Pasta com os arquivos PDF')
+    parser.add_argument('--fator', type=int, default=1, help='Quantidade de vezes que as páginas de cada PDF são '
+                                                             'repetidas para ampliar os documentos')
+    parser.add_argument('--repeticoes', type=int, default=3, help='Repetições da medição dos tempos (guarda o menor)')
+    parser.add_argument('--processos', type=int, default=1, help='Processos utilizados na extração das páginas')
+    parser.add_argument('--saida', help='Arquivo JSON onde o resultado será gravado (padrão: saída padrão)')
+    parser.add_argument('--comparar', help='Arquivo JSON com um resultado anterior para comparação')
+    parser.add_argument('--sinteticos', type=int, default=0, help='Quantidade de editais sintéticos medidos')
+    parser.add_argument('--paginas', type=int, default=30, help='Quantidade de páginas dos editais sintéticos')
+    parser.add_argument('--profundidade', type=int, default=3, help='Níveis das seções dos editais sintéticos')
+    parser.add_argument('--percentual-grudado', type=float, default=0.2,
+                        help='Probabilidade da numeração de uma seção estar grudada no texto nos editais sintéticos')
+    parser.add_argument('--percentual-repeticao', type=float, default=0.2,
+                        help='Probabilidade de uma sentença ser uma cláusula padrão repetida nos editais sintéticos')
+    parser.add_argument('--sem-pdf', action='store_true',
+                        help='Os editais sintéticos não são gravados em PDF. Nesse caso a etapa ler_pdf não é medida')
+    args = parser.parse_args()
+
+    if args.fator < 1 or args.repeticoes < 1 or args.processos < 1:
+        parser.error("'--fator', '--repeticoes' e '--processos' têm que ser maiores ou iguais a 1")
+
+    arquivos = []
+    documentos = []
+
+    if args.pasta:
+        arquivos = [os.path.join(args.pasta, a) for a in sorted(os.listdir(args.pasta)) if a.lower().endswith('.pdf')]
+
+    parametros_sinteticos = {'paginas': args.paginas, 'profundidade': args.profundidade,
+                             'percentual_grudado': args.percentual_grudado,
+                             'percentual_repeticao': args.percentual_repeticao}
+
+    with tempfile.TemporaryDirectory() as pasta_temporaria:
+        if args.sinteticos > 0 and not args.sem_pdf:
+            arquivos += ger_editais.gerar_arquivos(pasta_temporaria, args.sinteticos, **parametros_sinteticos)
+
+        for caminho_arquivo in arquivos:
+            if args.fator > 1:
+                caminho_arquivo = ampliar_pdf(caminho_arquivo, args.fator, pasta_temporaria)
+
+            print(f"Medindo '{caminho_arquivo}'...", file=sys.stderr)
+
+            def ler_documento(c=caminho_arquivo):
+                doc, validado, _ = pdf.ler_pdf(c, args.processos)
+                return doc, validado
+
+            # As mensagens da extração não podem se misturar com o JSON
+            with contextlib.redirect_stdout(sys.stderr):
+                documentos.append(medir_documento(os.path.basename(caminho_arquivo), ler_documento, args.repeticoes))
+
+    if args.sem_pdf:
+        for i in range(args.sinteticos):
+            print(f"Medindo o edital sintético {i + 1}...", file=sys.stderr)
+            doc_sintetico = ger_editais.gerar_edital(semente=i, **parametros_sinteticos)
+
+            def ler_documento(d=doc_sintetico):
+                return dict(d), True
+
+            documentos.append(medir_documento(f"edital_sintetico_{i + 1}", ler_documento, args.repeticoes))
+
+    resultado = {'versao': obter_versao(),
+                 'data': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                 'python': platform.python_version(),
+                 'parametros': {'pasta': args.pasta, 'fator': args.fator, 'repeticoes': args.repeticoes,
+                                'processos': args.processos, 'sinteticos': args.sinteticos,
+                                'parametros_sinteticos': parametros_sinteticos if args.sinteticos else None,
+                                'sem_pdf': args.sem_pdf},
+                 'total': totalizar(documentos),
+                 'documentos': documentos}
+
+    # Pico de memória do processo inteiro (em kilobytes no Linux)
+    if resource:
+        resultado['total']['pico_memoria_processo_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    saida = json.dumps(resultado, indent=2, ensure_ascii=False)
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arq_saida:
+            arq_saida.write(saida)
+    else:
+        print(saida)
+
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as arq_anterior:
+            comparar(resultado, json.load(arq_anterior))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+# -----------------------------------------------------------------------------
+# Gerador de editais sintéticos para testes de escala do pré-processamento
+# (extrator.py) e da construção dos datasets (construtor_datasets.py).
+#
+# Gera editais com seções numeradas (1., 1.1., 1.1.1., etc.), com tamanho,
+# profundidade das seções, quantidade de numerações grudadas no texto
+# (ex.: 2.1.Texto) e quantidade de textos repetidos configuráveis. Os editais
+# podem ser gerados em memória ({página: conteúdo}, o mesmo formato devolvido
+# pela função "ler_pdf") ou gravados em arquivos PDF, que podem ser lidos pela
+# função "ler_arquivo" ou colocados na pasta de entrada do pré-processamento.
+#
+# Uso (na raiz do projeto):
+#   python -m benchmarks.gerador_editais <pasta> [--quantidade 5] [--paginas 30] [--profundidade 3]
+#                                        [--termos-pagina 350] [--percentual-grudado 0.2]
+#                                        [--percentual-repeticao 0.2] [--semente 0] [--metadados]
+# -----------------------------------------------------------------------------
+
+import os
+import random
+import argparse
+
+
+# Palavras utilizadas nas descrições das seções
+VOCABULARIO = ['licitação', 'contratação', 'empresa', 'proposta', 'documentação', 'habilitação', 'prazo', 'pregão',
+               'edital', 'contrato', 'objeto', 'serviços', 'fornecimento', 'materiais', 'valor', 'preço', 'pagamento',
+               'fiscalização', 'execução', 'comissão', 'pregoeiro', 'licitante', 'adjudicação', 'homologação',
+               'recurso', 'impugnação', 'penalidades', 'sanções', 'garantia', 'dotação', 'orçamentária', 'despesa',
+               'município', 'prefeitura', 'secretaria', 'administração', 'pública', 'deverá', 'poderá', 'será',
+               'serão', 'apresentar', 'conforme', 'disposto', 'anexo', 'termo', 'referência', 'item', 'lote',
+               'quantidade', 'unidade', 'entrega', 'local', 'horário', 'sessão', 'envelope', 'declaração',
+               'certidão', 'regularidade', 'fiscal', 'trabalhista', 'qualificação', 'técnica', 'econômica',
+               'financeira', 'capacidade', 'atestado', 'registro', 'cadastro', 'fornecedores', 'participação',
+               'microempresa', 'pequeno', 'porte', 'tratamento', 'diferenciado', 'lances', 'julgamento', 'menor',
+               'global', 'unitário', 'critério', 'aceitabilidade', 'planilha', 'custos', 'reajuste', 'vigência',
+               'rescisão', 'multa', 'advertência', 'suspensão', 'impedimento', 'contratar', 'representante', 'legal',
+               'procuração', 'credenciamento', 'assinatura', 'ata', 'registro', 'prestação', 'obrigações',
+               'contratada', 'contratante', 'responsabilidade', 'danos', 'terceiros', 'notificação', 'dias', 'úteis',
+               'corridos', 'contados', 'partir', 'data', 'publicação', 'recebimento', 'ordem', 'nota', 'fiscal',
+               'eletrônica', 'devidamente', 'atestada', 'setor', 'competente', 'ainda', 'bem', 'como', 'todos',
+               'demais', 'exigências', 'previstas', 'neste', 'instrumento', 'legislação', 'vigente', 'aplicável']
+
+# Palavras de ligação, para que as frases fiquem parecidas com as dos editais
+CONECTIVOS = ['de', 'da', 'do', 'dos', 'das', 'a', 'o', 'e', 'em', 'no', 'na', 'para', 'com', 'por', 'que', 'ao']
+
+# Títulos das seções do primeiro nível
+TITULOS = ['DO OBJETO', 'DAS CONDIÇÕES DE PARTICIPAÇÃO', 'DO CREDENCIAMENTO', 'DA PROPOSTA DE PREÇOS',
+           'DA HABILITAÇÃO', 'DOS RECURSOS', 'DA ADJUDICAÇÃO E HOMOLOGAÇÃO', 'DO PAGAMENTO', 'DAS SANÇÕES',
+           'DA DOTAÇÃO ORÇAMENTÁRIA', 'DA FISCALIZAÇÃO', 'DAS OBRIGAÇÕES DA CONTRATADA', 'DA VIGÊNCIA',
+           'DAS DISPOSIÇÕES GERAIS', 'DO REAJUSTE', 'DA GARANTIA', 'DA IMPUGNAÇÃO DO EDITAL', 'DOS PRAZOS']
+
+# Textos que se repetem nos editais (cláusulas padrão). São o caso que a retirada de sentenças similares trata
+TEXTOS_REPETIDOS = ['Os casos omissos serão resolvidos pelo pregoeiro com base na legislação vigente.',
+                    'A participação neste pregão implica a aceitação integral e irretratável das normas do edital.',
+                    'As despesas decorrentes desta licitação correrão por conta da dotação orçamentária própria.',
+                    'O foro competente para dirimir as questões oriundas deste edital é o da comarca do município.',
+                    'Não serão aceitas propostas enviadas por fax ou por correio eletrônico.',
+                    'A contratada deverá manter durante toda a execução do contrato as condições de habilitação.']
+
+# Termos com números que não são seções (datas, valores, leis, etc.). Alguns deles são seções candidatas que o
+# extrator tem que descartar
+RUIDOS_NUMERICOS = ['nº 8.666/93', 'R$ 1.500,00', 'R$ 32.450,90', '10/05/2022', '30 dias', '5 dias úteis',
+                    'Lei nº 10.520', 'art. 43', 'inciso 3', '§ 2º', '12 meses', '0,5%', 'CNPJ 12.345.678/0001-90']
+
+
+def gerar_sentenca(rnd, percentual_repeticao=0.2, percentual_ruido=0.3):
+    """
+    Gera uma sentença sintética
+        :param rnd: Gerador de números aleatórios (random.Random)
+        :param percentual_repeticao: Probabilidade da sentença ser uma cláusula padrão repetida
+        :param percentual_ruido: Probabilidade da sentença conter um termo com números que não é seção
+        :return: Sentença gerada
+    """
+    if rnd.random() < percentual_repeticao:
+        return rnd.choice(TEXTOS_REPETIDOS)
+
+    palavras = []
+
+    for _ in range(rnd.randint(8, 25)):
+        palavras.append(rnd.choice(CONECTIVOS) if rnd.random() < 0.3 else rnd.choice(VOCABULARIO))
+
+    if rnd.random() < percentual_ruido:
+        palavras.insert(rnd.randrange(len(palavras)), rnd.choice(RUIDOS_NUMERICOS))
+
+    sentenca = ' '.join(palavras)
+
+    return sentenca[0].upper() + sentenca[1:] + '.'
+
+
+def gerar_numeracao(rnd, contadores, profundidade):
+    """
+    Gera a numeração da próxima seção, a partir da numeração da seção anterior
+        :param rnd: Gerador de números aleatórios (random.Random)
+        :param contadores: Lista com a numeração da seção anterior (ex.: [2, 1] para a seção 2.1.). É alterada
+        :param profundidade: Quantidade máxima de níveis das seções
+        :return: Numeração da seção (ex.: 2.2.) e o nível da seção
+    """
+    # A próxima seção pode descer um nível (ex.: 2.1. -> 2.1.1.), continuar no mesmo nível (ex.: 2.1. -> 2.2.) ou subir
+    # para qualquer nível acima (ex.: 2.1.3. -> 3.)
+    nivel = rnd.randint(1, min(len(contadores) + 1, profundidade))
+
+    if nivel > len(contadores):
+        contadores.append(1)
+    else:
+        del contadores[nivel:]
+        contadores[-1] += 1
+
+    return '.'.join(str(c) for c in contadores) + '.', nivel
+
+
+def gerar_edital(paginas=30, profundidade=3, termos_por_pagina=350, percentual_grudado=0.2, percentual_repeticao=0.2,
+                 semente=None):
+    """
+    Gera um edital sintético com seções numeradas
+        :param paginas: Quantidade de páginas do edital
+        :param profundidade: Quantidade máxima de níveis das seções (ex.: 3 => até 1.1.1.)
+        :param termos_por_pagina: Quantidade de termos em cada página
+        :param percentual_grudado: Probabilidade da numeração de uma seção estar grudada no texto (ex.: 2.1.Texto)
+        :param percentual_repeticao: Probabilidade de uma sentença ser uma cláusula padrão repetida
+        :param semente: Semente dos números aleatórios, para gerar sempre o mesmo edital
+        :return: Dicionário contendo como chave a página do edital e como valor o conteúdo da página (mesmo formato da
+        função "ler_pdf")
+    """
+    rnd = random.Random(semente)
+    total_termos = paginas * termos_por_pagina
+    termos = ['EDITAL', 'DE', 'PREGÃO', 'ELETRÔNICO', f"nº {rnd.randint(1, 999)}/{rnd.randint(2015, 2023)}"]
+    contadores = []
+
+    while len(termos) < total_termos:
+        numeracao, nivel = gerar_numeracao(rnd, contadores, profundidade)
+
+        if nivel == 1:
+            texto = rnd.choice(TITULOS).split()
+        else:
+            texto = ' '.join(gerar_sentenca(rnd, percentual_repeticao) for _ in range(rnd.randint(1, 4))).split()
+
+        if rnd.random() < percentual_grudado:
+            termos.append(numeracao + texto[0])
+            termos.extend(texto[1:])
+        else:
+            termos.append(numeracao)
+            termos.extend(texto)
+
+    del termos[total_termos:]
+
+    return {p + 1: ' '.join(termos[p * termos_por_pagina:(p + 1) * termos_por_pagina]) for p in range(paginas)}
+
+
+def gerar_sentencas_documentos(qtd_documentos=10, sentencas_por_documento=500, percentual_repeticao=0.2,
+                               semente=None):
+    """
+    Gera as sentenças de documentos sintéticos, no formato utilizado pela função "retirar_sentencas_similares" do
+    arquivo construtor_datasets.py
+        :param qtd_documentos: Quantidade de documentos
+        :param sentencas_por_documento: Quantidade de sentenças de cada documento
+        :param percentual_repeticao: Probabilidade de uma sentença ser uma cláusula padrão repetida
+        :param semente: Semente dos números aleatórios, para gerar sempre as mesmas sentenças
+        :return: Dicionário cuja chave é o código do documento e o valor é uma lista de sentenças
+    """
+    rnd = random.Random(semente)
+
+    return {f"sintetico_{d + 1}": [gerar_sentenca(rnd, percentual_repeticao) for _ in range(sentencas_por_documento)]
+            for d in range(qtd_documentos)}
+
+
+def escapar_texto_pdf(texto):
+    """
+    Prepara um texto para ser gravado num arquivo PDF (string literal com a codificação WinAnsiEncoding)
+        :param texto: Texto que será gravado
+        :return: Texto em bytes
+    """
+    texto = texto.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+    return texto.encode('cp1252', 'replace')
+
+
+def gravar_pdf(documento, caminho_arquivo, caracteres_por_linha=95):
+    """
+    Grava um edital num arquivo PDF simples, com uma fonte padrão e o texto de cada página quebrado em linhas
+        :param documento: Dicionário contendo como chave a página do edital e como valor o conteúdo da página
+        :param caminho_arquivo: Caminho do arquivo PDF que será gravado
+        :param caracteres_por_linha: Quantidade aproximada de caracteres em cada linha das páginas
+    """
+    # Objetos fixos: 1 = catálogo, 2 = árvore de páginas, 3 = fonte. Cada página tem dois objetos: a página e o seu
+    # conteúdo
+    objetos = [None, None, b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>']
+    paginas = []
+
+    for conteudo in documento.values():
+        linhas = []
+        linha = []
+        tamanho_linha = 0
+
+        for termo in conteudo.split():
+            if linha and tamanho_linha + len(termo) > caracteres_por_linha:
+                linhas.append(' '.join(linha))
+                linha = []
+                tamanho_linha = 0
+
+            linha.append(termo)
+            tamanho_linha += len(termo) + 1
+
+        if linha:
+            linhas.append(' '.join(linha))
+
+        # Cada linha termina com um espaço, pois a extração do texto junta as linhas sem separá-las
+        stream = b'BT /F1 9 Tf 11 TL 40 800 Td\n'
+        stream += b''.join(b'(' + escapar_texto_pdf(lin + ' ') + b') Tj T*\n' for lin in linhas)
+        stream += b'ET'
+
+        objetos.append(b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+        id_conteudo = len(objetos)
+        objetos.append(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> '
+                       b'/Contents %d 0 R >>' % id_conteudo)
+        paginas.append(len(objetos))
+
+    objetos[0] = b'<< /Type /Catalog /Pages 2 0 R >>'
+    objetos[1] = b'<< /Type /Pages /Kids [' + b' '.join(b'%d 0 R' % p for p in paginas) + \
+                 b'] /Count %d >>' % len(paginas)
+
+    with open(caminho_arquivo, 'wb') as arq_pdf:
+        arq_pdf.write(b'%PDF-1.4\n')
+        posicoes = []
+
+        for i, objeto in enumerate(objetos):
+            posicoes.append(arq_pdf.tell())
+            arq_pdf.write(b'%d 0 obj\n' % (i + 1) + objeto + b'\nendobj\n')
+
+        inicio_xref = arq_pdf.tell()
+        arq_pdf.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objetos) + 1))
+        arq_pdf.write(b''.join(b'%010d 00000 n \n' % p for p in posicoes))
+        arq_pdf.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objetos) + 1,
+                                                                                         inicio_xref))
+
+
+def gerar_arquivos(pasta, quantidade=5, metadados=False, semente=0, **parametros_edital):
+    """
+    Gera editais sintéticos e os grava em arquivos PDF
+        :param pasta: Pasta onde os arquivos serão gravados
+        :param quantidade: Quantidade de editais
+        :param metadados: Se True, gera também os arquivos de metadados (função "preparar_arquivo"), para que os
+                          editais possam ser pré-processados. Nesse caso a pasta deve ser a pasta de entrada do
+                          pré-processamento
+        :param semente: Semente dos números aleatórios. Cada edital utiliza a semente + o seu índice
+        :param parametros_edital: Parâmetros da função "gerar_edital"
+        :return: Lista com os caminhos dos arquivos gerados. Obs.: Se os metadados forem gerados, a lista fica vazia, pois
+        os arquivos são renomeados pela função "preparar_arquivo"
+    """
+    os.makedirs(pasta, exist_ok=True)
+    caminhos = []
+
+    for i in range(quantidade):
+        nome = f"edital_sintetico_{i + 1}.pdf"
+        caminho_arquivo = os.path.join(pasta, nome)
+        gravar_pdf(gerar_edital(semente=semente + i, **parametros_edital), caminho_arquivo)
+
+        if metadados:
+            # Importado somente aqui, pois depende do banco de dados
+            from src.modulos.preproc.pre_processador import preparar_arquivo
+            preparar_arquivo(pasta, nome, 'n/a', 'gerador_editais', 0)
+        else:
+            caminhos.append(caminho_arquivo)
+
+    return caminhos
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gerador de editais sintéticos')
+    parser.add_argument('pasta', help='Pasta onde os arquivos PDF serão gravados')
+    parser.add_argument('--quantidade', type=int, default=5, help='Quantidade de editais')
+    parser.add_argument('--paginas', type=int, default=30, help='Quantidade de páginas de cada edital')
+    parser.add_argument('--profundidade', type=int, default=3, help='Quantidade máxima de níveis das seções')
+    parser.add_argument('--termos-pagina', type=int, default=350, help='Quantidade de termos em cada página')
+    parser.add_argument('--percentual-grudado', type=float, default=0.2,
+                        help='Probabilidade da numeração de uma seção estar grudada no texto')
+    parser.add_argument('--percentual-repeticao', type=float, default=0.2,
+                        help='Probabilidade de uma sentença ser uma cláusula padrão repetida')
+    parser.add_argument('--semente', type=int, default=0, help='Semente dos números aleatórios')
+    parser.add_argument('--metadados', action='store_true',
+                        help='Gera também os arquivos de metadados para o pré-processamento')
+    args = parser.parse_args()
+
+    gerar_arquivos(args.pasta, args.quantidade, args.metadados, args.semente, paginas=args.paginas,
+                   profundidade=args.profundidade, termos_por_pagina=args.termos_pagina,
+                   percentual_grudado=args.percentual_grudado, percentual_repeticao=args.percentual_repeticao)
+
+    print(f"{args.quantidade} edital(is) gerado(s) na pasta '{args.pasta}'")
+
+
+if __name__ == "__main__":
+    main()
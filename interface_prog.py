@@ -9,10 +9,12 @@ from src.utils.limpar_db import limpar_db_para_testes
 from src.ambiente.parametros_globais import FILE_NOT_FOUND_ERROR, PERMISSION_ERROR, PREPROC_CAMINHO_ARQ_CONF
 from src.ambiente.preparar_ambiente import inicializar_parametros, validar_pastas
 from src.classes.persistencia.cliente import ClienteGenerico
+from src.classes.persistencia.indices import INDICES_BANCOS
 from src.classes.persistencia.dump_arq import descarregar_conteudo
-from src.classes.persistencia.serializacao import desserializar
+from src.classes.persistencia.serializacao import converter_cod_processamento, desserializar
 from src.modulos.preproc.pre_processador import preparar_arquivo
 from src.modulos.preproc.preproc import pre_processamento
+from src.modulos.ren.construtor_datasets import migrar_cod_processamento
 from src.modulos.ren.conversor_jsonl_conll import converter_jsonl_conll
 from src.modulos.ren.ren import ren
 from src.utils.geradores import gerar_data, gerar_epoch
@@ -52,11 +54,12 @@ def imprimir_chaves(tipo_doc):
                 Documento__nome
                 Documento__codigo_arq
                 Documento__hash_md5
+                Documento__hash_arquivo
                 Documento__tipo_arq
                 Documento__extensao
                 Documento__data_cadastro
                 Documento__usuario_cadastrou
-                Documento__cod_processamento
+                Documento__cod_processamento (códigos separados por ',' ou vazio/'a processar' para os não processados)
                 Documento__codigo_lote
                 Documento__nome_arq_original
                 Documento__url_web
@@ -163,12 +166,13 @@ def imprimir_documento(doc_obj, mensagem):
         print(f"Nome do arquivo...........: {doc_obj.nome}")
         print(f"Código do arquivo.........: {doc_obj.codigo_arq}")
         print(f"Hash MD5..................: {doc_obj.hash_md5}")
+        print(f"Hash MD5 do arquivo.......: {doc_obj.hash_arquivo}")
         print(f"Tipo......................: {doc_obj.tipo_arq}")
         print(f"Extensao..................: {doc_obj.extensao}")
         print(f"Data Cadastro epoch.......: {doc_obj.data_cadastro}, tipo: {type(doc_obj.data_cadastro)}")
         print(f"Data Cadastro normal......: {gerar_data(doc_obj.data_cadastro, '%d/%m/%Y %H:%M:%Shs')}")
         print(f"Usuário que cadastrou.....: {doc_obj.usuario_cadastrou}")
-        print(f"Código Processamento......: {doc_obj.cod_processamento}")
+        print(f"Código Processamento......: {', '.join(doc_obj.cod_processamento) or 'a processar'}")
         print(f"Lote......................: {doc_obj.codigo_lote}")
         print(f"Nome do arquivo original..: {doc_obj.nome_arq_original}")
         print(f"URL WEB...................: {doc_obj.url_web}")
@@ -303,6 +307,27 @@ def listar_documentos_impressao(tipo, docs_json, caminho_dump):
         print("\n       *** Fim da lista! ***")
 
 
+def montar_busca(chave, valor):
+    """
+    Monta o valor e o modo da busca a partir do valor digitado para a chave
+        :param chave: Chave para a busca do documento
+        :param valor: Valor digitado para a chave
+        :return: Tupla com o valor e o modo de busca (ver MODOS_BUSCA em cliente.py)
+    """
+    # Os códigos de processamento são guardados numa lista (ex.: ['ner', 'classificacao']), então a expressão regular
+    # não encontra os documentos ainda não processados (lista vazia). Os códigos digitados são convertidos para uma
+    # lista e é buscado o documento que tenha algum deles
+    if chave == 'Documento__cod_processamento':
+        codigos = converter_cod_processamento(valor)
+
+        if not codigos:
+            return [], 'exato'  # Somente os documentos com a lista vazia
+
+        return codigos, 'lista'
+
+    return valor, 'regex'
+
+
 def ler_dados_bd(tipo, opcao, chave, valor, caminho_dump):
     """
     Ler os documentos no banco de dados
@@ -313,6 +338,7 @@ def ler_dados_bd(tipo, opcao, chave, valor, caminho_dump):
         :param caminho_dump: Caminho para geração do dump do edital, caso seja necessário
     """
     docs_json = None
+    valor, modo = montar_busca(chave, valor)
 
     if tipo == 'EDITAL':
         banco_mongo = 'db_documentos'
@@ -320,24 +346,24 @@ def ler_dados_bd(tipo, opcao, chave, valor, caminho_dump):
 
         if opcao == '2':
             c_mongo = ClienteGenerico('MongoDB', 'localhost', 27017, banco_mongo)
-            doc_mongo_js = c_mongo.buscar_todos(colecao_mongo, chave, valor)
-            c_mongo.fechar_conexao()
+            doc_mongo_js = c_mongo.buscar_todos(colecao_mongo, chave, valor, modo)
             docs_json = list(doc_mongo_js)
+            c_mongo.fechar_conexao()
     elif tipo == 'DOCUMENTO':
         c_mongo_meta = ClienteGenerico('MongoDB', 'localhost', 27017, 'db_metadados')
-        doc_metadados_js = c_mongo_meta.buscar_todos('col_metadados_docs', chave, valor)
-        c_mongo_meta.fechar_conexao()
+        doc_metadados_js = c_mongo_meta.buscar_todos('col_metadados_docs', chave, valor, modo)
         docs_json = list(doc_metadados_js)
+        c_mongo_meta.fechar_conexao()
     elif tipo == 'LOTE':
         c_mongo_lote = ClienteGenerico('MongoDB', 'localhost', 27017, 'db_metadados')
-        doc_lotes_js = c_mongo_lote.buscar_todos('col_metadados_lotes', chave, valor)
-        c_mongo_lote.fechar_conexao()
+        doc_lotes_js = c_mongo_lote.buscar_todos('col_metadados_lotes', chave, valor, modo)
         docs_json = list(doc_lotes_js)
+        c_mongo_lote.fechar_conexao()
     elif tipo == 'RESULTADO':
         c_mongo_resultado = ClienteGenerico('MongoDB', 'localhost', 27017, 'db_metadados')
-        doc_resultados_js = c_mongo_resultado.buscar_todos('col_metadados_resultados', chave, valor)
-        c_mongo_resultado.fechar_conexao()
+        doc_resultados_js = c_mongo_resultado.buscar_todos('col_metadados_resultados', chave, valor, modo)
         docs_json = list(doc_resultados_js)
+        c_mongo_resultado.fechar_conexao()
     else:
         print(f"\nO tipo de documento '{tipo}' não está cadastrado!")
         return
@@ -345,6 +371,29 @@ def ler_dados_bd(tipo, opcao, chave, valor, caminho_dump):
     listar_documentos_impressao(tipo, docs_json, caminho_dump)
 
 
+def criar_indices_bd():
+    """
+    Cria (ou confirma) os índices de todos os bancos de dados, lista os índices existentes e migra os dados gravados
+    em formatos antigos
+    """
+    for banco in INDICES_BANCOS:
+        c_mongo = ClienteGenerico('MongoDB', 'localhost', 27017, banco)
+        indices = c_mongo.criar_indices()
+        c_mongo.fechar_conexao()
+
+        print(f"\n  Índices do banco '{banco}':")
+
+        for i in indices:
+            print(f"    - {i}")
+
+    # Converte os códigos de processamento gravados numa única string para listas
+    c_mongo_meta = ClienteGenerico('MongoDB', 'localhost', 27017, 'db_metadados')
+    qtd_migrados = migrar_cod_processamento(c_mongo_meta)
+    c_mongo_meta.fechar_conexao()
+
+    print(f"\n  Códigos de processamento convertidos para o formato de lista: {qtd_migrados} documento(s)")
+
+
 def menu():
     """
     Menu principal do sistema
@@ -372,6 +421,7 @@ def menu():
         print('             4 - Pré-Processar')
         print('             5 - Construir Dataset')
         print('             6 - Converter JSONL para CONLL')
+        print('             7 - Criar Índices e Migrar o Banco de Dados')
         print('\n********************************************************************')
         op = input("Escolha a opção (Sair => 0): ")
 
@@ -519,6 +569,8 @@ def menu():
                 converter_jsonl_conll(retirar_sentencas_semelhantes=retirar_sentencas_similares,
                                       escopo_global_sentencas=True, tamanho_dataset_teste=tamanho_dataset_teste,
                                       concatenar_arquivos=True)
+        elif op == '7':
+            criar_indices_bd()
         elif op.upper() == '0':
             break
 
@@ -36,6 +36,76 @@ QUANTIDADE_MINIMA_TERMOS_POR_PAGINA = 20
 TAMANHO_MAXIMO_PALAVRA = 46
 QUANTIDADE_MAXIMA_NAO_ALFANUM = 10
 
+"""
+Parâmetros: Extração do texto dos documentos PDF
+"""
+# Funções "ler_pypdf2" e "ler_pdfminer" no arquivo pdf.py. Documentos com menos páginas são extraídos num único
+# processo, pois não compensa o custo de criar os processos da extração paralela
+QUANTIDADE_MINIMA_PAGINAS_EXTRACAO_PARALELA = 40
+
+# Arquivo pre_processador.py. Na leitura paralela dos arquivos, quantidade máxima de arquivos submetidos e ainda não
+# consumidos pelo coordenador, por processo de leitura. Limita a quantidade de documentos lidos que ficam na memória
+# aguardando a gravação, quando a gravação é mais lenta que a leitura
+LEITURAS_EM_ANDAMENTO_POR_PROCESSO = 2
+
+# Função "ler_pdf" no arquivo pdf.py. Se True, quando o PyPDF2 falha, somente as páginas com problema são extraídas
+# novamente com o pdfminer. Se False, o documento inteiro é extraído novamente com o pdfminer
+EXTRACAO_FALLBACK_POR_PAGINA = True
+
+# Arquivo cache_extracao.py. Faz parte da chave do cache da extração dos documentos PDF. Incremente a versão sempre que
+# alterar as regras de extração, de limpeza ou de validação dos documentos (arquivo pdf.py e parâmetros acima), pois
+# assim os documentos já extraídos são extraídos novamente
+VERSAO_EXTRATOR_PDF = 1
+
+# Arquivo supervisor.py. Intervalo (em segundos) entre as medições da memória residente do processo de leitura de cada
+# arquivo, quando a memória máxima da leitura é limitada (parâmetro p_memoria_maxima_leitura do módulo preproc)
+SUPERVISOR_INTERVALO_VERIFICACAO_MEMORIA = 0.2
+
+"""
+Parâmetros: Representação das seções dos editais
+"""
+# Arquivos pre_processador.py e extrator.py. Se True, os títulos das seções e as descrições das subseções são guardados
+# como spans (página e posição inicial, página e posição final) sobre o conteúdo do edital (dumpconteudo), sem repetir o
+# texto na memória e no banco de dados. O texto é obtido somente quando for utilizado. Obs.: Quem lê os editais direto
+# do banco de dados, sem a função "desserializar", precisa tratar as chaves 'Secao__span_titulo' e
+# 'Subsecao__span_descricao'
+DESCRICOES_COMO_SPANS = False
+
+"""
+Parâmetros: Conexões com o banco de dados
+"""
+# Arquivo mongodb.py. Os objetos ClienteGenerico de um mesmo processo compartilham um único MongoClient por servidor e
+# porta. Quantidade máxima e mínima de conexões mantidas no pool do MongoClient compartilhado
+MONGODB_TAMANHO_MAXIMO_POOL = 10
+MONGODB_TAMANHO_MINIMO_POOL = 0
+
+# Arquivo mongodb.py. Tempo máximo (em milissegundos) que uma conexão pode ficar ociosa no pool antes de ser fechada
+MONGODB_TEMPO_MAXIMO_CONEXAO_OCIOSA = 300000
+
+# Arquivo mongodb.py. Se True, o MongoClient compartilhado é fechado quando o último ClienteGenerico que o utiliza chama
+# "fechar_conexao". Se False, ele continua aberto para os próximos ClienteGenerico e é fechado no fim do processo
+MONGODB_FECHAR_CLIENTE_SEM_USO = False
+
+# Arquivo construtor_datasets.py. Quantidade de editais trazidos a cada ida ao banco de dados na leitura das subseções.
+# Obs.: Somente as descrições das subseções são trazidas, então os lotes podem ser grandes
+MONGODB_TAMANHO_LOTE_CURSOR_SUBSECOES = 200
+
+"""
+Parâmetros: Armazenamento do conteúdo dos editais
+"""
+# Arquivos pre_processador.py e conteudo_edital.py. Forma de armazenamento do conteúdo do edital (dumpconteudo) no banco
+# de dados:
+#   - 'texto': lista com o texto das páginas dentro do documento do edital (col_editais);
+#   - 'comprimido': páginas comprimidas (zlib) num campo binário do documento do edital;
+#   - 'gridfs': páginas comprimidas (zlib) num arquivo do GridFS referenciado pelo documento do edital. Indicado para
+#               editais muito grandes, pois os documentos do MongoDB são limitados a 16 MB.
+# Nos modos 'comprimido' e 'gridfs' as páginas são descomprimidas somente quando forem utilizadas. Obs.: Os editais
+# gravados em qualquer um dos modos continuam sendo lidos normalmente se o parâmetro for alterado
+ARMAZENAMENTO_DUMPCONTEUDO = 'texto'
+
+# Arquivo conteudo_edital.py. Nível de compressão do zlib (1: mais rápido; 9: menor tamanho)
+NIVEL_COMPRESSAO_DUMPCONTEUDO = 6
+
 """
 Parâmetro: Códigos de erros para o comando exit() no tratamento de exceções
 """
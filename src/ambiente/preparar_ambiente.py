@@ -174,6 +174,61 @@ def inicializar_parametros(modulo, caminho_config):
                                      'arquivo impede que dois processos leiam a pasta ao mesmo tempo. Valor em minutos',
                            persistido=True)
         conf.inserir_parametro(param7)
+
+        param8 = Parametro(nome='p_qtd_processos',
+                           tipo='int',
+                           descricao='Quantidade de processos utilizados para ler os arquivos em paralelo no '
+                                     'pré-processamento. Com o valor 1 os arquivos são lidos um de cada vez',
+                           persistido=True)
+        conf.inserir_parametro(param8)
+
+        param9 = Parametro(nome='p_qtd_processos_paginas',
+                           tipo='int',
+                           descricao='Quantidade de processos utilizados para extrair as páginas de um mesmo arquivo '
+                                     'em paralelo. Só tem efeito em arquivos grandes. Com o valor 1 as páginas são '
+                                     'extraídas uma de cada vez',
+                           persistido=True)
+        conf.inserir_parametro(param9)
+
+        param10 = Parametro(nome='p_caminho_cache_extracao',
+                            descricao='Pasta para guardar o cache do texto extraído dos arquivos. Evita extrair '
+                                      'novamente os arquivos que já foram pré-processados',
+                            persistido=True)
+        conf.inserir_parametro(param10)
+
+        param11 = Parametro(nome='p_tamanho_maximo_cache_extracao',
+                            tipo='int',
+                            descricao='Tamanho máximo do cache do texto extraído dos arquivos. Quando é ultrapassado, '
+                                      'os arquivos utilizados há mais tempo são removidos do cache. Valor em '
+                                      'megabytes. Com o valor 0 o cache não é utilizado',
+                            persistido=True)
+        conf.inserir_parametro(param11)
+
+        param12 = Parametro(nome='p_tempo_maximo_leitura',
+                            tipo='int',
+                            descricao='Tempo máximo da leitura de cada arquivo. Se for ultrapassado, a leitura é '
+                                      'encerrada e o arquivo é movido para a pasta de erros. Valor em segundos. Com o '
+                                      'valor 0 o tempo não é limitado',
+                            persistido=True)
+        conf.inserir_parametro(param12)
+
+        param13 = Parametro(nome='p_memoria_maxima_leitura',
+                            tipo='int',
+                            descricao='Memória máxima do processo de leitura de cada arquivo (memória residente, '
+                                      'somando os processos da extração paralela das páginas). Se for ultrapassada, '
+                                      'a leitura é encerrada e o arquivo é movido para a pasta de erros. Valor em '
+                                      'megabytes. Com o valor 0 a memória não é limitada. Obs.: Só é aplicada no '
+                                      'Linux',
+                            persistido=True)
+        conf.inserir_parametro(param13)
+
+        param14 = Parametro(nome='p_tamanho_lote_gravacao',
+                            tipo='int',
+                            descricao='Quantidade de documentos acumulados antes de gravar no banco de dados. Lotes '
+                                      'maiores reduzem a quantidade de operações no banco. Com o valor 1 cada '
+                                      'documento é gravado assim que é pré-processado',
+                            persistido=True)
+        conf.inserir_parametro(param14)
     elif modulo == 'ren':
         param1 = Parametro(nome='p_caminho_datasets',
                            descricao='Pasta para geração dos datasets',
@@ -5,6 +5,28 @@
 # em banco de dados, implemente ou altere a sua entrada na rotina da função de desserialização
 # no arquivo src.classes.persistencia.serializacao.py
 # ----------------------------------------------------------------------------------------------
+from array import array
+
+
+def materializar_span(paginas_documento, span):
+    """
+    Obtém o texto referente a um span
+        :param paginas_documento: Lista com o conteúdo das páginas do documento (dumpconteudo do edital)
+        :param span: Lista com a página inicial, a posição inicial, a página final e a posição final do texto.
+                     Obs.: As páginas começam em 1 e as posições são os índices dos caracteres no conteúdo da página
+        :return: Texto referente ao span. Se o texto ocupar mais de uma página, as páginas são unidas por ' '
+    """
+    pagina_inicial, inicio, pagina_final, fim = span
+
+    if pagina_inicial == pagina_final:
+        return paginas_documento[pagina_inicial - 1][inicio:fim]
+
+    partes = [paginas_documento[pagina_inicial - 1][inicio:]]
+    partes.extend(paginas_documento[pagina_inicial:pagina_final - 1])
+    partes.append(paginas_documento[pagina_final - 1][:fim])
+
+    return ' '.join(partes)
+
 
 class Edital:
     """
@@ -85,6 +107,10 @@ class Secao:
         self.__paginas = []  # Guarda os números das páginas onde a seção se encontra
         self.__subsecoes = []  # Guarda todas as subseções que pertencem à seção
 
+        # Se definido, o título não é guardado e sim obtido do conteúdo do edital somente quando for utilizado
+        self.__span_titulo = None
+        self.__paginas_documento = None  # Referência para o dumpconteudo do edital (não é uma cópia)
+
     # Obs.: Precisei criar esta propriedade para facilitar na serialização de objetos para gravação no Elasticsearch,
     #       pois se o nome da chave do dicionário começar com '_' (underscore), a mesma não é indexada para realização
     #       de buscas "full-text", ou seja, somente é possível buscar passando o nome da chave e o valor a ser buscado.
@@ -95,7 +121,21 @@ class Secao:
                 :return: dicionário sem o '_' (underscore) no início do nome da chave.
         """
         return {'Secao__numero': self.__numero,
-                'Secao__titulo': self.__titulo,
+                'Secao__titulo': self.titulo,
+                'Secao__paginas': self.__paginas,
+                'Secao__subsecoes': self.__subsecoes}
+
+    @property
+    def __mydict_spans__(self):
+        """
+            Cria um dicionário com os atributos da classe como chave, guardando o span do título no lugar do texto
+                :return: dicionário sem o '_' (underscore) no início do nome da chave.
+        """
+        if self.__span_titulo is None:
+            return self.__mydict__
+
+        return {'Secao__numero': self.__numero,
+                'Secao__span_titulo': self.__span_titulo,
                 'Secao__paginas': self.__paginas,
                 'Secao__subsecoes': self.__subsecoes}
 
@@ -105,8 +145,15 @@ class Secao:
 
     @property
     def titulo(self):
+        if self.__span_titulo is not None:
+            return materializar_span(self.__paginas_documento, self.__span_titulo)
+
         return self.__titulo
 
+    @property
+    def span_titulo(self):
+        return self.__span_titulo
+
     @property
     def paginas(self):
         return self.__paginas
@@ -122,6 +169,7 @@ class Secao:
     @titulo.setter
     def titulo(self, titulo):
         self.__titulo = titulo
+        self.__span_titulo = None
 
     @paginas.setter
     def paginas(self, paginas):
@@ -137,6 +185,16 @@ class Secao:
     def inserir_subsecao(self, subsecao):
         self.__subsecoes.append(subsecao)
 
+    def definir_span_titulo(self, span, paginas_documento):
+        """
+        Passa a obter o título a partir do conteúdo do edital
+            :param span: Span do título (veja a função "materializar_span")
+            :param paginas_documento: Lista com o conteúdo das páginas do documento (dumpconteudo do edital)
+        """
+        self.__titulo = ''
+        self.__span_titulo = span
+        self.__paginas_documento = paginas_documento
+
 
 class Subsecao:
     """
@@ -147,6 +205,10 @@ class Subsecao:
         self.__descricao = ''
         self.__pagina = ''  # Número da página onde a subseção começa
 
+        # Se definido, a descrição não é guardada e sim obtida do conteúdo do edital somente quando for utilizada
+        self.__span_descricao = None
+        self.__paginas_documento = None  # Referência para o dumpconteudo do edital (não é uma cópia)
+
     # Obs.: Precisei criar esta propriedade para facilitar na serialização de objetos para gravação no Elasticsearch,
     #       pois se o nome da chave do dicionário começar com '_' (underscore), a mesma não é indexada para realização
     #       de buscas "full-text", ou seja, somente é possível buscar passando o nome da chave e o valor a ser buscado.
@@ -157,7 +219,20 @@ class Subsecao:
                 :return: dicionário sem o '_' (underscore) no início do nome da chave.
         """
         return {'Subsecao__numero': self.__numero,
-                'Subsecao__descricao': self.__descricao,
+                'Subsecao__descricao': self.descricao,
+                'Subsecao__pagina': self.__pagina}
+
+    @property
+    def __mydict_spans__(self):
+        """
+            Cria um dicionário com os atributos da classe como chave, guardando o span da descrição no lugar do texto
+                :return: dicionário sem o '_' (underscore) no início do nome da chave.
+        """
+        if self.__span_descricao is None:
+            return self.__mydict__
+
+        return {'Subsecao__numero': self.__numero,
+                'Subsecao__span_descricao': self.__span_descricao,
                 'Subsecao__pagina': self.__pagina}
 
     @property
@@ -166,8 +241,15 @@ class Subsecao:
 
     @property
     def descricao(self):
+        if self.__span_descricao is not None:
+            return materializar_span(self.__paginas_documento, self.__span_descricao)
+
         return self.__descricao
 
+    @property
+    def span_descricao(self):
+        return self.__span_descricao
+
     @property
     def pagina(self):
         return self.__pagina
@@ -179,7 +261,84 @@ class Subsecao:
     @descricao.setter
     def descricao(self, descricao):
         self.__descricao = descricao
+        self.__span_descricao = None
 
     @pagina.setter
     def pagina(self, pagina):
         self.__pagina = pagina
+
+    def definir_span_descricao(self, span, paginas_documento):
+        """
+        Passa a obter a descrição a partir do conteúdo do edital
+            :param span: Span da descrição (veja a função "materializar_span")
+            :param paginas_documento: Lista com o conteúdo das páginas do documento (dumpconteudo do edital)
+        """
+        self.__descricao = ''
+        self.__span_descricao = span
+        self.__paginas_documento = paginas_documento
+
+
+class TermosDocumento:
+    """
+    Termos (palavras, números, etc.) de um documento e as páginas onde eles se encontram. Utilizado na extração das
+    seções dos editais. Obs.: Não é persistido em banco de dados
+    """
+    def __init__(self, com_posicoes=False):
+        self.__termos = []  # Guarda os termos do documento na ordem em que aparecem
+        self.__paginas = array('I')  # Guarda a página de cada termo. O array ocupa bem menos memória que uma lista
+
+        # Se solicitado, guarda a posição (índice do primeiro caractere) de cada termo no conteúdo da sua página.
+        # Obs.: Utilizado para representar as descrições das seções como spans
+        self.__posicoes = array('I') if com_posicoes else None
+
+    def __len__(self):
+        return len(self.__termos)
+
+    def __getitem__(self, indice):
+        """
+        Obtém um termo do documento
+            :param indice: Posição do termo no documento
+            :return: Tupla com o termo e a página onde ele se encontra
+        """
+        return self.__termos[indice], self.__paginas[indice]
+
+    def __iter__(self):
+        return zip(self.__termos, self.__paginas)
+
+    @property
+    def termos(self):
+        return self.__termos
+
+    @property
+    def paginas(self):
+        return self.__paginas
+
+    @property
+    def posicoes(self):
+        return self.__posicoes
+
+    @termos.setter
+    def termos(self, termos):
+        self.__termos = termos
+
+    @paginas.setter
+    def paginas(self, paginas):
+        self.__paginas = paginas
+
+    @posicoes.setter
+    def posicoes(self, posicoes):
+        self.__posicoes = posicoes
+
+    def inserir_termo(self, termo, pagina, posicao=0):
+        self.__termos.append(termo)
+        self.__paginas.append(pagina)
+
+        if self.__posicoes is not None:
+            self.__posicoes.append(posicao)
+
+    def inserir_termos(self, termos, pagina, posicoes=None):
+        self.__termos.extend(termos)
+        self.__paginas.extend(array('I', [pagina]) * len(termos))
+
+        if self.__posicoes is not None:
+            self.__posicoes.extend(posicoes)
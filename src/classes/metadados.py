@@ -5,6 +5,8 @@
 # em banco de dados, implemente ou altere a sua entrada na rotina da função de desserialização
 # no arquivo src.classes.persistencia.serializacao.py
 # ----------------------------------------------------------------------------------------------
+import src.utils.tempos as tms
+
 
 class Documento:
     """
@@ -12,15 +14,16 @@ class Documento:
     """
     def __init__(self, nome='', codigo_arq='', hash_md5='', tipo_arq='', extensao='', data_cadastro=0,
                  usuario_cadastrou='', codigo_lote='', nome_arq_original='', url_web='', caminho_base='',
-                 caminho_relativo='', head=None):
+                 caminho_relativo='', head=None, hash_arquivo=''):
         self.__nome = nome
         self.__codigo_arq = codigo_arq
-        self.__hash_md5 = hash_md5
+        self.__hash_md5 = hash_md5  # Hash do conteúdo extraído do arquivo
+        self.__hash_arquivo = hash_arquivo  # Hash dos bytes do arquivo, permite verificar duplicidade antes da extração
         self.__tipo_arq = tipo_arq  # Se é um edital ou outro tipo (valores: EDITAL; tipos futuros)
         self.__extensao = extensao
         self.__data_cadastro = data_cadastro
         self.__usuario_cadastrou = usuario_cadastrou
-        self.__cod_processamento = 'a processar'  # Guardará os códigos dos processamentos já realizados
+        self.__cod_processamento = []  # Lista dos códigos dos processamentos já realizados (vazia: a processar)
         self.__codigo_lote = codigo_lote
         self.__nome_arq_original = nome_arq_original
         self.__url_web = url_web
@@ -40,6 +43,7 @@ class Documento:
         return {'Documento__nome': self.__nome,
                 'Documento__codigo_arq': self.__codigo_arq,
                 'Documento__hash_md5': self.__hash_md5,
+                'Documento__hash_arquivo': self.__hash_arquivo,
                 'Documento__tipo_arq': self.__tipo_arq,
                 'Documento__extensao': self.__extensao,
                 'Documento__data_cadastro': self.__data_cadastro,
@@ -64,6 +68,10 @@ class Documento:
     def hash_md5(self):
         return self.__hash_md5
 
+    @property
+    def hash_arquivo(self):
+        return self.__hash_arquivo
+
     @property
     def tipo_arq(self):
         return self.__tipo_arq
@@ -120,6 +128,10 @@ class Documento:
     def hash_md5(self, hash_md5):
         self.__hash_md5 = hash_md5
 
+    @hash_arquivo.setter
+    def hash_arquivo(self, hash_arquivo):
+        self.__hash_arquivo = hash_arquivo
+
     @tipo_arq.setter
     def tipo_arq(self, tipo_arq):
         self.__tipo_arq = tipo_arq
@@ -176,6 +188,7 @@ class Lote:
         self.__tempo_fim = tempo_fim
         self.__documentos_ok = []  # Guarda os códigos dos documentos que foram pré-processados corretamente
         self.__documentos_erro = []  # Guarda os códigos dos documentos que não foram pré-processados por conta de erro
+        self.__tempos_etapas = {}  # Guarda, para cada etapa do pré-processamento, os tempos de cada documento
 
     # Obs.: Precisei criar esta propriedade para facilitar na serialização de objetos para gravação no Elasticsearch,
     #       pois se o nome da chave do dicionário começar com '_' (underscore), a mesma não é indexada para realização
@@ -191,7 +204,9 @@ class Lote:
                 'Lote__tempo_inicio': self.__tempo_inicio,
                 'Lote__tempo_fim': self.__tempo_fim,
                 'Lote__documentos_ok': self.__documentos_ok,
-                'Lote__documentos_erro': self.__documentos_erro}
+                'Lote__documentos_erro': self.__documentos_erro,
+                'Lote__tempos_etapas': self.__tempos_etapas,
+                'Lote__percentis_etapas': tms.resumir_tempos(self.__tempos_etapas)}
 
     @property
     def codigo(self):
@@ -217,6 +232,10 @@ class Lote:
     def documentos_erro(self):
         return self.__documentos_erro
 
+    @property
+    def tempos_etapas(self):
+        return self.__tempos_etapas
+
     @codigo.setter
     def codigo(self, codigo):
         self.__codigo_lote = codigo
@@ -241,6 +260,10 @@ class Lote:
     def documentos_erro(self, documentos_erro):
         self.__documentos_erro = documentos_erro
 
+    @tempos_etapas.setter
+    def tempos_etapas(self, tempos_etapas):
+        self.__tempos_etapas = tempos_etapas
+
     def inserir_documento(self, codigo_arq, status=1):
         """
             Insere um documento na lista de documentos OK ou na lista de documentos com erro,
@@ -253,6 +276,14 @@ class Lote:
         elif status == 0:
             self.__documentos_erro.append(codigo_arq)
 
+    def inserir_tempos(self, tempos):
+        """
+            Insere os tempos das etapas do pré-processamento de um documento
+                :param tempos: Dicionário contendo como chave a etapa e como valor o tempo em segundos
+        """
+        for etapa, tempo in tempos.items():
+            self.__tempos_etapas.setdefault(etapa, []).append(tempo)
+
     def obter_estatisticas(self):
         """
             Levanta as estatísticas do pré-processamento do lote
@@ -285,7 +316,8 @@ class Lote:
             taxa_erro = qtd_docs_erro / total_docs
 
         estatisticas = {'tempo_preproc': tempo_preproc, 'qtd_docs_ok': qtd_docs_ok, 'qtd_docs_erro': qtd_docs_erro,
-                        'total_docs': total_docs, 'taxa_ok': taxa_ok, 'taxa_erro': taxa_erro}
+                        'total_docs': total_docs, 'taxa_ok': taxa_ok, 'taxa_erro': taxa_erro,
+                        'percentis_etapas': tms.resumir_tempos(self.__tempos_etapas)}
 
         return estatisticas
 
@@ -307,6 +339,7 @@ class Resultado:
         self.__usuario_cadastrou = usuario_cadastrou
         self.__data_cadastro = data_cadastro  # Data de cadasto do arquivo no sistema
         self.__mensagens = []  # Mensagens diversas a cerca do pré-processamento/processamento
+        self.__tempos_etapas = {}  # Tempo em segundos de cada etapa do pré-processamento/processamento
 
     # Obs.: Precisei criar esta propriedade para facilitar na serialização de objetos para gravação no Elasticsearch,
     #       pois se o nome da chave do dicionário começar com '_' (underscore), a mesma não é indexada para realização
@@ -328,7 +361,8 @@ class Resultado:
                 'Resultado__url_web': self.__url_web,
                 'Resultado__usuario_cadastrou': self.__usuario_cadastrou,
                 'Resultado__data_cadastro': self.__data_cadastro,
-                'Resultado__mensagens': self.__mensagens}
+                'Resultado__mensagens': self.__mensagens,
+                'Resultado__tempos_etapas': self.__tempos_etapas}
 
     @property
     def tipo(self):
@@ -374,6 +408,10 @@ class Resultado:
     def mensagens(self):
         return self.__mensagens
 
+    @property
+    def tempos_etapas(self):
+        return self.__tempos_etapas
+
     @tipo.setter
     def tipo(self, tipo):
         self.__tipo = tipo
@@ -418,5 +456,9 @@ class Resultado:
     def mensagens(self, mensagens):
         self.__mensagens = mensagens
 
+    @tempos_etapas.setter
+    def tempos_etapas(self, tempos_etapas):
+        self.__tempos_etapas = tempos_etapas
+
     def inserir_mensagem(self, msg):
         self.__mensagens.append(msg)
@@ -3,7 +3,35 @@
 # ----------------------------------------------------------------
 
 from src.classes.persistencia.conectores.mongodb import ConectorMongoDb
-from src.ambiente.parametros_globais import UNDEFINED_DATABASE_TYPE
+from src.classes.persistencia.indices import INDICES_BANCOS
+from src.ambiente.parametros_globais import UNDEFINED_DATABASE_TYPE, VALUE_ERROR
+
+# Modos de busca das funções "buscar_um" e "buscar_todos":
+#   - exato: o atributo é igual ao valor;
+#   - prefixo: o atributo começa com o valor (sensível a maiúsculas/minúsculas);
+#   - regex: o atributo atende à expressão regular do valor, sem diferenciar maiúsculas/minúsculas;
+#   - lista: o atributo é igual a algum dos valores da lista;
+#   - fora_lista: o atributo não é igual a nenhum dos valores da lista (se o atributo for uma lista, nenhum dos seus
+#                 elementos);
+#   - tipo_escalar: o atributo é do tipo informado no valor (ex.: 'string') e não é uma lista, utilizado nas migrações
+#                   de dados.
+# Obs.: Nos modos 'exato' e 'lista', se o atributo for uma lista, basta que um dos seus elementos atenda ao critério
+MODOS_BUSCA = ['exato', 'prefixo', 'regex', 'lista', 'fora_lista', 'tipo_escalar']
+
+# Bancos de dados cujos índices já foram criados por este processo. A chave é (tipo, servidor, porta, banco)
+_bancos_indexados = set()
+
+
+def descartar_indices_criados(tipo, servidor, porta, bancos):
+    """
+    Informa que bancos de dados foram apagados, para que os seus índices sejam criados novamente na próxima conexão
+        :param tipo: Tipo do banco de dados (ex.: 'MongoDB')
+        :param servidor: Nome ou endereço do servidor
+        :param porta: Porta do servidor
+        :param bancos: Lista com os nomes dos bancos de dados apagados
+    """
+    for banco in bancos:
+        _bancos_indexados.discard((tipo, servidor, porta, banco))
 
 
 class ClienteGenerico:
@@ -14,6 +42,7 @@ class ClienteGenerico:
     def __init__(self, tipo, servidor, porta, banco=''):
         self.__bd = None
         self.__tipo = tipo
+        self.__banco = banco
 
         # Escolhe o tipo de conexão
         if self.__tipo == 'MongoDB':
@@ -23,9 +52,24 @@ class ClienteGenerico:
                   f"'classes.persistencia.cliente.ClienteGenerico'.\n")
             exit(UNDEFINED_DATABASE_TYPE)
 
+        # Garante os índices do banco somente na primeira conexão do processo a ele
+        chave_banco = (tipo, servidor, porta, banco)
+
+        if chave_banco not in _bancos_indexados:
+            self.criar_indices()
+            _bancos_indexados.add(chave_banco)
+
     def fechar_conexao(self):
         self.__bd.fechar_conexao()
 
+    def criar_indices(self):
+        """
+        Cria os índices do banco de dados definidos em INDICES_BANCOS (arquivo indices.py). Os índices que já existem
+        não são alterados
+            :return: Lista com os nomes dos índices do banco de dados no formato '<coleção>.<índice>'
+        """
+        return self.__bd.criar_indices(INDICES_BANCOS.get(self.__banco, {}))
+
     def inserir(self, destino, registo):
         """
         Insere um registro ou documento no banco de dados
@@ -37,25 +81,64 @@ class ClienteGenerico:
         else:
             print('O nome do destino não pode estar vazio!')
 
-    def buscar_um(self, origem, atributo, valor):
+    def inserir_lote(self, destino, registros):
+        """
+        Insere vários registros ou documentos no banco de dados numa única operação
+            :param destino: Tabela, coleção ou índice que receberá os novos dados
+            :param registros: Lista de objetos que serão inseridos
+            :return: Lista com as posições (em 'registros') dos objetos que não foram gravados por erro na gravação.
+            Obs.: Os demais objetos foram gravados
+        """
+        if destino == '':
+            print('O nome do destino não pode estar vazio!')
+        elif registros:
+            return self.__bd.inserir_lote(destino, registros)
+
+        return []
+
+    @staticmethod
+    def validar_modo_busca(modo):
+        """
+        Verifica se o modo de busca existe
+            :param modo: Modo de busca
+        """
+        if modo not in MODOS_BUSCA:
+            print(f"\nO modo de busca '{modo}' não existe! Opções: {MODOS_BUSCA}.\n")
+            exit(VALUE_ERROR)
+
+    def buscar_um(self, origem, atributo, valor, modo='regex', campos=None):
         """
         Busca um registro ou documento no banco de dados que atenda ao critério de busca
             :param origem: Tabela, coleção ou índice onde o dado será buscado
             :param atributo: Atributo que será pesquisado
-            :param valor: Valor do atributo que será pesquisado
+            :param valor: Valor do atributo que será pesquisado (lista de valores nos modos 'lista' e 'fora_lista')
+            :param modo: Modo de busca (ver MODOS_BUSCA; valor padrão 'regex'). Obs.: Os modos 'regex' e 'fora_lista'
+                         não utilizam os índices de forma eficiente
+            :param campos: Lista com os atributos que serão trazidos (notação com '.' para os atributos internos). Se
+                           não for informada, traz o documento inteiro
             :return: Documento buscado, se existir
         """
-        return self.__bd.buscar_um(origem, atributo, valor)
+        self.validar_modo_busca(modo)
 
-    def buscar_todos(self, origem, atributo, valor):
+        return self.__bd.buscar_um(origem, atributo, valor, modo, campos)
+
+    def buscar_todos(self, origem, atributo, valor, modo='regex', campos=None, tamanho_lote=0):
         """
         Busca todos os registros ou documentos no banco de dados que atendam ao critério de busca
             :param origem: Tabela, coleção ou índice onde o dado será buscado
             :param atributo: Atributo que será pesquisado
-            :param valor: Valor do atributo que será pesquisado
+            :param valor: Valor do atributo que será pesquisado (lista de valores nos modos 'lista' e 'fora_lista')
+            :param modo: Modo de busca (ver MODOS_BUSCA; valor padrão 'regex'). Obs.: Os modos 'regex' e 'fora_lista'
+                         não utilizam os índices de forma eficiente
+            :param campos: Lista com os atributos que serão trazidos (notação com '.' para os atributos internos). Se
+                           não for informada, traz o documento inteiro
+            :param tamanho_lote: Quantidade de documentos trazidos a cada ida ao banco durante a leitura do resultado.
+                                 Com o valor 0 utiliza o padrão do banco de dados
             :return: Documento(s) buscado(s), se existir(em)
         """
-        return self.__bd.buscar_todos(origem, atributo, valor)
+        self.validar_modo_busca(modo)
+
+        return self.__bd.buscar_todos(origem, atributo, valor, modo, campos, tamanho_lote)
 
     def excluir(self, origem, cod):
         """
@@ -65,6 +148,15 @@ class ClienteGenerico:
         """
         self.__bd.excluir(origem, cod)
 
+    def excluir_lote(self, origem, cods):
+        """
+        Exclui vários registros ou documentos no banco de dados numa única operação
+            :param origem: Tabela, coleção ou índice onde os dados serão excluídos
+            :param cods: Lista com os códigos dos registros ou documentos que serão excluídos
+        """
+        if cods:
+            self.__bd.excluir_lote(origem, cods)
+
     def alterar(self, origem, chave_buscar, valor_buscar, chave_alterar, valor_alterar):
         """
         Altera um registro ou documento no banco de dados
@@ -82,3 +174,105 @@ class ClienteGenerico:
                 return True
             else:
                 return False
+
+    def alterar_lote(self, origem, alteracoes):
+        """
+        Altera vários registros ou documentos no banco de dados numa única operação
+            :param origem: Tabela, coleção ou índice onde os dados serão alterados
+            :param alteracoes: Lista de tuplas (chave_buscar, valor_buscar, chave_alterar, valor_alterar), com os mesmos
+                               significados dos parâmetros da função "alterar"
+            :return: Quantidade de registros ou documentos alterados
+        """
+        if not alteracoes:
+            return 0
+
+        resultado = self.__bd.alterar_lote(origem, alteracoes)
+
+        if self.__tipo == 'MongoDB':
+            return resultado.modified_count
+
+    def acrescentar_lote(self, origem, chave_buscar, valores_buscar, chave_lista, valor):
+        """
+        Acrescenta um valor numa lista de todos os registros ou documentos buscados, numa única operação. Se o valor já
+        estiver na lista de um documento, ele não é repetido
+            :param origem: Tabela, coleção ou índice onde os dados serão alterados
+            :param chave_buscar: Chave que será utilizada para buscar os documentos a serem alterados
+            :param valores_buscar: Lista com os valores da chave de busca
+            :param chave_lista: Chave da lista que receberá o valor
+            :param valor: Valor que será acrescentado na lista
+            :return: Quantidade de registros ou documentos encontrados pela busca (inclusive os que já tinham o valor)
+        """
+        if not valores_buscar:
+            return 0
+
+        resultado = self.__bd.acrescentar_lote(origem, chave_buscar, valores_buscar, chave_lista, valor)
+
+        if self.__tipo == 'MongoDB':
+            return resultado.matched_count
+
+    def gravar_arquivo(self, bucket, nome, dados):
+        """
+        Grava um arquivo binário no armazenamento de arquivos do banco de dados (GridFS no MongoDB). Obs.: Utilizado
+        para conteúdos que não cabem ou não devem ficar dentro de um registro ou documento
+            :param bucket: Nome do agrupamento de arquivos
+            :param nome: Nome do arquivo
+            :param dados: Conteúdo do arquivo (bytes)
+            :return: Código do arquivo gravado
+        """
+        return self.__bd.gravar_arquivo(bucket, nome, dados)
+
+    def ler_arquivo(self, bucket, cod):
+        """
+        Lê um arquivo binário do armazenamento de arquivos do banco de dados (GridFS no MongoDB)
+            :param bucket: Nome do agrupamento de arquivos
+            :param cod: Código do arquivo, retornado pela função "gravar_arquivo"
+            :return: Conteúdo do arquivo (bytes), ou None se o arquivo não existir
+        """
+        return self.__bd.ler_arquivo(bucket, cod)
+
+    def excluir_arquivo(self, bucket, cod):
+        """
+        Exclui um arquivo binário do armazenamento de arquivos do banco de dados (GridFS no MongoDB)
+            :param bucket: Nome do agrupamento de arquivos
+            :param cod: Código do arquivo, retornado pela função "gravar_arquivo"
+        """
+        self.__bd.excluir_arquivo(bucket, cod)
+
+
+class BufferInsercao:
+    """
+    Acumula as inserções de um cliente e as grava em lotes, reduzindo a quantidade de operações no banco de dados.
+    Obs.: Os registros só são gravados quando o lote de um destino fica cheio ou quando "descarregar" é chamada
+    """
+    def __init__(self, cliente, tamanho_lote):
+        self.__cliente = cliente
+        self.__tamanho_lote = max(tamanho_lote, 1)
+        self.__pendentes = {}  # A chave é o destino e o valor é a lista de registros que ainda não foram gravados
+
+    def inserir(self, destino, registro):
+        """
+        Acumula um registro e grava o lote do destino se ele estiver cheio
+            :param destino: Tabela, coleção ou índice que receberá o novo dado
+            :param registro: Objeto que será inserido
+        """
+        pendentes = self.__pendentes.setdefault(destino, [])
+        pendentes.append(registro)
+
+        if len(pendentes) >= self.__tamanho_lote:
+            self.descarregar(destino)
+
+    def descarregar(self, destino=None):
+        """
+        Grava os registros acumulados
+            :param destino: Destino que será gravado. Se não for informado, grava todos os destinos
+        """
+        destinos = [destino] if destino is not None else list(self.__pendentes)
+
+        for d in destinos:
+            pendentes = self.__pendentes.pop(d, [])
+
+            if pendentes:
+                falhas = self.__cliente.inserir_lote(d, pendentes)
+
+                if falhas:
+                    print(f"\n  *> Erro ao gravar {len(falhas)} registro(s) em '{d}'!", end='')
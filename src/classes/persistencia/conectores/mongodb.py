@@ -2,20 +2,45 @@
 # Conector para acesso ao banco de dados MongoDB
 # ----------------------------------------------------------------
 
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure, OperationFailure
-from src.ambiente.parametros_globais import CONNECTION_ERROR
-
-
-class ConectorMongoDb:
+import os
+import re
+import atexit
+import threading
+from gridfs import GridFS
+from gridfs.errors import NoFile
+from pymongo import MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError, ConnectionFailure, OperationFailure, PyMongoError
+from src.ambiente.parametros_globais import CONNECTION_ERROR, MONGODB_TAMANHO_MAXIMO_POOL, \
+    MONGODB_TAMANHO_MINIMO_POOL, MONGODB_TEMPO_MAXIMO_CONEXAO_OCIOSA, MONGODB_FECHAR_CLIENTE_SEM_USO
+
+# Clientes compartilhados pelos conectores. A chave é (pid, servidor, porta) e o valor é uma lista com o MongoClient e a
+# quantidade de conectores que o utilizam. Obs.: O pid faz parte da chave porque o MongoClient não pode ser utilizado
+# depois de um fork, então cada processo cria o seu próprio cliente
+_clientes = {}
+_trava_clientes = threading.Lock()
+
+
+def obter_cliente(servidor, porta):
     """
-    Conector para o banco de dados MongoDB
+    Obtém o MongoClient compartilhado do servidor e porta informados. Cria o cliente (e testa a conexão) somente na
+    primeira vez em que é solicitado pelo processo
+        :param servidor: Nome ou endereço do servidor
+        :param porta: Porta do servidor
+        :return: MongoClient compartilhado
     """
-    def __init__(self, servidor, porta, banco):
-        self.__conexao = MongoClient(servidor, porta)
+    chave = (os.getpid(), servidor, porta)
+
+    with _trava_clientes:
+        if chave in _clientes:
+            _clientes[chave][1] += 1
+            return _clientes[chave][0]
+
+        cliente = MongoClient(servidor, porta, maxPoolSize=MONGODB_TAMANHO_MAXIMO_POOL,
+                              minPoolSize=MONGODB_TAMANHO_MINIMO_POOL,
+                              maxIdleTimeMS=MONGODB_TEMPO_MAXIMO_CONEXAO_OCIOSA)
 
         try:
-            self.__conexao.admin.command('ismaster')
+            cliente.admin.command('ismaster')
         except ConnectionFailure:
             print('\nErro ao conectar ao banco de dados MongoDB. Faça testes e verifique:')
             print('- se o nome do servidor está correto;')
@@ -23,38 +48,153 @@ class ConectorMongoDb:
             print('- se o banco está rodando e aceitando conexões.\n')
             exit(CONNECTION_ERROR)
 
+        _clientes[chave] = [cliente, 1]
+
+        return cliente
+
+
+def liberar_cliente(servidor, porta):
+    """
+    Informa que um conector deixou de utilizar o MongoClient compartilhado. O cliente só é fechado quando não é mais
+    utilizado por nenhum conector e se o parâmetro MONGODB_FECHAR_CLIENTE_SEM_USO for True
+        :param servidor: Nome ou endereço do servidor
+        :param porta: Porta do servidor
+    """
+    chave = (os.getpid(), servidor, porta)
+
+    with _trava_clientes:
+        if chave not in _clientes:
+            return
+
+        _clientes[chave][1] -= 1
+
+        if _clientes[chave][1] <= 0 and MONGODB_FECHAR_CLIENTE_SEM_USO:
+            fechar_cliente(_clientes.pop(chave)[0])
+
+
+def fechar_cliente(cliente):
+    """
+    Fecha um MongoClient e as conexões do seu pool
+        :param cliente: MongoClient que será fechado
+    """
+    try:
+        cliente.close()
+    except PyMongoError:
+        pass
+
+
+def fechar_clientes():
+    """
+    Fecha todos os MongoClient compartilhados do processo atual. Obs.: É executada automaticamente no fim do processo
+    """
+    pid = os.getpid()
+
+    with _trava_clientes:
+        for chave in [c for c in _clientes if c[0] == pid]:
+            fechar_cliente(_clientes.pop(chave)[0])
+
+
+atexit.register(fechar_clientes)
+
+
+class ConectorMongoDb:
+    """
+    Conector para o banco de dados MongoDB. Obs.: Os conectores do mesmo servidor e porta compartilham o mesmo
+    MongoClient (e o seu pool de conexões)
+    """
+    def __init__(self, servidor, porta, banco):
+        self.__servidor = servidor
+        self.__porta = porta
+        self.__conexao = obter_cliente(servidor, porta)
+        self.__aberta = True
+
         # Seta o banco onde os dados serão gravados. Obs.: Um mesmo banco de dados pode ter uma ou várias coleções
         self.__banco = self.__conexao[banco]
+        self.__gridfs = {}  # A chave é o nome do bucket do GridFS e o valor é o objeto GridFS
 
     def fechar_conexao(self):
-        pass
-        # self.__conexao.close() # Retirado porque estava dando erro no Windows!
+        # O cliente é compartilhado, por isso somente é liberado. Obs.: Fechar o cliente a cada conector estava dando
+        # erro no Windows!
+        if self.__aberta:
+            self.__aberta = False
+            liberar_cliente(self.__servidor, self.__porta)
+
+    def criar_indices(self, indices):
+        criados = []
+
+        for colecao, chaves in indices.items():
+            destino = self.__banco[colecao]
+
+            for chave in chaves:
+                # Se o índice já existir, o MongoDB não faz nada
+                try:
+                    criados.append(f"{colecao}.{destino.create_index(chave)}")
+                except OperationFailure as e:
+                    print(f"\nNão foi possível criar o índice da chave '{chave}' na coleção '{colecao}': {e}\n")
+
+        return criados
 
     def inserir(self, colecao, objeto):
         destino = self.__banco[colecao]  # Indica a coleção onde os dados serão gravados no banco setado anteriormente
         destino.insert_one(objeto)
 
+    def inserir_lote(self, colecao, objetos):
+        destino = self.__banco[colecao]
+
+        # Sem ordem, o servidor pode gravar os objetos em paralelo e não para no primeiro erro
+        try:
+            destino.insert_many(objetos, ordered=False)
+        except BulkWriteError as e:
+            # Somente os objetos com erro não foram gravados
+            return sorted({erro['index'] for erro in e.details.get('writeErrors', [])})
+
+        return []
+
     # ATENÇÃO:
     # É possível utilizar expressões regulares para realizar buscas utilizando as funções 'buscar_um' e 'buscar_todos'
-    # Mais detalhes consultar: https://stackoverflow.com/questions/20175122/how-can-i-use-not-like-operator-in-mongodb
-
-    def buscar_um(self, colecao, chave, valor):
+    # com o modo 'regex'. Mais detalhes consultar:
+    # https://stackoverflow.com/questions/20175122/how-can-i-use-not-like-operator-in-mongodb
+    # Obs.: Somente os modos 'exato', 'prefixo', 'lista' e 'tipo_escalar' utilizam os índices das coleções de forma
+    # eficiente. O modo 'fora_lista' ($nin) é pouco seletivo e, em geral, percorre o índice ou a coleção inteira
+
+    @staticmethod
+    def montar_filtro(chave, valor, modo):
+        if modo == 'exato':
+            return {chave: valor}
+        elif modo == 'prefixo':
+            # Prefixo ancorado e sensível a maiúsculas/minúsculas, para que a busca seja feita pelo índice
+            return {chave: {'$regex': '^' + re.escape(valor)}}
+        elif modo == 'lista':
+            return {chave: {'$in': list(valor)}}
+        elif modo == 'fora_lista':
+            return {chave: {'$nin': list(valor)}}
+        elif modo == 'tipo_escalar':
+            # O '$type' sozinho também atende às listas que têm algum elemento do tipo, por isso as listas são excluídas
+            return {chave: {'$type': valor, '$not': {'$type': 'array'}}}
+
+        return {chave: {'$regex': valor, '$options': 'i'}}
+
+    def buscar_um(self, colecao, chave, valor, modo='regex', campos=None):
         destino = self.__banco[colecao]
         resultado = None
 
         try:
-            resultado = destino.find_one({chave: {'$regex': valor, '$options': 'i'}})
+            resultado = destino.find_one(self.montar_filtro(chave, valor, modo), campos)
         except OperationFailure:
             print("\nExpressão regular inválida!\n")
 
         return resultado
 
-    def buscar_todos(self, colecao, chave, valor):
+    def buscar_todos(self, colecao, chave, valor, modo='regex', campos=None, tamanho_lote=0):
         destino = self.__banco[colecao]
         resultado = None
 
         try:
-            resultado = destino.find({chave: {'$regex': valor, '$options': 'i'}})
+            resultado = destino.find(self.montar_filtro(chave, valor, modo), campos)
+
+            # Quantidade de documentos trazidos do servidor a cada ida ao banco durante a leitura do cursor
+            if tamanho_lote > 0:
+                resultado = resultado.batch_size(tamanho_lote)
         except OperationFailure:
             print("\nExpressão regular inválida!\n")
 
@@ -64,6 +204,43 @@ class ConectorMongoDb:
         destino = self.__banco[colecao]
         destino.remove({"_id": cod})
 
+    def excluir_lote(self, colecao, cods):
+        destino = self.__banco[colecao]
+        destino.delete_many({"_id": {"$in": cods}})
+
     def alterar(self, colecao, chave_buscar, valor_buscar, chave_alterar, valor_alterar):
         destino = self.__banco[colecao]
         return destino.update_one({chave_buscar: valor_buscar}, {'$set': {chave_alterar: valor_alterar}})
+
+    def alterar_lote(self, colecao, alteracoes):
+        destino = self.__banco[colecao]
+        operacoes = [UpdateOne({chave_buscar: valor_buscar}, {'$set': {chave_alterar: valor_alterar}})
+                     for chave_buscar, valor_buscar, chave_alterar, valor_alterar in alteracoes]
+
+        return destino.bulk_write(operacoes, ordered=False)
+
+    def acrescentar_lote(self, colecao, chave_buscar, valores_buscar, chave_lista, valor):
+        destino = self.__banco[colecao]
+
+        # O '$addToSet' não repete o valor se ele já estiver na lista
+        return destino.update_many({chave_buscar: {'$in': list(valores_buscar)}}, {'$addToSet': {chave_lista: valor}})
+
+    def obter_gridfs(self, bucket):
+        if bucket not in self.__gridfs:
+            self.__gridfs[bucket] = GridFS(self.__banco, collection=bucket)
+
+        return self.__gridfs[bucket]
+
+    def gravar_arquivo(self, bucket, nome, dados):
+        return self.obter_gridfs(bucket).put(dados, filename=nome)
+
+    def ler_arquivo(self, bucket, cod):
+        try:
+            return self.obter_gridfs(bucket).get(cod).read()
+        except NoFile:
+            print(f"\nO arquivo '{cod}' não foi encontrado no GridFS (bucket '{bucket}')!\n")
+
+        return None
+
+    def excluir_arquivo(self, bucket, cod):
+        self.obter_gridfs(bucket).delete(cod)
@@ -0,0 +1,172 @@
+# ----------------------------------------------------------------
+# Funções para armazenar o conteúdo dos editais (dumpconteudo) no
+# banco de dados como texto, comprimido ou no GridFS, e para obtê-lo
+# de volta, descomprimindo somente quando as páginas forem utilizadas
+# ----------------------------------------------------------------
+import json
+import zlib
+from collections.abc import Sequence
+from src.classes.persistencia.cliente import ClienteGenerico
+from src.ambiente.parametros_globais import ARMAZENAMENTO_DUMPCONTEUDO, NIVEL_COMPRESSAO_DUMPCONTEUDO, VALUE_ERROR, \
+    FILE_NOT_FOUND_ERROR
+
+# Modos de armazenamento do conteúdo dos editais (ver o parâmetro ARMAZENAMENTO_DUMPCONTEUDO)
+MODOS_ARMAZENAMENTO = ['texto', 'comprimido', 'gridfs']
+
+# Chaves do documento do edital que guardam o conteúdo comprimido e a referência para o arquivo do GridFS. Obs.: Nos
+# modos 'comprimido' e 'gridfs' a chave 'Edital__dumpconteudo' é gravada com None
+CHAVE_DUMP_COMPRIMIDO = 'Edital__dumpconteudo_comprimido'
+CHAVE_DUMP_GRIDFS = 'Edital__dumpconteudo_gridfs'
+
+# Atributos que precisam ser trazidos nas buscas que utilizam o conteúdo do edital, em qualquer um dos modos
+CAMPOS_DUMPCONTEUDO = ['Edital__dumpconteudo', CHAVE_DUMP_COMPRIMIDO, CHAVE_DUMP_GRIDFS]
+
+# Bucket do GridFS onde os conteúdos dos editais são gravados (banco db_documentos)
+BUCKET_DUMPCONTEUDO = 'fs_dumpconteudo'
+
+
+class ConteudoPreguicoso(Sequence):
+    """
+    Lista de páginas do conteúdo de um edital que só é carregada (e descomprimida) no primeiro acesso às páginas. Pode
+    ser utilizada no lugar da lista de páginas (índices, fatias, len, for, etc.)
+    """
+    def __init__(self, carregar):
+        self.__carregar = carregar  # Função que retorna a lista de páginas
+        self.__paginas = None
+
+    @property
+    def __mydict__(self):
+        """
+            Permite a serialização do conteúdo (função "serializar") como uma lista de páginas
+                :return: Lista de páginas
+        """
+        return self.paginas
+
+    @property
+    def carregado(self):
+        return self.__paginas is not None
+
+    @property
+    def paginas(self):
+        if self.__paginas is None:
+            self.__paginas = self.__carregar()
+            self.__carregar = None
+
+        return self.__paginas
+
+    def __getitem__(self, item):
+        return self.paginas[item]
+
+    def __len__(self):
+        return len(self.paginas)
+
+    def __repr__(self):
+        if self.carregado:
+            return repr(self.__paginas)
+
+        return '<conteúdo ainda não carregado>'
+
+
+def comprimir_paginas(paginas):
+    """
+    Comprime as páginas do conteúdo de um edital
+        :param paginas: Lista com o conteúdo das páginas
+        :return: Páginas comprimidas (bytes)
+    """
+    return zlib.compress(json.dumps(paginas, ensure_ascii=False).encode('utf-8'), NIVEL_COMPRESSAO_DUMPCONTEUDO)
+
+
+def descomprimir_paginas(dados):
+    """
+    Descomprime as páginas do conteúdo de um edital
+        :param dados: Páginas comprimidas pela função "comprimir_paginas"
+        :return: Lista com o conteúdo das páginas
+    """
+    return json.loads(zlib.decompress(dados).decode('utf-8'))
+
+
+def ler_paginas_gridfs(cod):
+    """
+    Lê e descomprime as páginas do conteúdo de um edital gravado no GridFS
+        :param cod: Código do arquivo no GridFS
+        :return: Lista com o conteúdo das páginas
+    """
+    c_mongo_doc = ClienteGenerico('MongoDB', 'localhost', 27017, 'db_documentos')
+    dados = c_mongo_doc.ler_arquivo(BUCKET_DUMPCONTEUDO, cod)
+    c_mongo_doc.fechar_conexao()
+
+    if dados is None:
+        print("\nO conteúdo do edital não foi encontrado no GridFS. Revise a persistência de dados!\n")
+        exit(FILE_NOT_FOUND_ERROR)
+
+    return descomprimir_paginas(dados)
+
+
+def armazenar_dumpconteudo(edital_js, modo=ARMAZENAMENTO_DUMPCONTEUDO):
+    """
+    Prepara o conteúdo de um edital serializado para a gravação no banco de dados, de acordo com o modo de
+    armazenamento. Obs.: No modo 'gridfs' o conteúdo comprimido só é gravado no GridFS junto com o edital (função
+    "gravar_dumpconteudo_gridfs"), assim não ficam arquivos no GridFS de editais que não foram gravados
+        :param edital_js: Edital serializado (função "serializar"). É alterado pela função
+        :param modo: Modo de armazenamento (ver MODOS_ARMAZENAMENTO)
+        :return: O próprio edital serializado; conteúdo comprimido que será gravado no GridFS (None nos outros modos)
+    """
+    if modo not in MODOS_ARMAZENAMENTO:
+        print(f"\nO modo de armazenamento do conteúdo '{modo}' não existe! Opções: {MODOS_ARMAZENAMENTO}.\n")
+        exit(VALUE_ERROR)
+
+    paginas = edital_js.get('Edital__dumpconteudo')
+
+    if modo == 'texto' or paginas is None:
+        return edital_js, None
+
+    dados = comprimir_paginas(paginas)
+    edital_js['Edital__dumpconteudo'] = None
+
+    if modo == 'comprimido':
+        edital_js[CHAVE_DUMP_COMPRIMIDO] = dados
+        return edital_js, None
+
+    return edital_js, dados
+
+
+def gravar_dumpconteudo_gridfs(c_mongo_doc, edital_js, dados):
+    """
+    Grava no GridFS o conteúdo comprimido de um edital e guarda no edital a referência para o arquivo. Obs.: Deve ser
+    chamada imediatamente antes da gravação do edital
+        :param c_mongo_doc: Base de dados onde os editais são gravados
+        :param edital_js: Edital serializado, preparado pela função "armazenar_dumpconteudo". É alterado pela função
+        :param dados: Conteúdo comprimido retornado pela função "armazenar_dumpconteudo"
+    """
+    edital_js[CHAVE_DUMP_GRIDFS] = c_mongo_doc.gravar_arquivo(BUCKET_DUMPCONTEUDO, edital_js['Edital__codigo_arq'],
+                                                              dados)
+
+
+def excluir_dumpconteudo_gridfs(c_mongo_doc, edital_js):
+    """
+    Exclui do GridFS o conteúdo de um edital que não foi gravado, para que o arquivo não fique sem referência
+        :param c_mongo_doc: Base de dados onde os editais são gravados
+        :param edital_js: Edital serializado. Se o conteúdo não estiver no GridFS, não faz nada
+    """
+    cod = edital_js.pop(CHAVE_DUMP_GRIDFS, None)
+
+    if cod is not None:
+        c_mongo_doc.excluir_arquivo(BUCKET_DUMPCONTEUDO, cod)
+
+
+def obter_dumpconteudo(edital_js):
+    """
+    Obtém o conteúdo de um edital lido do banco de dados, gravado em qualquer um dos modos de armazenamento
+        :param edital_js: Edital lido do banco de dados (com os atributos de CAMPOS_DUMPCONTEUDO)
+        :return: Lista com o conteúdo das páginas. Nos modos 'comprimido' e 'gridfs' é um ConteudoPreguicoso, que só
+                 descomprime as páginas quando forem utilizadas
+    """
+    if edital_js.get(CHAVE_DUMP_COMPRIMIDO) is not None:
+        dados = edital_js[CHAVE_DUMP_COMPRIMIDO]
+        return ConteudoPreguicoso(lambda: descomprimir_paginas(dados))
+
+    if edital_js.get(CHAVE_DUMP_GRIDFS) is not None:
+        cod = edital_js[CHAVE_DUMP_GRIDFS]
+        return ConteudoPreguicoso(lambda: ler_paginas_gridfs(cod))
+
+    return edital_js.get('Edital__dumpconteudo')
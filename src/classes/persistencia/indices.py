@@ -0,0 +1,18 @@
+# ----------------------------------------------------------------
+# Índices das coleções dos bancos de dados. São criados pelo
+# ClienteGenerico na primeira conexão a cada banco de dados
+# ----------------------------------------------------------------
+
+# A chave é o banco de dados e o valor é um dicionário cuja chave é a coleção e o valor é a lista de chaves indexadas.
+# Obs.: Inclua aqui as chaves utilizadas nas buscas, senão cada busca percorre a coleção inteira
+INDICES_BANCOS = {
+    'db_documentos': {
+        'col_editais': ['Edital__codigo_arq']
+    },
+    'db_metadados': {
+        'col_metadados_docs': ['Documento__hash_md5', 'Documento__hash_arquivo', 'Documento__codigo_arq',
+                               'Documento__cod_processamento'],
+        'col_metadados_lotes': ['Lote__codigo_lote'],
+        'col_metadados_resultados': ['Resultado__codigo_lote', 'Resultado__codigo_arq']
+    }
+}
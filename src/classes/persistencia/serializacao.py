@@ -7,6 +7,7 @@ import json
 import datetime
 from src.classes.documentos import Edital, Secao, Subsecao
 from src.classes.metadados import Documento, Lote, Resultado
+from src.classes.persistencia.conteudo_edital import obter_dumpconteudo
 from src.ambiente.parametros_globais import INVALID_CONTENT, KEY_ERROR
 
 
@@ -25,10 +26,36 @@ def default_parser(obj):
         return str(obj)
 
 
-def serializar(obj):
+def default_parser_spans(obj):
+    """
+    Parser para conversão de objetos complexos em JSON que guarda os spans das descrições no lugar dos textos
+        :param obj: Objeto a ser convertido
+        :return: Objeto convertido
+    """
+    if hasattr(obj, "__mydict_spans__"):
+        return obj.__mydict_spans__
+
+    return default_parser(obj)
+
+
+def converter_cod_processamento(cod_processamento):
+    """
+    Converte os códigos de processamento do formato antigo, uma única string (ex.: 'a processar' ou
+    'ner, classificacao'), para a lista de códigos. Se já estiver no formato de lista, não altera
+        :param cod_processamento: Códigos de processamento no formato antigo ou no atual
+        :return: Lista com os códigos de processamento (vazia se o documento ainda não foi processado)
+    """
+    if not isinstance(cod_processamento, str):
+        return cod_processamento
+
+    return [c.strip() for c in cod_processamento.split(',') if c.strip() and c.strip() != 'a processar']
+
+
+def serializar(obj, com_spans=False):
     """
     Recebe o objeto e transforma em JSON
         :param obj: Objeto a ser serializado
+        :param com_spans: Se as seções e subseções que possuem span guardam o span no lugar do texto
         :return: Objeto convertido em JSON
     """
     if not obj:
@@ -36,7 +63,7 @@ def serializar(obj):
         exit(INVALID_CONTENT)
 
     # Transforma primeiro para string
-    obj_js_str = json.dumps(obj, default=default_parser)
+    obj_js_str = json.dumps(obj, default=default_parser_spans if com_spans else default_parser)
 
     # Transforma num dicionário
     obj_js = json.loads(obj_js_str)
@@ -67,7 +94,7 @@ def desserializar(result_dict):
             doc.nome = result_dict['Edital__nome']
             doc.codigo_arq = result_dict['Edital__codigo_arq']
             doc.codigo_lote = result_dict['Edital__codigo_lote']
-            doc.dumpconteudo = result_dict['Edital__dumpconteudo']
+            doc.dumpconteudo = obter_dumpconteudo(result_dict)  # Se estiver comprimido, só descomprime quando utilizar
             secoes_js = result_dict['Edital__secoes']
         except KeyError as ke:
             print(f"\nA chave {ke} não foi encontrada. Revise a persistência de dados!\n")
@@ -82,7 +109,13 @@ def desserializar(result_dict):
 
             try:
                 secao.numero = s['Secao__numero']
-                secao.titulo = s['Secao__titulo']
+
+                # O título pode ter sido guardado como span sobre o conteúdo do edital
+                if s.__contains__('Secao__span_titulo'):
+                    secao.definir_span_titulo(s['Secao__span_titulo'], doc.dumpconteudo)
+                else:
+                    secao.titulo = s['Secao__titulo']
+
                 secao.paginas = s['Secao__paginas']
                 subsecoes_js = s['Secao__subsecoes']
             except KeyError as ke:
@@ -96,7 +129,13 @@ def desserializar(result_dict):
 
                 try:
                     subsecao.numero = sub['Subsecao__numero']
-                    subsecao.descricao = sub['Subsecao__descricao']
+
+                    # A descrição pode ter sido guardada como span sobre o conteúdo do edital
+                    if sub.__contains__('Subsecao__span_descricao'):
+                        subsecao.definir_span_descricao(sub['Subsecao__span_descricao'], doc.dumpconteudo)
+                    else:
+                        subsecao.descricao = sub['Subsecao__descricao']
+
                     subsecao.pagina = sub['Subsecao__pagina']
                 except KeyError as ke:
                     print(f"\nA chave {ke} não foi encontrada. Revise a persistência de dados!\n")
@@ -121,12 +160,15 @@ def desserializar(result_dict):
             doc.data_cadastro = int(result_dict['Documento__data_cadastro'])
             doc.usuario_cadastrou = result_dict['Documento__usuario_cadastrou']
             doc.codigo_lote = result_dict['Documento__codigo_lote']
-            doc.cod_processamento = result_dict['Documento__cod_processamento']
+            doc.cod_processamento = converter_cod_processamento(result_dict['Documento__cod_processamento'])
             doc.nome_arq_original = result_dict['Documento__nome_arq_original']
             doc.url_web = result_dict['Documento__url_web']
             doc.caminho_base = result_dict['Documento__caminho_base']
             doc.caminho_relativo = result_dict['Documento__caminho_relativo']
             doc.head = result_dict['Documento__head']
+
+            # Os documentos persistidos antes da criação do hash dos bytes do arquivo não possuem essa chave
+            doc.hash_arquivo = result_dict.get('Documento__hash_arquivo', '')
         except KeyError as ke:
             print(f"\nA chave {ke} não foi encontrada. Revise a persistência de dados!\n")
             exit(KEY_ERROR)
@@ -141,6 +183,10 @@ def desserializar(result_dict):
             doc.tempo_fim = float(result_dict['Lote__tempo_fim'])
             doc.documentos_ok = result_dict['Lote__documentos_ok']
             doc.documentos_erro = result_dict['Lote__documentos_erro']
+
+            # Os lotes persistidos antes da medição do tempo das etapas não possuem essa chave. Os percentis
+            # ('Lote__percentis_etapas') são calculados a partir destes tempos
+            doc.tempos_etapas = result_dict.get('Lote__tempos_etapas', {})
         except KeyError as ke:
             print(f"\nA chave {ke} não foi encontrada. Revise a persistência de dados!\n")
             exit(KEY_ERROR)
@@ -160,6 +206,9 @@ def desserializar(result_dict):
             doc.usuario_cadastrou = result_dict['Resultado__usuario_cadastrou']
             doc.data_cadastro = int(result_dict['Resultado__data_cadastro'])
             doc.mensagens = result_dict['Resultado__mensagens']
+
+            # Os resultados persistidos antes da medição do tempo das etapas não possuem essa chave
+            doc.tempos_etapas = result_dict.get('Resultado__tempos_etapas', {})
         except KeyError as ke:
             print(f"\nA chave {ke} não foi encontrada. Revise a persistência de dados!\n")
             exit(KEY_ERROR)
@@ -3,24 +3,50 @@
 # ----------------------------------------------------------------
 
 import re
+from bisect import bisect_right
 from src.classes.documentos import Secao
 from src.classes.documentos import Subsecao
-import copy as cp
+from src.classes.documentos import TermosDocumento
+from src.classes.documentos import materializar_span
 
 
-def separar_em_termos(documento):
+def separar_pagina_em_termos(termos, pagina, texto):
+    """
+    Separa uma página do documento em termos e os insere no final dos termos do documento. Permite separar as páginas à
+    medida que são extraídas
+        :param termos: Objeto contendo os termos do documento (TermosDocumento)
+        :param pagina: Número da página
+        :param texto: Conteúdo da página
+    """
+    termos_pagina = texto.split()
+    posicoes = None
+
+    if termos.posicoes is not None:
+        posicoes = []
+        posicao = 0
+
+        # Entre um termo e o próximo só existem espaços, por isso a primeira ocorrência do termo a partir do fim do
+        # termo anterior é a posição dele
+        for termo in termos_pagina:
+            posicao = texto.find(termo, posicao)
+            posicoes.append(posicao)
+            posicao += len(termo)
+
+    termos.inserir_termos(termos_pagina, pagina, posicoes)
+
+
+def separar_em_termos(documento, com_posicoes=False):
     """
     Separa o documento em termos (palavras, números, etc.)
         :param documento: Edital lido
-        :return: Lista contendo listas com os termos do documento e suas respectivas páginas
+        :param com_posicoes: Se guarda a posição de cada termo no conteúdo da sua página (necessário para representar as
+                             descrições como spans)
+        :return: Objeto contendo os termos do documento e suas respectivas páginas
     """
-    termos = []
+    termos = TermosDocumento(com_posicoes)
 
     for pagina, texto in documento.items():
-        termos_aux = texto.split()
-
-        for termo in termos_aux:
-            termos.append([termo, pagina])
+        separar_pagina_em_termos(termos, pagina, texto)
 
     return termos
 
@@ -41,7 +67,7 @@ def separar_secao(secao_candidata, termo):
     """
     Verifica se o texto começa com uma provável seção e a separa, se for o caso
         :param secao_candidata: Seção candidata a ser avaliada
-        :param termo: Termo a ser avaliado
+        :param termo: Termo a ser avaliado (termo e página onde ele se encontra)
         :return: Uma lista com o texto separado da seção candidata e a página onde ele se encontra; ou uma lista
         vazia, se não for possível separar o termo da seção candidata
     """
@@ -75,13 +101,22 @@ def encontrar_secoes_candidatas(termos):
     >> Obs.: Esta função causa um efeito colateral, pois a lista de termos pode ser alterada caso possua um termo que
     tem uma seção candidata com um texto grudado nela (ex.: 2.1.termo_grudado).
         :param termos: Todos os termos encontrados no documento
-        :return: Lista contendo os termos que podem representar uma seção
+        :return: Lista contendo os termos que podem representar uma seção. Cada seção candidata é uma lista com o termo,
+        a página e a posição do termo no documento
     """
     secoes_candidatas = []
-    inserir_em_termos = []  # Armazena os textos que estavam grudados no final de uma seção candidata
+
+    # Os termos são reconstruídos numa única passada, com os textos que estavam grudados no final de uma seção candidata
+    # logo após a seção. Obs.: Inserir os textos nos termos originais deslocaria todos os termos seguintes a cada
+    # inserção
+    posicoes = termos.posicoes
+    novos_termos = TermosDocumento(posicoes is not None)
 
     for indice, t in enumerate(termos):  # t[0] = Termo; t[1] = Página do documento onde o termo se encontra
         validado = False
+        texto_separado = []
+        posicao = posicoes[indice] if posicoes is not None else 0  # Posição do termo no conteúdo da página
+
         # Se tiver um ou mais itens numerados no termo, receberá uma lista de strings contendo estes itens, como por
         # exemplo: ['1.1', '1.1.2']; ['2.3.4.2']; ['2020', '2019.', '00', '0.']; etc.
         secao_cand = encontrar_itens_numerados(t[0])
@@ -94,25 +129,25 @@ def encontrar_secoes_candidatas(termos):
             else:
                 texto_separado = separar_secao(secao_cand[0], t)
 
-                # Se havia texto grudado na seção candidata e esta é válida
+                # Se havia texto grudado na seção candidata e esta é válida, troca o termo pela seção candidata sem o
+                # texto grudado
                 if texto_separado:
-                    # Guarda o novo termo para inserir na lista de termos do documento logo após a seção candidata
-                    inserir_em_termos.append([indice + 1, texto_separado])
-
-                    # >>AVISO: A atribuição abaixo causa um efeito colateral, pois a lista de termos será alterada!!!
-                    # Altera o termo da lista de termos com a seção candidata sem o termo grudado
-                    termos[indice] = [secao_cand[0], t[1]]  # t[1] = página onde a seção se encontra
-
+                    t = (secao_cand[0], t[1])  # t[1] = página onde a seção se encontra
                     validado = True
 
         if validado:
-            secoes_candidatas.append(termos[indice])
+            secoes_candidatas.append([t[0], t[1], len(novos_termos)])
 
-    # Caso existam, inserem os novos termos na lista de termos
-    for termo_novo in inserir_em_termos:
-        # termo_novo[0] = Índice da lista de termos onde o novo termo será inserido
-        # termo_novo[1] = Lista contendo o termo e a página onde ele se encontra no documento
-        termos.insert(termo_novo[0], termo_novo[1])
+        novos_termos.inserir_termo(t[0], t[1], posicao)
+
+        # Guarda o texto que estava grudado na seção candidata logo após ela
+        if texto_separado:
+            novos_termos.inserir_termo(texto_separado[0], texto_separado[1], posicao + len(t[0]))
+
+    # >>AVISO: As atribuições abaixo causam um efeito colateral, pois os termos do documento serão alterados!!!
+    termos.termos = novos_termos.termos
+    termos.paginas = novos_termos.paginas
+    termos.posicoes = novos_termos.posicoes
 
     return secoes_candidatas
 
@@ -222,80 +257,174 @@ def extrair_secoes(secoes_candidatas):
     return secoes_extraidas
 
 
-def extrair_descricao(secao_inicial, secao_final, termos):
+def indexar_termos(termos):
     """
-    Extrai a descrição entre duas seções/subseções
+    Cria um índice com as posições de cada termo do documento
+        :param termos: Objeto contendo os termos do documento e suas respectivas páginas
+        :return: Dicionário contendo como chave uma tupla (termo, página) e como valor a lista, em ordem crescente, das
+        posições onde o termo se encontra no documento
+    """
+    indice_termos = {}
+
+    for posicao, t in enumerate(termos):  # t[0] = Termo; t[1] = Página do documento onde o termo se encontra
+        indice_termos.setdefault(t, []).append(posicao)
+
+    return indice_termos
+
+
+def obter_posicoes(secao, indice_termos, descricoes):
+    """
+    Obtém as posições do documento onde estão os termos equivalentes à seção informada
+        :param secao: Seção procurada (lista com o termo, a página, a posição e, se já foi preenchida, a descrição)
+        :param indice_termos: Índice criado pela função "indexar_termos" para os termos do documento
+        :param descricoes: Dicionário com as descrições já preenchidas, tendo como chave a posição da seção
+        :return: Lista, em ordem crescente, com as posições dos termos equivalentes à seção
+    """
+    posicoes = indice_termos.get((secao[0], secao[1]), [])
+
+    # Obs.: Uma seção que já recebeu a descrição só é equivalente aos termos com a mesma descrição e uma seção sem
+    # descrição só é equivalente aos termos que ainda não receberam descrição. Mantém o mesmo resultado de quando os
+    # termos eram listas e as seções eram comparadas com 'termos.index' e 'termos.count'
+    if len(secao) > 3:
+        return [p for p in posicoes if p in descricoes and descricoes[p] == secao[3]]
+    else:
+        return [p for p in posicoes if p not in descricoes]
+
+
+def obter_intervalo_descricao(secao_inicial, secao_final, termos, indice_termos, descricoes):
+    """
+    Obtém o intervalo dos termos que formam a descrição entre duas seções/subseções
         :param secao_inicial: A seção/subseção a qual a descrição pertence
         :param secao_final: A seção/subseção que indicará o fim da descrição
         :param termos: Texto de onde a descrição será extraída
-        :return: Descrição extraida do texto
+        :param indice_termos: Índice das posições dos termos (função "indexar_termos")
+        :param descricoes: Dicionário com as descrições já preenchidas, tendo como chave a posição da seção
+        :return: Posição do primeiro termo da descrição e posição seguinte à do último termo da descrição
     """
     qtd_maxima_termos_ultima_secao = 300  # Quantos termos serão lidos caso seja a última seção do documento
-    descricao = []
+    quantidade_maxima_termos_lidos = 300  # Quantos termos serão lidos procurando outras ocorrências da seção final
 
     # Pega o índice da primeira ocorrência da seção inicial no texto
-    index_secao_inicial = termos.index(secao_inicial)
-
-    index_secao_final = []
+    index_secao_inicial = obter_posicoes(secao_inicial, indice_termos, descricoes)[0]
 
     # Se a seção não é a última do documento
     if secao_final != '-1.':
-        # Caso no texto existam mais de uma ocorrência da seção final, pega os índices das primeiras
-        # 'quantidade_maxima_termos_lidos' ocorrências
-        if termos.count(secao_final) > 1:
-            quantidade_termos_lidos = 0
-            quantidade_maxima_termos_lidos = 300
-
-            # Começa na primeira ocorrência e vai até o final da lista de termos ou até atingir o limite máximo
-            # de termos lidos
-            for i in range(termos.index(secao_final), len(termos)):
-                if secao_final == termos[i]:
-                    index_secao_final.append(i)
-
-                quantidade_termos_lidos += 1
-
-                if quantidade_termos_lidos > quantidade_maxima_termos_lidos:
-                    break
-        else:
-            index_secao_final.append(termos.index(secao_final))
+        # Caso no texto existam mais de uma ocorrência da seção final, pega o índice da última ocorrência entre a
+        # primeira ocorrência e os 'quantidade_maxima_termos_lidos' termos seguintes
+        posicoes_secao_final = obter_posicoes(secao_final, indice_termos, descricoes)
+        limite = posicoes_secao_final[0] + quantidade_maxima_termos_lidos
+        index_secao_final = posicoes_secao_final[bisect_right(posicoes_secao_final, limite) - 1]
     else:
         # Escolhe quantos termos serão lidos caso a seção/subseção seja a última do edital
-        index_secao_final.append(min(len(termos), qtd_maxima_termos_ultima_secao))
+        index_secao_final = min(len(termos), qtd_maxima_termos_ultima_secao)
+
+    # A descrição é formada por todos os termos entre a primeira ocorrência da seção inicial e a última ocorrência da
+    # seção final
+    return index_secao_inicial + 1, index_secao_final
 
-    # Pega todos os termos entre a primeira ocorrência da seção inicial e a última ocorrência da seção final
-    for i in range(index_secao_inicial + 1, max(index_secao_final)):
-        descricao.append(termos[i][0])  # termos[i][0] = Termo; termos[i][1] = Pág do documento onde o termo se encontra
 
-    return ' '.join(descricao)
+def extrair_descricao(secao_inicial, secao_final, termos, indice_termos=None, descricoes=None):
+    """
+    Extrai a descrição entre duas seções/subseções
+        :param secao_inicial: A seção/subseção a qual a descrição pertence
+        :param secao_final: A seção/subseção que indicará o fim da descrição
+        :param termos: Texto de onde a descrição será extraída
+        :param indice_termos: Índice das posições dos termos (função "indexar_termos"). Se não for informado, é criado
+                              a cada chamada
+        :param descricoes: Dicionário com as descrições já preenchidas, tendo como chave a posição da seção
+        :return: Descrição extraida do texto
+    """
+    if indice_termos is None:
+        indice_termos = indexar_termos(termos)
+
+    if descricoes is None:
+        descricoes = {}
+
+    inicio, fim = obter_intervalo_descricao(secao_inicial, secao_final, termos, indice_termos, descricoes)
+
+    return ' '.join(termos.termos[inicio:fim])
+
+
+def gerar_span(termos, inicio, fim):
+    """
+    Gera o span, no conteúdo das páginas do documento, de um intervalo de termos
+        :param termos: Objeto contendo os termos do documento com as suas posições
+        :param inicio: Posição do primeiro termo do intervalo
+        :param fim: Posição seguinte à do último termo do intervalo
+        :return: Lista com a página inicial, a posição inicial, a página final e a posição final do texto; ou None se o
+        intervalo estiver vazio
+    """
+    if inicio >= fim:
+        return None
+
+    ultimo = fim - 1
+
+    return [termos.paginas[inicio], termos.posicoes[inicio],
+            termos.paginas[ultimo], termos.posicoes[ultimo] + len(termos.termos[ultimo])]
 
 
 def preencher_descricao(secoes_extraidas, termos_no_doc):
     """
-    Preenche as descrições das seções extraídas com base no documento
+    Preenche as descrições das seções extraídas com base no documento.
+    Obs.: Se os termos tiverem as suas posições, também preenche o span de cada descrição
         :param secoes_extraidas: Seções extraídas que receberão as descrições
         :param termos_no_doc: Termos extraídos do Edital de compras lido
     """
     secao_inicial = None
+    com_spans = termos_no_doc.posicoes is not None
+
+    # As posições dos termos não mudam durante o preenchimento, por isso o índice é criado uma única vez
+    indice_termos = indexar_termos(termos_no_doc)
+    descricoes = {}  # Descrições já preenchidas, tendo como chave a posição da seção no documento
 
     for i in range(len(secoes_extraidas) - 1):
         secao_inicial = secoes_extraidas[i]
         secao_final = secoes_extraidas[i+1]
 
+        inicio, fim = obter_intervalo_descricao(secao_inicial, secao_final, termos_no_doc, indice_termos, descricoes)
+        descricao = ' '.join(termos_no_doc.termos[inicio:fim])
+        descricoes[secao_inicial[2]] = descricao  # secao_inicial[2] = Posição da seção no documento
+
         # >>AVISO: A inserção abaixo causa um efeito colateral:
         # Os elementos da lista de seções candidatas serão alterados!!!
-        secao_inicial.append(extrair_descricao(secao_inicial, secao_final, termos_no_doc))
+        secao_inicial.append(descricao)
+
+        if com_spans:
+            secao_inicial.append(gerar_span(termos_no_doc, inicio, fim))
 
     if secao_inicial:
         # Preenche a última seção da lista de seções extraídas
-        secoes_extraidas[-1].append(extrair_descricao(secao_inicial, '-1.', termos_no_doc))
+        inicio, fim = obter_intervalo_descricao(secao_inicial, '-1.', termos_no_doc, indice_termos, descricoes)
+        secoes_extraidas[-1].append(' '.join(termos_no_doc.termos[inicio:fim]))
+
+        if com_spans:
+            secoes_extraidas[-1].append(gerar_span(termos_no_doc, inicio, fim))
     elif len(secoes_extraidas) == 1:
         secoes_extraidas[0].append('')  # Evita erro de índice na função "agrupar_secoes"
 
 
-def agrupar_secoes(secoes_extraidas):
+def validar_span(secao, paginas_documento):
+    """
+    Verifica se a seção extraída possui um span equivalente à sua descrição
+        :param secao: Seção extraída (termo, página, posição, descrição e, se houver, o span da descrição)
+        :param paginas_documento: Lista com o conteúdo das páginas do documento (dumpconteudo do edital)
+        :return: True se o texto do span for idêntico à descrição
+    """
+    # Obs.: O texto do span pode ser diferente da descrição, por exemplo, quando a descrição passa por uma página em
+    # branco ou a página tem espaços seguidos. Nesses casos, a descrição continua sendo guardada como texto
+    if paginas_documento is None or len(secao) < 5 or secao[4] is None:
+        return False
+
+    return materializar_span(paginas_documento, secao[4]) == secao[3]
+
+
+def agrupar_secoes(secoes_extraidas, paginas_documento=None):
     """
     Agrupa as seções e cria um objeto para cada seção agrupada
         :param secoes_extraidas: Seções que foram extraídas do documento
+        :param paginas_documento: Lista com o conteúdo das páginas do documento (dumpconteudo do edital). Se informada,
+                                  os títulos e as descrições que possuem span não são guardados como texto, e sim
+                                  obtidos do conteúdo das páginas quando forem utilizados
         :return: Lista contendo as seções agrupadas
     """
     # Permite agrupar a partir da seção que está na posição 0 da primeira lista de seções extraídas
@@ -311,19 +440,32 @@ def agrupar_secoes(secoes_extraidas):
         secao_atual = s[0].split('.')
 
         # Se for uma nova seção, instancia e inicializa um objeto para esta seção
+        # Obs.: Cada seção e subseção é um objeto novo que não é alterado depois de entregue, por isso não precisa ser
+        # copiado
         if secao_atual[0] != ultima_secao_lida:
             if ultima_secao_lida != '0':
-                secoes_agrupadas.append(cp.deepcopy(secao))
+                secoes_agrupadas.append(secao)
 
             ultima_secao_lida = secao_atual[0]
             secao = Secao(s[0] + ' ')  # Para evitar erro na hora de criar o mapeamento ao salvar no Elasticsearch
-            secao.titulo = s[2]
+
+            # s[0] = Seção; s[1] = Página; s[2] = Posição no documento; s[3] = Descrição; s[4] = Span da descrição
+            if validar_span(s, paginas_documento):
+                secao.definir_span_titulo(s[4], paginas_documento)
+            else:
+                secao.titulo = s[3]
+
             secao.inserir_pagina(s[1])
         else:  # Senão, atualiza a lista de subseções do objeto que contém a seção
             subsecao = Subsecao(s[0] + ' ')  # Para evitar erro na hora de criar o mapeamento ao salvar no Elasticsearch
-            subsecao.descricao = s[2]
+
+            if validar_span(s, paginas_documento):
+                subsecao.definir_span_descricao(s[4], paginas_documento)
+            else:
+                subsecao.descricao = s[3]
+
             subsecao.pagina = s[1]
-            secao.inserir_subsecao(cp.deepcopy(subsecao))
+            secao.inserir_subsecao(subsecao)
 
             if s[1] not in secao.paginas:
                 secao.inserir_pagina(s[1])
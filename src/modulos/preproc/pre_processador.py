@@ -3,16 +3,24 @@
 # ----------------------------------------------------------------
 import time
 import src.utils.pdf as pdf
+import src.utils.cache_extracao as cache
+import src.utils.supervisor as sup
+import src.utils.tempos as tms
 import src.modulos.preproc.extrator as ext
 import src.utils.geradores as ger
 import src.classes.persistencia.serializacao as ser
 import os
 import shutil
-from src.classes.documentos import Edital
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from src.classes.documentos import Edital, TermosDocumento
 from src.classes.metadados import Lote, Resultado
-from src.classes.persistencia.cliente import ClienteGenerico
+from src.classes.persistencia.cliente import ClienteGenerico, BufferInsercao
+from src.classes.persistencia.conteudo_edital import armazenar_dumpconteudo, gravar_dumpconteudo_gridfs, \
+    excluir_dumpconteudo_gridfs
 from src.classes.persistencia.dump_arq import descarregar_conteudo
-from src.ambiente.parametros_globais import FILE_NOT_FOUND_ERROR, PERMISSION_ERROR, CREATE_METADATA_ERROR, TIMEOUT_ERROR
+from src.ambiente.parametros_globais import FILE_NOT_FOUND_ERROR, PERMISSION_ERROR, CREATE_METADATA_ERROR, \
+    TIMEOUT_ERROR, DESCRICOES_COMO_SPANS, LEITURAS_EM_ANDAMENTO_POR_PROCESSO
 
 
 def preparar_arquivo(caminho_entrada, nome, url_web, usuario, data_cadastro):
@@ -63,7 +71,8 @@ def preparar_arquivo(caminho_entrada, nome, url_web, usuario, data_cadastro):
     arq_metadado_aux.close()
 
 
-def ler_arquivo(caminho, nome, codigo_arq, codigo_lote, tipo):
+def ler_arquivo(caminho, nome, codigo_arq, codigo_lote, tipo, qtd_processos_paginas=1, caminho_cache_extracao='',
+                tamanho_maximo_cache_extracao=0, tempos=None, hash_arquivo=''):
     """
     Lê um arquivo e processa seu conteúdo. Obs.: Se for um edital separa em seções.
         :param caminho: Caminho do arquivo
@@ -71,29 +80,190 @@ def ler_arquivo(caminho, nome, codigo_arq, codigo_lote, tipo):
         :param codigo_arq: Código do arquivo
         :param codigo_lote: Código do lote onde o arquivo está sendo processado
         :param tipo: Tipo do documento que será lido ('EDITAL', etc.)
+        :param qtd_processos_paginas: Quantidade de processos utilizados para extrair as páginas do arquivo em paralelo
+        :param caminho_cache_extracao: Pasta do cache da extração dos arquivos
+        :param tamanho_maximo_cache_extracao: Tamanho máximo do cache da extração em bytes. Com o valor 0 o cache não é
+                                              utilizado
+        :param tempos: Se fornecido, dicionário onde são somados os tempos das etapas 'extrair', 'validar' e
+                       'seccionar' da leitura (ver src.utils.tempos)
+        :param hash_arquivo: Hash dos bytes do arquivo, se já foi calculado. É utilizado como chave do cache da
+                             extração, sem ler o arquivo novamente
         :return: Objeto contendo os dados do arquivo separados por seções e um dump do seu conteúdo; 
         se o documento foi extraido e validado; resultado da validação
     """
     documento_lido = None
-    doc, validado, relatorio = pdf.ler_pdf(caminho)
+    extracao = None
+    chave_cache = None
+    termos_no_doc = None
+
+    if tempos is None:
+        tempos = {}
+
+    inicio_extracao = time.perf_counter()
+    tempo_validacao = 0.0
+    tempo_termos = 0.0  # A separação em termos é feita durante a extração, mas faz parte da separação em seções
+
+    # Um arquivo com os mesmos bytes já extraído anteriormente não precisa ser extraído novamente
+    if caminho_cache_extracao and tamanho_maximo_cache_extracao > 0:
+        chave_cache = cache.gerar_chave_cache(caminho, hash_arquivo)
+
+        if chave_cache:
+            extracao = cache.obter_extracao(caminho_cache_extracao, chave_cache)
+
+    if extracao:
+        doc, validado, relatorio = extracao
+    else:
+        doc = {}
+        validacao = pdf.iniciar_validacao(0)
+
+        if tipo == 'EDITAL':
+            termos_no_doc = TermosDocumento(DESCRICOES_COMO_SPANS)
+
+        # Extrai, limpa, valida e separa em termos uma página por vez
+        for num_pagina, pagina in pdf.gerar_paginas_pdf(caminho, validacao, qtd_processos_paginas):
+            doc[num_pagina] = pagina
+
+            if termos_no_doc is not None:
+                inicio_termos = time.perf_counter()
+                ext.separar_pagina_em_termos(termos_no_doc, num_pagina, pagina)
+                tempo_termos += time.perf_counter() - inicio_termos
+
+        tempo_validacao = validacao['tempo_validacao']
+
+        if validacao['concluida']:
+            validado, relatorio = pdf.gerar_relatorio_validacao(validacao)
+        else:
+            # O PyPDF2 não conseguiu extrair ou validar o documento. Completa a leitura a partir da página onde parou,
+            # tentando também com o pdfminer. Obs.: Nesse caso a validação da nova leitura é contada no tempo da
+            # extração
+            doc, validado, relatorio = pdf.ler_pdf(caminho, qtd_processos_paginas, paginas_extraidas=doc,
+                                                   pagina_interrompida=validacao.get('pagina_interrompida'))
+            termos_no_doc = None
+
+        # Só guarda no cache se conseguiu abrir o arquivo, pois os erros de abertura não dependem do conteúdo dele
+        if chave_cache and relatorio is not None:
+            cache.guardar_extracao(caminho_cache_extracao, chave_cache, doc, validado, relatorio,
+                                   tamanho_maximo_cache_extracao)
+
+    tms.acumular_tempo(tempos, 'extrair', time.perf_counter() - inicio_extracao - tempo_validacao - tempo_termos)
+    tms.acumular_tempo(tempos, 'validar', tempo_validacao)
 
     if doc:
         dump_conteudo = list(doc.values())  # Faz um dump do conteúdo do edital sem separação por seções
 
         if tipo == 'EDITAL':
-            # Extrai as seções e subseções do edital
-            termos_no_doc = ext.separar_em_termos(doc)
-            sec_cand = ext.encontrar_secoes_candidatas(termos_no_doc)
-            sec_extraidas = ext.extrair_secoes(sec_cand)
-            ext.preencher_descricao(sec_extraidas, termos_no_doc)
-            secoes_agrupadas = ext.agrupar_secoes(sec_extraidas)
+            with tms.medir_etapa(tempos, 'seccionar'):
+                # Extrai as seções e subseções do edital
+                if termos_no_doc is None:
+                    termos_no_doc = ext.separar_em_termos(doc, DESCRICOES_COMO_SPANS)
+
+                sec_cand = ext.encontrar_secoes_candidatas(termos_no_doc)
+                sec_extraidas = ext.extrair_secoes(sec_cand)
+                ext.preencher_descricao(sec_extraidas, termos_no_doc)
+                secoes_agrupadas = ext.agrupar_secoes(sec_extraidas,
+                                                      dump_conteudo if DESCRICOES_COMO_SPANS else None)
 
-            # Cria o objeto com os dados do documento lido
-            documento_lido = Edital(nome, codigo_arq, codigo_lote, secoes_agrupadas, dump_conteudo)
+                # Cria o objeto com os dados do documento lido
+                documento_lido = Edital(nome, codigo_arq, codigo_lote, secoes_agrupadas, dump_conteudo)
+
+    if tempo_termos > 0:
+        tms.acumular_tempo(tempos, 'seccionar', tempo_termos)
 
     return documento_lido, validado, relatorio
 
 
+def ler_gerar_metadados_arquivo(caminho_arq, nome, codigo_lote, metadados, qtd_processos_paginas=1,
+                                caminho_cache_extracao='', tamanho_maximo_cache_extracao=0):
+    """
+    Lê um arquivo e gera os metadados do documento lido.
+    Obs.: Não acessa o banco de dados nem movimenta os arquivos, por isso pode ser executada em outro processo
+        :param caminho_arq: Caminho do arquivo
+        :param nome: Nome do arquivo
+        :param codigo_lote: Código do lote onde o arquivo está sendo processado
+        :param metadados: Dicionário contendo os metadados do arquivo. Obs.: Se contiver o hash dos bytes do arquivo
+                          ('hash_arquivo'), ele é utilizado como chave do cache da extração
+        :param qtd_processos_paginas: Quantidade de processos utilizados para extrair as páginas do arquivo em paralelo
+        :param caminho_cache_extracao: Pasta do cache da extração dos arquivos
+        :param tamanho_maximo_cache_extracao: Tamanho máximo do cache da extração em bytes. Com o valor 0 o cache não é
+                                              utilizado
+        :return: Objeto contendo os dados do arquivo; se o documento foi extraido e validado; resultado da validação;
+        objeto contendo os metadados do documento (None se o documento não foi validado); dicionário com os tempos das
+        etapas da leitura
+    """
+    doc_meta = None
+    tempos = {}
+    doc, validado, relatorio = ler_arquivo(caminho_arq, nome, metadados['codigo_arq'], codigo_lote, metadados['tipo'],
+                                           qtd_processos_paginas, caminho_cache_extracao, tamanho_maximo_cache_extracao,
+                                           tempos, metadados.get('hash_arquivo', ''))
+
+    if validado:
+        # A geração dos metadados é dominada pelo hash do conteúdo extraído
+        with tms.medir_etapa(tempos, 'hash'):
+            doc_meta = ger.gerar_metadados_doc(codigo_lote, metadados, doc)
+
+    return doc, validado, relatorio, doc_meta, tempos
+
+
+def ler_gerar_metadados_arquivo_supervisionado(caminho_arq, nome, codigo_lote, metadados, qtd_processos_paginas=1,
+                                               caminho_cache_extracao='', tamanho_maximo_cache_extracao=0,
+                                               tempo_maximo_leitura=0, memoria_maxima_leitura=0):
+    """
+    Executa a função "ler_gerar_metadados_arquivo" num processo supervisionado, que é encerrado se a leitura do arquivo
+    ultrapassar o tempo máximo ou a memória máxima. Obs.: Evita que um arquivo mal formado trave o lote inteiro
+        :param caminho_arq: Caminho do arquivo
+        :param nome: Nome do arquivo
+        :param codigo_lote: Código do lote onde o arquivo está sendo processado
+        :param metadados: Dicionário contendo os metadados do arquivo
+        :param qtd_processos_paginas: Quantidade de processos utilizados para extrair as páginas do arquivo em paralelo
+        :param caminho_cache_extracao: Pasta do cache da extração dos arquivos
+        :param tamanho_maximo_cache_extracao: Tamanho máximo do cache da extração em bytes. Com o valor 0 o cache não é
+                                              utilizado
+        :param tempo_maximo_leitura: Tempo máximo da leitura do arquivo em segundos. Com o valor 0 o tempo não é
+                                     limitado
+        :param memoria_maxima_leitura: Memória residente máxima do processo de leitura em bytes, somando os processos
+                                       da extração paralela das páginas. Com o valor 0 a memória não é limitada
+        :return: Mesmo retorno da função "ler_gerar_metadados_arquivo" e o motivo da interrupção da leitura (vazio se
+        a leitura foi concluída)
+    """
+    inicio = time.perf_counter()
+    concluiu, retorno, motivo = sup.executar_supervisionado(ler_gerar_metadados_arquivo,
+                                                            (caminho_arq, nome, codigo_lote, metadados,
+                                                             qtd_processos_paginas, caminho_cache_extracao,
+                                                             tamanho_maximo_cache_extracao),
+                                                            tempo_maximo_leitura, memoria_maxima_leitura)
+
+    if concluiu:
+        doc, validado, relatorio, doc_meta, tempos = retorno
+        return doc, validado, relatorio, doc_meta, tempos, ''
+
+    # A leitura interrompida não informa as etapas. Todo o tempo gasto é contado como extração
+    return None, False, None, None, {'extrair': time.perf_counter() - inicio}, motivo
+
+
+def mapear_em_paralelo(executor, qtd_em_andamento, funcao, *iteraveis):
+    """
+    Executa uma função para cada conjunto de argumentos nos processos do executor e entrega os resultados na ordem dos
+    argumentos, como o "executor.map". Porém, mantém no máximo 'qtd_em_andamento' execuções submetidas e ainda não
+    entregues. Obs.: O "executor.map" submete tudo de uma vez, então os resultados se acumulam na memória quando quem os
+    consome é mais lento que os processos
+        :param executor: Executor (ProcessPoolExecutor) onde a função será executada
+        :param qtd_em_andamento: Quantidade máxima de execuções submetidas e ainda não entregues
+        :param funcao: Função que será executada
+        :param iteraveis: Iteráveis com os argumentos da função, um para cada argumento (igual ao "map")
+        :return: Gerador dos resultados da função
+    """
+    em_andamento = deque()
+
+    for args in zip(*iteraveis):
+        em_andamento.append(executor.submit(funcao, *args))
+
+        if len(em_andamento) >= qtd_em_andamento:
+            yield em_andamento.popleft().result()
+
+    while em_andamento:
+        yield em_andamento.popleft().result()
+
+
 def obter_metadados_aux(caminho_metadados_aux):
     """
     Obtém os metadados auxiliares do arquivo lido para realizar o pré-processamento
@@ -233,7 +403,163 @@ def mover_arq_erro(codigo_lote, caminho_entrada, caminho_erro, nome_arq, caminho
     return caminho_erro_arq
 
 
-def pre_processar_arquivos(tipo, caminho_entrada, caminho_base, caminho_relativo, caminho_erro, timeout_preproc):
+def rejeitar_arq_duplicado(codigo_lote, caminho_entrada, caminho_erro, nome_arq, caminho_arq, nome_arq_metadados,
+                           caminho_arq_metadados, hash_arq, resultado):
+    """
+    Rejeita um arquivo que já consta na base de dados e o move para a pasta de arquivos com erro
+        :param codigo_lote: Código do lote no qual o arquivo está sendo pré-processado
+        :param caminho_entrada: Caminho de entrada onde o arquivos está sendo pré-processado
+        :param caminho_erro: Caminho para onde o arquivo duplicado será movido
+        :param nome_arq: Nome do arquivo duplicado
+        :param caminho_arq: Caminho do arquivo duplicado
+        :param nome_arq_metadados: Nome do arquivo de metadados do arquivo duplicado
+        :param caminho_arq_metadados: Caminho do metadado do arquivo duplicado
+        :param hash_arq: Hash que identificou a duplicidade do arquivo
+        :param resultado: Objeto que guarda o resultado do pré-processamento do arquivo
+    """
+    resultado.status = 'FALHOU'
+
+    msg_erro = "  *> Erro ao inserir. Este documento já consta na base de dados!"
+    msg_erro_hash = f"  *> Hash do arquivo: {hash_arq}"
+    resultado.inserir_mensagem(msg_erro)
+    resultado.inserir_mensagem("  *> Não é permitida a inclusão de documentos em duplicidade.")
+
+    mover_arq_erro(codigo_lote, caminho_entrada, caminho_erro, nome_arq, caminho_arq, nome_arq_metadados,
+                   caminho_arq_metadados, msg_erro + "\n" + msg_erro_hash)
+
+    print(f"\n{msg_erro}\n{msg_erro_hash}")
+
+
+def gravar_resultado(buffer_meta, resultado, tempos):
+    """
+    Grava no banco de dados o resultado do pré-processamento de um arquivo, junto com os tempos das etapas
+        :param buffer_meta: Buffer de inserção do banco de dados de metadados
+        :param resultado: Objeto que guarda o resultado do pré-processamento do arquivo
+        :param tempos: Dicionário com os tempos das etapas do pré-processamento do arquivo. Obs.: O tempo da gravação do
+                       próprio resultado é somado depois que o resultado é gravado, por isso só aparece no lote
+    """
+    resultado.tempos_etapas = dict(tempos)
+
+    with tms.medir_etapa(tempos, 'serializar'):
+        resultado_meta_json = ser.serializar(resultado)
+
+    with tms.medir_etapa(tempos, 'inserir'):
+        buffer_meta.inserir('col_metadados_resultados', resultado_meta_json)
+
+
+def desfazer_gravacao(c_mongo_doc, colecao, c_mongo_meta, pendentes):
+    """
+    Exclui, se for possível, os documentos e os metadados de uma gravação que foi interrompida por um erro, para que os
+    arquivos (que continuam na pasta de entrada) possam ser pré-processados novamente
+        :param c_mongo_doc: Banco de dados onde os documentos são gravados
+        :param colecao: Coleção onde os documentos são gravados
+        :param c_mongo_meta: Banco de dados onde os metadados são gravados
+        :param pendentes: Lista com os dicionários dos arquivos da gravação (ver a função "gravar_mover_arquivos")
+    """
+    # O banco de dados define o '_id' dos registros antes de enviá-los, então os registros que podem ter sido gravados
+    # possuem '_id'
+    try:
+        c_mongo_meta.excluir_lote('col_metadados_docs', [arq['meta']['_id'] for arq in pendentes
+                                                         if '_id' in arq['meta']])
+        c_mongo_doc.excluir_lote(colecao, [arq['doc']['_id'] for arq in pendentes if '_id' in arq['doc']])
+
+        for arq in pendentes:
+            excluir_dumpconteudo_gridfs(c_mongo_doc, arq['doc'])
+    except Exception as e:
+        print(f"\n  *> Erro ao desfazer a gravação dos arquivos {[arq['nome_arq'] for arq in pendentes]}: {e}. "
+              f"Verifique se os documentos e os metadados desses arquivos foram gravados no banco de dados!")
+
+
+def gravar_mover_arquivos(c_mongo_doc, colecao, c_mongo_meta, buffer_meta, arquivos_gravar, lote):
+    """
+    Grava os documentos e os metadados dos arquivos pré-processados com êxito e só depois move os arquivos para a pasta
+    de arquivos pré-processados. Se a gravação de um arquivo falhar, o que já foi gravado dele é excluído e o arquivo
+    continua na pasta de entrada, para ser pré-processado novamente. Por fim, grava os resultados dos arquivos
+        :param c_mongo_doc: Banco de dados onde os documentos são gravados
+        :param colecao: Coleção onde os documentos são gravados
+        :param c_mongo_meta: Banco de dados onde os metadados são gravados
+        :param buffer_meta: Buffer de inserção do banco de dados de metadados, que recebe os resultados dos arquivos
+        :param arquivos_gravar: Lista com um dicionário para cada arquivo que aguarda a gravação, contendo o nome do
+                                arquivo ('nome_arq'), o código do documento ('codigo_arq'), o documento serializado
+                                ('doc'), o conteúdo comprimido que será gravado no GridFS ('dump_gridfs', None se o
+                                conteúdo não for gravado no GridFS), os metadados serializados ('meta'), o resultado
+                                ('resultado'), os tempos das etapas ('tempos') e os parâmetros da função "mover_arq_ok"
+                                ('mover'). É esvaziada pela função
+        :param lote: Lote do pré-processamento
+    """
+    # A lista é esvaziada antes da gravação, pois se o pré-processamento for abortado durante a gravação, esta função é
+    # chamada novamente e não pode gravar os mesmos arquivos duas vezes
+    pendentes = list(arquivos_gravar)
+    arquivos_gravar.clear()
+
+    if pendentes:
+        inicio = time.perf_counter()
+
+        try:
+            # O conteúdo dos editais só é gravado no GridFS imediatamente antes dos editais
+            for arq in pendentes:
+                if arq['dump_gridfs'] is not None:
+                    gravar_dumpconteudo_gridfs(c_mongo_doc, arq['doc'], arq['dump_gridfs'])
+
+            falhas = set(c_mongo_doc.inserir_lote(colecao, [arq['doc'] for arq in pendentes]))
+
+            # Os metadados são gravados somente para os documentos gravados. Como a duplicidade dos arquivos é
+            # verificada pelos metadados, um documento sem metadados seria gravado novamente no próximo
+            # pré-processamento, por isso os documentos cujos metadados não foram gravados são excluídos
+            gravados = [i for i in range(len(pendentes)) if i not in falhas]
+            falhas_meta = [gravados[i] for i in c_mongo_meta.inserir_lote('col_metadados_docs',
+                                                                          [pendentes[i]['meta'] for i in gravados])]
+
+            if falhas_meta:
+                c_mongo_doc.excluir_lote(colecao, [pendentes[i]['doc']['_id'] for i in falhas_meta])
+                falhas.update(falhas_meta)
+
+            # O conteúdo no GridFS dos editais que não foram gravados é excluído
+            for i in falhas:
+                excluir_dumpconteudo_gridfs(c_mongo_doc, pendentes[i]['doc'])
+        except BaseException:
+            # Ex.: Conexão perdida no meio da gravação. Os arquivos continuam na pasta de entrada
+            desfazer_gravacao(c_mongo_doc, colecao, c_mongo_meta, pendentes)
+            raise
+
+        # O tempo da gravação é dividido igualmente entre os arquivos
+        tempo_gravacao = (time.perf_counter() - inicio) / len(pendentes)
+
+        for i, arq in enumerate(pendentes):
+            resultado = arq['resultado']
+            tempos = arq['tempos']
+            tms.acumular_tempo(tempos, 'inserir', tempo_gravacao)
+
+            if i in falhas:
+                print(f"\n  *> Erro ao gravar o arquivo '{arq['nome_arq']}' no banco de dados. O arquivo continua na "
+                      f"pasta de entrada para ser pré-processado novamente!", end='')
+
+                # Atualiza a lista de documentos com erro
+                lote.inserir_documento(arq['codigo_arq'], 0)
+
+                resultado.status = 'FALHOU'
+                resultado.inserir_mensagem("  *> Erro ao gravar o documento no banco de dados. O arquivo continua na "
+                                           "pasta de entrada para ser pré-processado novamente.")
+            else:
+                with tms.medir_etapa(tempos, 'mover'):
+                    mover_arq_ok(*arq['mover'])
+
+                # Atualiza a lista de documentos ok
+                lote.inserir_documento(arq['codigo_arq'])
+
+                resultado.status = 'OK'
+
+            # Salva o resultado no banco
+            gravar_resultado(buffer_meta, resultado, tempos)
+            lote.inserir_tempos(tempos)
+
+    buffer_meta.descarregar()
+
+
+def pre_processar_arquivos(tipo, caminho_entrada, caminho_base, caminho_relativo, caminho_erro, timeout_preproc,
+                           qtd_processos=1, qtd_processos_paginas=1, caminho_cache_extracao='',
+                           tamanho_maximo_cache_extracao=0, tempo_maximo_leitura=0, memoria_maxima_leitura=0,
+                           tamanho_lote_gravacao=1):
     """
     Lê os arquivos da pasta de entrada, gera a versão em formato texto plano e persiste no banco de dados.
     Obs.: Posteriormente os arquivos serão processados pelo sistema
@@ -244,6 +570,24 @@ def pre_processar_arquivos(tipo, caminho_entrada, caminho_base, caminho_relativo
                                  pré-processamento
         :param caminho_erro: Caminho onde os arquivos com erro de processamento serão guardados
         :param timeout_preproc: Timeout caso o arquivo de lock não seja apagado da pasta de entrada
+        :param qtd_processos: Quantidade de processos utilizados para ler os arquivos em paralelo. O lock, o lote, a
+                              gravação no banco de dados e a movimentação dos arquivos continuam sendo feitos somente
+                              por este processo (coordenador), na mesma ordem da leitura sequencial
+        :param qtd_processos_paginas: Quantidade de processos utilizados para extrair as páginas de um mesmo arquivo em
+                                      paralelo. Obs.: Pode ser combinado com 'qtd_processos', nesse caso até
+                                      qtd_processos * qtd_processos_paginas processos farão a extração ao mesmo tempo
+        :param caminho_cache_extracao: Pasta do cache da extração dos arquivos
+        :param tamanho_maximo_cache_extracao: Tamanho máximo do cache da extração em bytes. Com o valor 0 o cache não é
+                                              utilizado
+        :param tempo_maximo_leitura: Tempo máximo da leitura de cada arquivo em segundos. Se for ultrapassado, a leitura
+                                     é encerrada e o arquivo é movido para a pasta de erros. Com o valor 0 o tempo não
+                                     é limitado
+        :param memoria_maxima_leitura: Memória residente máxima do processo de leitura de cada arquivo em bytes,
+                                       somando os processos da extração paralela das páginas. Se for ultrapassada, a
+                                       leitura é encerrada e o arquivo é movido para a pasta de erros. Com o valor 0 a
+                                       memória não é limitada
+        :param tamanho_lote_gravacao: Quantidade de documentos acumulados antes de gravar no banco de dados. Com o valor
+                                      1 cada documento é gravado assim que é pré-processado
     """
     arquivos = None
 
@@ -289,147 +633,280 @@ def pre_processar_arquivos(tipo, caminho_entrada, caminho_base, caminho_relativo
 
         arq_lock.close()
 
-        # O MongoDB roda em uma
-
-        # Cria a conexão com o banco de dados
-        c_mongo_doc = ClienteGenerico('MongoDB', 'localhost', 27017, 'db_documentos')
-        c_mongo_meta = ClienteGenerico('MongoDB', 'localhost', 27017, 'db_metadados')
-
-        # Avalia em quais coleções/índices irá persistir os dados
-        colecao_mongo = None
-
-        if tipo == 'EDITAL':
-            colecao_mongo = 'col_editais'
-
-        # Gera um lote para o pré-processamento
-        lote = Lote(codigo_lote, tipo, time.time())
-
-        print(f"\n#------- Iniciando o pré-processamento do lote {codigo_lote} -------#")
-        print(f"\n# Tipo do Lote: {tipo}")
-        print(f"\n# Lista de arquivos a serem pré-processados: \n{arquivos_pre_processar}")
-
-        # contador para os arquivos
-        total = len(arquivos_pre_processar)
-        cont = 1
-
-        for a in arquivos_pre_processar:
-            caminho_arq = os.path.join(caminho_entrada, a)
-            nome_arq_metadados = a + ".metadados"
-            print(f"\nArquivo ({cont}/{total}): {a}", end='')
-            cont += 1
-
-            caminho_arq_metadados = os.path.join(caminho_entrada, nome_arq_metadados)
-            metadados = obter_metadados_aux(caminho_arq_metadados)
-
-            # Complementa os metadados com parâmetros do sistema
-            metadados['tipo'] = tipo
-            metadados['caminho_base'] = caminho_base
-            metadados['caminho_relativo'] = caminho_relativo
-
-            # Guardará o resultado do pré-processamento
-            resultado = Resultado(tipo='PREPROC', codigo_lote=codigo_lote, data_resultado=ger.gerar_epoch())
-            resultado.nome_arq_original = metadados['nome_arq_original']
-            resultado.tipo_arq = metadados['tipo']
-            resultado.codigo_arq = metadados['codigo_arq']
-            resultado.url_web = metadados['url_web']
-            resultado.usuario_cadastrou = metadados['usuario_cadastrou']
-            resultado.data_cadastro = metadados['data_cadastro']
-
-            doc, validado, relatorio = ler_arquivo(caminho_arq, a, metadados['codigo_arq'], codigo_lote,
-                                                   metadados['tipo'])
-
-            if validado:
-                doc_meta = ger.gerar_metadados_doc(codigo_lote, metadados, doc)
-
-                if doc_meta:
-                    # Verifica se o documento já existe no banco de dados
-                    doc_mongo_teste_js = c_mongo_meta.buscar_um('col_metadados_docs', 'Documento__hash_md5',
-                                                                doc_meta.hash_md5)
-
-                    # Só continua se o documento não existir no banco
-                    if doc_mongo_teste_js is None:
-                        mover_arq_ok(doc_meta.caminho_base, doc_meta.caminho_relativo, doc_meta.codigo_lote, a,
-                                     caminho_arq, caminho_arq_metadados)
+        executor = None
 
-                        doc_json_mongo = ser.serializar(doc)
-                        c_mongo_doc.inserir(colecao_mongo, doc_json_mongo)
-
-                        # Grava os metadados
-                        doc_meta_json = ser.serializar(doc_meta)
-                        c_mongo_meta.inserir('col_metadados_docs', doc_meta_json)
-
-                        resultado.status = 'OK'
-
-                        # Atualiza a lista de documentos ok
-                        lote.inserir_documento(doc_meta.codigo_arq)
-
-                        # Imprime no final da impressão do nome arquivo para facilitar buscas no log
-                        print(" -> OK", end='')
+        try:
 
-                    else:
-                        resultado.status = 'FALHOU'
+            # O MongoDB roda em uma
+
+            # Cria a conexão com o banco de dados
+            c_mongo_doc = ClienteGenerico('MongoDB', 'localhost', 27017, 'db_documentos')
+            c_mongo_meta = ClienteGenerico('MongoDB', 'localhost', 27017, 'db_metadados')
+
+            # Avalia em quais coleções/índices irá persistir os dados
+            colecao_mongo = None
+
+            if tipo == 'EDITAL':
+                colecao_mongo = 'col_editais'
+
+            # Gera um lote para o pré-processamento
+            lote = Lote(codigo_lote, tipo, time.time())
+
+            print(f"\n#------- Iniciando o pré-processamento do lote {codigo_lote} -------#")
+            print(f"\n# Tipo do Lote: {tipo}")
+            print(f"\n# Lista de arquivos a serem pré-processados: \n{arquivos_pre_processar}")
+
+            # contador para os arquivos
+            total = len(arquivos_pre_processar)
+            cont = 1
+
+            # Obtém os metadados de todos os arquivos antes da leitura, pois eles são enviados para os processos que
+            # farão a leitura dos arquivos
+            caminhos_arqs = []
+            lst_metadados = []
+            lst_tempos = []  # Tempos das etapas do pré-processamento de cada arquivo
+
+            # Arquivos que já constam na base de dados. Eles são rejeitados sem passar pela extração do texto
+            arquivos_duplicados = set()
+
+            for a in arquivos_pre_processar:
+                caminho_arq = os.path.join(caminho_entrada, a)
+                caminhos_arqs.append(caminho_arq)
+                metadados = obter_metadados_aux(os.path.join(caminho_entrada, a + ".metadados"))
+
+                # Complementa os metadados com parâmetros do sistema
+                metadados['tipo'] = tipo
+                metadados['caminho_base'] = caminho_base
+                metadados['caminho_relativo'] = caminho_relativo
+                tempos = {}
+
+                try:
+                    with tms.medir_etapa(tempos, 'hash'):
+                        metadados['hash_arquivo'] = ger.gerar_hash_arquivo_bruto(caminho_arq)
+                except FileNotFoundError:
+                    print(f"\nErro ao gerar o hash do arquivo '{caminho_arq}'. O arquivo não foi encontrado!\n")
+                    exit(FILE_NOT_FOUND_ERROR)
+                except PermissionError:
+                    print(f"\nErro ao gerar o hash do arquivo '{caminho_arq}'. Permissão de leitura negada!\n")
+                    exit(PERMISSION_ERROR)
+
+                lst_metadados.append(metadados)
+                lst_tempos.append(tempos)
+
+            # Verifica pelos bytes dos arquivos quais documentos já existem no banco de dados, numa única consulta
+            inicio_consulta = time.perf_counter()
+            hashes_arquivos = [m['hash_arquivo'] for m in lst_metadados]
+            docs_existentes = c_mongo_meta.buscar_todos('col_metadados_docs', 'Documento__hash_arquivo',
+                                                        hashes_arquivos, 'lista', ['Documento__hash_arquivo'])
+            hashes_existentes = {d['Documento__hash_arquivo'] for d in docs_existentes}
+            tempo_consulta = time.perf_counter() - inicio_consulta
+
+            for a, metadados, tempos in zip(arquivos_pre_processar, lst_metadados, lst_tempos):
+                # O tempo da consulta é dividido igualmente entre os arquivos
+                tms.acumular_tempo(tempos, 'consultar', tempo_consulta / len(lst_metadados))
+
+                if metadados['hash_arquivo'] in hashes_existentes:
+                    arquivos_duplicados.add(a)
+
+            # Somente os arquivos que não foram rejeitados são lidos
+            ler = [a not in arquivos_duplicados for a in arquivos_pre_processar]
+            arqs_ler = [a for a, lido in zip(arquivos_pre_processar, ler) if lido]
+            caminhos_ler = [c for c, lido in zip(caminhos_arqs, ler) if lido]
+            metadados_ler = [m for m, lido in zip(lst_metadados, ler) if lido]
+            total_ler = len(arqs_ler)
+
+            # Lê os arquivos e gera os metadados dos documentos. Obs.: Em ambos os casos, os resultados são entregues na
+            # ordem dos arquivos, por isso o restante do pré-processamento é igual ao da leitura sequencial
+            if qtd_processos > 1:
+                executor = ProcessPoolExecutor(max_workers=qtd_processos)
+                # Somente alguns arquivos por processo são submetidos de cada vez, assim a memória do coordenador não
+                # cresce com o tamanho do lote quando a gravação é mais lenta que a leitura
+                docs_lidos = mapear_em_paralelo(executor, LEITURAS_EM_ANDAMENTO_POR_PROCESSO * qtd_processos,
+                                                ler_gerar_metadados_arquivo_supervisionado, caminhos_ler, arqs_ler,
+                                                [codigo_lote] * total_ler, metadados_ler,
+                                                [qtd_processos_paginas] * total_ler,
+                                                [caminho_cache_extracao] * total_ler,
+                                                [tamanho_maximo_cache_extracao] * total_ler,
+                                                [tempo_maximo_leitura] * total_ler,
+                                                [memoria_maxima_leitura] * total_ler)
+            else:
+                docs_lidos = map(ler_gerar_metadados_arquivo_supervisionado, caminhos_ler, arqs_ler,
+                                 [codigo_lote] * total_ler, metadados_ler, [qtd_processos_paginas] * total_ler,
+                                 [caminho_cache_extracao] * total_ler, [tamanho_maximo_cache_extracao] * total_ler,
+                                 [tempo_maximo_leitura] * total_ler, [memoria_maxima_leitura] * total_ler)
+
+            # As gravações no banco de dados são feitas em lotes
+            buffer_meta = BufferInsercao(c_mongo_meta, tamanho_lote_gravacao)
+            hashes_md5_lote = set()  # Hashes do conteúdo dos documentos gravados neste lote
+            arquivos_gravar = []  # Arquivos pré-processados com êxito que aguardam a gravação (gravar_mover_arquivos)
+
+            try:
+                for a, caminho_arq, metadados, tempos in zip(arquivos_pre_processar, caminhos_arqs, lst_metadados,
+                                                             lst_tempos):
+                    nome_arq_metadados = a + ".metadados"
+                    caminho_arq_metadados = os.path.join(caminho_entrada, nome_arq_metadados)
+                    print(f"\nArquivo ({cont}/{total}): {a}", end='')
+                    cont += 1
+                    aguarda_gravacao = False
+
+                    # Guardará o resultado do pré-processamento
+                    resultado = Resultado(tipo='PREPROC', codigo_lote=codigo_lote, data_resultado=ger.gerar_epoch())
+                    resultado.nome_arq_original = metadados['nome_arq_original']
+                    resultado.tipo_arq = metadados['tipo']
+                    resultado.codigo_arq = metadados['codigo_arq']
+                    resultado.url_web = metadados['url_web']
+                    resultado.usuario_cadastrou = metadados['usuario_cadastrou']
+                    resultado.data_cadastro = metadados['data_cadastro']
+
+                    if a in arquivos_duplicados:
+                        with tms.medir_etapa(tempos, 'mover'):
+                            rejeitar_arq_duplicado(codigo_lote, caminho_entrada, caminho_erro, a, caminho_arq,
+                                                   nome_arq_metadados, caminho_arq_metadados, metadados['hash_arquivo'],
+                                                   resultado)
 
                         # Atualiza a lista de documentos com erro
                         lote.inserir_documento(metadados['codigo_arq'], 0)
 
-                        msg_erro = "  *> Erro ao inserir. Este documento já consta na base de dados!"
-                        msg_erro_hash = f"  *> Hash do arquivo: {doc_meta.hash_md5}"
-                        resultado.inserir_mensagem(msg_erro)
-                        resultado.inserir_mensagem("  *> Não é permitida a inclusão de documentos em duplicidade.")
-
-                        mover_arq_erro(codigo_lote, caminho_entrada, caminho_erro, a, caminho_arq,
-                                       nome_arq_metadados, caminho_arq_metadados, msg_erro + "\n" + msg_erro_hash)
-
-                        print(f"\n{msg_erro}\n{msg_erro_hash}")
-
-                else:
-                    print(f"\nErro ao gerar os metadados do arquivo '{caminho_arq}'!\n")
-                    exit(CREATE_METADATA_ERROR)
-            else:
-                msg_erro = f"  *> Erro ao processar o arquivo '{caminho_arq}'. Falha ao extrair o texto!"
-                print(f"\n{msg_erro}")
-
-                caminho_erro_arq = mover_arq_erro(codigo_lote, caminho_entrada, caminho_erro, a, caminho_arq,
-                                                  nome_arq_metadados, caminho_arq_metadados, msg_erro)
-
-                # Se o documento tiver conteúdo (mesmo que seja incompleto), descarrega num arquivo
-                # para que a causa seja investigada manualmente
-                if doc:
-                    descarregar_conteudo(doc, tipo, caminho_erro_arq + '.erro_dump', relatorio)
-
-                # Atualiza a lista de documentos com erro
-                lote.inserir_documento(metadados['codigo_arq'], 0)
-
-                # Informa o resultado
-                resultado.status = 'FALHOU'
-                resultado.inserir_mensagem("  *> Erro ao processar o arquivo. Falha ao extrair o texto!")
-                resultado.inserir_mensagem("  *> O arquivo cadastrado está corrompido ou o conteúdo possui uma "
-                                           "codificação inválida.")
+                        # Salva o resultado no banco
+                        gravar_resultado(buffer_meta, resultado, tempos)
+                        lote.inserir_tempos(tempos)
+                        continue
+
+                    # Os resultados da leitura são entregues na mesma ordem dos arquivos não rejeitados
+                    doc, validado, relatorio, doc_meta, tempos_leitura, motivo_interrupcao = next(docs_lidos)
+
+                    for etapa, tempo in tempos_leitura.items():
+                        tms.acumular_tempo(tempos, etapa, tempo)
+
+                    if validado:
+                        if doc_meta:
+                            # Verifica pelo conteúdo extraído se o documento já existe no banco de dados. Obs.: Detecta
+                            # os arquivos com bytes diferentes e mesmo conteúdo, além dos arquivos repetidos no mesmo
+                            # lote. Os documentos do lote que ainda aguardam a gravação não são encontrados no banco,
+                            # por isso os hashes do lote são verificados antes
+                            repetido_lote = doc_meta.hash_md5 in hashes_md5_lote
+                            doc_mongo_teste_js = None
+
+                            if not repetido_lote:
+                                with tms.medir_etapa(tempos, 'consultar'):
+                                    doc_mongo_teste_js = c_mongo_meta.buscar_um('col_metadados_docs',
+                                                                                'Documento__hash_md5',
+                                                                                doc_meta.hash_md5, 'exato')
+
+                            # Só continua se o documento não existir no banco
+                            if doc_mongo_teste_js is None and not repetido_lote:
+                                hashes_md5_lote.add(doc_meta.hash_md5)
+
+                                # Obs.: Conforme o modo de armazenamento, o conteúdo é comprimido e, no modo 'gridfs',
+                                # só é gravado no GridFS junto com o edital
+                                with tms.medir_etapa(tempos, 'serializar'):
+                                    doc_json_mongo = ser.serializar(doc, DESCRICOES_COMO_SPANS)
+                                    doc_json_mongo, dump_gridfs = armazenar_dumpconteudo(doc_json_mongo)
+                                    doc_meta_json = ser.serializar(doc_meta)
+
+                                # O documento e os metadados são gravados em lotes. O arquivo só é movido e o seu
+                                # resultado só é salvo depois da gravação (ver a função "gravar_mover_arquivos")
+                                arquivos_gravar.append({'nome_arq': a, 'codigo_arq': doc_meta.codigo_arq,
+                                                        'doc': doc_json_mongo, 'dump_gridfs': dump_gridfs,
+                                                        'meta': doc_meta_json,
+                                                        'resultado': resultado, 'tempos': tempos,
+                                                        'mover': (doc_meta.caminho_base, doc_meta.caminho_relativo,
+                                                                  doc_meta.codigo_lote, a, caminho_arq,
+                                                                  caminho_arq_metadados)})
+                                aguarda_gravacao = True
+
+                                # Imprime no final da impressão do nome arquivo para facilitar buscas no log
+                                print(" -> OK", end='')
+
+                            else:
+                                # Atualiza a lista de documentos com erro
+                                lote.inserir_documento(metadados['codigo_arq'], 0)
+
+                                with tms.medir_etapa(tempos, 'mover'):
+                                    rejeitar_arq_duplicado(codigo_lote, caminho_entrada, caminho_erro, a, caminho_arq,
+                                                           nome_arq_metadados, caminho_arq_metadados, doc_meta.hash_md5,
+                                                           resultado)
+
+                        else:
+                            print(f"\nErro ao gerar os metadados do arquivo '{caminho_arq}'!\n")
+                            exit(CREATE_METADATA_ERROR)
+                    elif motivo_interrupcao:
+                        msg_erro = f"  *> Erro ao processar o arquivo '{caminho_arq}'. A leitura foi interrompida. " \
+                                   f"{motivo_interrupcao}!"
+                        print(f"\n{msg_erro}")
+
+                        with tms.medir_etapa(tempos, 'mover'):
+                            mover_arq_erro(codigo_lote, caminho_entrada, caminho_erro, a, caminho_arq,
+                                           nome_arq_metadados, caminho_arq_metadados, msg_erro)
 
-            # Salva o resultado no banco
-            resultado_meta_json = ser.serializar(resultado)
-            c_mongo_meta.inserir('col_metadados_resultados', resultado_meta_json)
+                        # Atualiza a lista de documentos com erro
+                        lote.inserir_documento(metadados['codigo_arq'], 0)
 
-        # Finaliza o lote
-        lote.tempo_fim = time.time()
+                        # Informa o resultado
+                        resultado.status = 'FALHOU'
+                        resultado.inserir_mensagem(f"  *> Erro ao processar o arquivo. A leitura foi interrompida. "
+                                                   f"{motivo_interrupcao}!")
+                        resultado.inserir_mensagem("  *> O arquivo cadastrado está mal formado ou é grande demais "
+                                                   "para ser lido com os limites configurados.")
+                    else:
+                        msg_erro = f"  *> Erro ao processar o arquivo '{caminho_arq}'. Falha ao extrair o texto!"
+                        print(f"\n{msg_erro}")
 
-        # Obtém as estatísticas do lote
-        estatisticas = lote.obter_estatisticas()
+                        with tms.medir_etapa(tempos, 'mover'):
+                            caminho_erro_arq = mover_arq_erro(codigo_lote, caminho_entrada, caminho_erro, a,
+                                                              caminho_arq, nome_arq_metadados, caminho_arq_metadados,
+                                                              msg_erro)
 
-        # Grava o lote somente se houve pré-processamento
-        if estatisticas['total_docs'] > 0:
-            lote_json = ser.serializar(lote)
-            c_mongo_meta.inserir('col_metadados_lotes', lote_json)
+                            # Se o documento tiver conteúdo (mesmo que seja incompleto), descarrega num arquivo
+                            # para que a causa seja investigada manualmente
+                            if doc:
+                                descarregar_conteudo(doc, tipo, caminho_erro_arq + '.erro_dump', relatorio)
 
-        c_mongo_doc.fechar_conexao()
-        c_mongo_meta.fechar_conexao()
+                        # Atualiza a lista de documentos com erro
+                        lote.inserir_documento(metadados['codigo_arq'], 0)
 
-        # Libera para o próximo pré-processamento
-        try:
-            os.remove(caminho_arq_lock)
-        except PermissionError:
-            print(f"\nErro ao apagar o arquivo de lock. Permissão negada!\n")
-            exit(PERMISSION_ERROR)
+                        # Informa o resultado
+                        resultado.status = 'FALHOU'
+                        resultado.inserir_mensagem("  *> Erro ao processar o arquivo. Falha ao extrair o texto!")
+                        resultado.inserir_mensagem("  *> O arquivo cadastrado está corrompido ou o conteúdo possui uma "
+                                                   "codificação inválida.")
+
+                    if aguarda_gravacao:
+                        if len(arquivos_gravar) >= tamanho_lote_gravacao:
+                            gravar_mover_arquivos(c_mongo_doc, colecao_mongo, c_mongo_meta, buffer_meta,
+                                                  arquivos_gravar, lote)
+                    else:
+                        # Salva o resultado no banco
+                        gravar_resultado(buffer_meta, resultado, tempos)
+                        lote.inserir_tempos(tempos)
+            finally:
+                # Grava o que ficou pendente e move os arquivos correspondentes, mesmo se o pré-processamento for
+                # abortado. Obs.: Os arquivos que não forem gravados continuam na pasta de entrada
+                gravar_mover_arquivos(c_mongo_doc, colecao_mongo, c_mongo_meta, buffer_meta, arquivos_gravar, lote)
+
+            # Finaliza o lote
+            lote.tempo_fim = time.time()
+
+            # Obtém as estatísticas do lote
+            estatisticas = lote.obter_estatisticas()
+
+            # Grava o lote somente se houve pré-processamento
+            if estatisticas['total_docs'] > 0:
+                lote_json = ser.serializar(lote)
+                c_mongo_meta.inserir('col_metadados_lotes', lote_json)
+
+            c_mongo_doc.fechar_conexao()
+            c_mongo_meta.fechar_conexao()
+        finally:
+            if executor:
+                executor.shutdown(cancel_futures=True)
+
+            # Libera para o próximo pré-processamento, mesmo se o pré-processamento for abortado
+            try:
+                os.remove(caminho_arq_lock)
+            except PermissionError:
+                print(f"\nErro ao apagar o arquivo de lock. Permissão negada!\n")
+                exit(PERMISSION_ERROR)
 
         print(f"\nEstatísticas do lote: {estatisticas}")
         print(f"\n#------- FIM do pré-processamento do lote {codigo_lote} -------#\n")
@@ -17,6 +17,7 @@
 import os
 import src.ambiente.preparar_ambiente as pre
 import src.modulos.preproc.pre_processador as proc
+import src.utils.perfilador as perf
 from src.ambiente.parametros_globais import PREPROC_CAMINHO_ARQ_CONF, PERMISSION_ERROR, PARAMETER_ERROR
 
 
@@ -51,6 +52,7 @@ def validar_preparar_pastas(p):
             exit(PERMISSION_ERROR)
 
 
+@perf.perfilar
 def pre_processamento():
     """
     Módulo de pré-processamento dos arquivos de editais
@@ -68,16 +70,45 @@ def pre_processamento():
                   'p_caminho_base': conf.obter_valor_parametro('p_caminho_base'),
                   'p_caminho_relativo': conf.obter_valor_parametro('p_caminho_relativo'),
                   'nome_pasta_erros': conf.obter_valor_parametro('nome_pasta_erros'),
-                  'timeout_lock': conf.obter_valor_parametro('timeout_lock')}
+                  'timeout_lock': conf.obter_valor_parametro('timeout_lock'),
+                  'p_qtd_processos': conf.obter_valor_parametro('p_qtd_processos'),
+                  'p_qtd_processos_paginas': conf.obter_valor_parametro('p_qtd_processos_paginas'),
+                  'p_caminho_cache_extracao': conf.obter_valor_parametro('p_caminho_cache_extracao'),
+                  'p_tamanho_maximo_cache_extracao': conf.obter_valor_parametro('p_tamanho_maximo_cache_extracao'),
+                  'p_tempo_maximo_leitura': conf.obter_valor_parametro('p_tempo_maximo_leitura'),
+                  'p_memoria_maxima_leitura': conf.obter_valor_parametro('p_memoria_maxima_leitura'),
+                  'p_tamanho_lote_gravacao': conf.obter_valor_parametro('p_tamanho_lote_gravacao')}
 
     validar_preparar_pastas(parametros)
 
+    for p in ['p_qtd_processos', 'p_qtd_processos_paginas', 'p_tamanho_lote_gravacao']:
+        if parametros[p] < 1:
+            print(f"\nO parâmetro '{p}' tem que ser maior ou igual a 1!\n"
+                  f"Edite o arquivo de configuração ('{arq_conf}') e corrija este erro.\n")
+            exit(PARAMETER_ERROR)
+
+    for p in ['p_tamanho_maximo_cache_extracao', 'p_tempo_maximo_leitura', 'p_memoria_maxima_leitura']:
+        if parametros[p] < 0:
+            print(f"\nO parâmetro '{p}' não pode ser negativo!\n"
+                  f"Edite o arquivo de configuração ('{arq_conf}') e corrija este erro.\n")
+            exit(PARAMETER_ERROR)
+
+    # Se o perfilador estiver ativo, o perfil é gravado junto com os arquivos pré-processados
+    perf.registrar_pasta_saida(os.path.join(parametros['p_caminho_base'], 'editais'))
+
     # Inicia o pré-processamento dos arquivos
     proc.pre_processar_arquivos('EDITAL', os.path.join(parametros['p_caminho_entrada'], 'editais'),
                                 os.path.join(parametros['p_caminho_base'], 'editais'),
                                 parametros['p_caminho_relativo'],
                                 parametros['nome_pasta_erros'],
-                                parametros['timeout_lock'])
+                                parametros['timeout_lock'],
+                                parametros['p_qtd_processos'],
+                                parametros['p_qtd_processos_paginas'],
+                                parametros['p_caminho_cache_extracao'],
+                                parametros['p_tamanho_maximo_cache_extracao'] * 1024 * 1024,
+                                parametros['p_tempo_maximo_leitura'],
+                                parametros['p_memoria_maxima_leitura'] * 1024 * 1024,
+                                parametros['p_tamanho_lote_gravacao'])
 
 
 # Obs.: para rodar este script diretamente no caminho dele, tem que configurar a variável PYTHONPATH com o caminho do
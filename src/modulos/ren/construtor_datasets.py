@@ -6,13 +6,37 @@ import spacy
 import os
 import pickle
 import numpy as np
-import src.classes.persistencia.serializacao as ser
 from unicodedata import normalize
+from src.classes.documentos import materializar_span
 from src.classes.persistencia.cliente import ClienteGenerico
+from src.classes.persistencia.conteudo_edital import CAMPOS_DUMPCONTEUDO, obter_dumpconteudo
+from src.classes.persistencia.serializacao import converter_cod_processamento
 from src.ambiente.parametros_globais import PERMISSION_ERROR, SPACY_MODEL_NOT_FOUND_ERROR, \
-    FILE_NOT_FOUND_ERROR, INVALID_CONTENT
+    FILE_NOT_FOUND_ERROR, INVALID_CONTENT, MONGODB_TAMANHO_LOTE_CURSOR_SUBSECOES
 from src.ml.classificador import carregar_modelo, tratar_strings
 
+# Indica se a migração dos códigos de processamento já foi executada por este processo
+_migracao = {'executada': False}
+
+
+def migrar_cod_processamento(c_mongo_meta):
+    """
+    Converte os códigos de processamento gravados no formato antigo, uma única string (ex.: 'ner, classificacao'),
+    para listas. Obs.: Somente os documentos que ainda estão no formato antigo (string e não lista) são buscados, então,
+    depois da migração, a função não altera mais nada
+        :param c_mongo_meta: Base de dados onde estão os metadados dos documentos
+        :return: Quantidade de documentos convertidos
+    """
+    docs_antigos = c_mongo_meta.buscar_todos('col_metadados_docs', 'Documento__cod_processamento', 'string',
+                                             'tipo_escalar', ['Documento__codigo_arq', 'Documento__cod_processamento'])
+
+    alteracoes = [('Documento__codigo_arq', d['Documento__codigo_arq'], 'Documento__cod_processamento',
+                   converter_cod_processamento(d['Documento__cod_processamento'])) for d in docs_antigos]
+
+    _migracao['executada'] = True
+
+    return c_mongo_meta.alterar_lote('col_metadados_docs', alteracoes)
+
 
 def obter_metadados_documentos(c_mongo_meta, codproc, reprocessar=False):
     """
@@ -23,43 +47,74 @@ def obter_metadados_documentos(c_mongo_meta, codproc, reprocessar=False):
         :return: Metadados dos documentos que ainda não foram processados. Se for para reprocessar, retorna todos os
                  que atendam ao filtro 'codproc'
     """
-    # Obtém os metadados dos documentos que serão processados
+    # Os documentos gravados antes dos códigos de processamento serem guardados numa lista precisam ser convertidos,
+    # senão as buscas abaixo não os encontram corretamente. Obs.: A migração também pode ser feita pela opção 7 do menu
+    # da interface_prog.py. Aqui é executada somente uma vez por processo
+    if not _migracao['executada']:
+        qtd_migrados = migrar_cod_processamento(c_mongo_meta)
+
+        if qtd_migrados:
+            print(f"\nCódigos de processamento de {qtd_migrados} documento(s) convertidos para o formato de lista.")
+
+    # Obtém os metadados dos documentos que serão processados. Obs.: Os códigos de processamento são guardados numa
+    # lista indexada (ex.: ['ner', 'classificacao']). A busca por 'codproc' utiliza o índice, mas a busca pelos que
+    # não têm o 'codproc' ($nin) é pouco seletiva e percorre o índice inteiro
     if not reprocessar:
         # Traz todos os documentos que não tem o 'codproc'
-        doc_metadados_js = c_mongo_meta.buscar_todos('col_metadados_docs', 'Documento__cod_processamento',
-                                                     f"^((?!{codproc}).)*$")
+        doc_metadados_js = c_mongo_meta.buscar_todos('col_metadados_docs', 'Documento__cod_processamento', [codproc],
+                                                     'fora_lista')
     else:
-        doc_metadados_js = c_mongo_meta.buscar_todos('col_metadados_docs', 'Documento__cod_processamento', codproc)
+        doc_metadados_js = c_mongo_meta.buscar_todos('col_metadados_docs', 'Documento__cod_processamento', codproc,
+                                                     'exato')
 
     return list(doc_metadados_js)
 
 
 def obter_subsecoes_documentos(doc_metadados_js):
     """
-    Obtém as subseções dos documentos que precisam ser processados para criação do dataset
+    Obtém as subseções dos documentos que precisam ser processados para criação do dataset. Obs.: Busca todos os editais
+    numa única consulta, trazendo somente as descrições das subseções
         :param doc_metadados_js: Metadados dos documentos que serão processados
         :return: Dicionário cuja chave é o código do arquivo e o valor é uma lista contendo as subseções do documento
     """
     print(f"\n=> Etapa: Obtendo subseções...", end='', flush=True)
 
     c_mongo_doc = ClienteGenerico('MongoDB', 'localhost', 27017, 'db_documentos')
-    documentos_subsecoes = {}  # A chave é o código do arquivo e o valor é uma lista contendo as subseções do documento
+    subsecoes_editais = {}  # A chave é o código do arquivo e o valor é uma lista contendo as subseções do documento
 
     # Obtém os documentos (através dos metadados) que serão processados
-    for doc_meta in doc_metadados_js:
-        doc = c_mongo_doc.buscar_um('col_editais', 'Edital__codigo_arq', doc_meta['Documento__codigo_arq'])
+    codigos_arqs = [doc_meta['Documento__codigo_arq'] for doc_meta in doc_metadados_js]
+    campos = ['Edital__codigo_arq', 'Edital__secoes.Secao__subsecoes.Subsecao__descricao',
+              'Edital__secoes.Secao__subsecoes.Subsecao__span_descricao']
+
+    editais_js = c_mongo_doc.buscar_todos('col_editais', 'Edital__codigo_arq', codigos_arqs, 'lista', campos,
+                                          MONGODB_TAMANHO_LOTE_CURSOR_SUBSECOES)
+
+    for edital_js in editais_js:
+        codigo_arq = edital_js['Edital__codigo_arq']
+        paginas_documento = None  # Só é obtido se alguma descrição foi guardada como span
         subsecoes = []
 
-        if doc:
-            doc_desserializado = ser.desserializar(doc)
+        for s in edital_js.get('Edital__secoes', []):
+            for sb in s.get('Secao__subsecoes', []):
+                # A descrição pode ter sido guardada como span sobre o conteúdo do edital
+                if 'Subsecao__span_descricao' in sb:
+                    if paginas_documento is None:
+                        dump_js = c_mongo_doc.buscar_um('col_editais', 'Edital__codigo_arq', codigo_arq, 'exato',
+                                                        CAMPOS_DUMPCONTEUDO)
+                        paginas_documento = obter_dumpconteudo(dump_js)
 
-            for s in doc_desserializado.secoes:
-                for sb in s.subsecoes:
-                    subsecoes.append(sb.descricao)
+                    subsecoes.append(materializar_span(paginas_documento, sb['Subsecao__span_descricao']))
+                else:
+                    subsecoes.append(sb['Subsecao__descricao'])
 
-            documentos_subsecoes[doc_meta['Documento__codigo_arq']] = subsecoes
+        subsecoes_editais[codigo_arq] = subsecoes
 
     c_mongo_doc.fechar_conexao()
+
+    # Mantém a ordem dos metadados, pois a consulta não garante a ordem dos editais
+    documentos_subsecoes = {c: subsecoes_editais[c] for c in codigos_arqs if c in subsecoes_editais}
+
     print(" -> Pronto!")
     return documentos_subsecoes
 
@@ -176,25 +231,22 @@ def marcar_documentos_processados(c_mongo_meta, doc_metadados_js, codproc, repro
     """
     doc_erros = []  # Guarda os códigos dos documentos caso haja erro na marcação do processamento
 
-    # Se não for reprocessamento, atualiza os códigos de processamento. Se for reprocessamento, não atualiza a lista,
-    # pois o código já se encontra nela.
+    # Se não for reprocessamento, acrescenta o 'codproc' nos códigos de processamento de todos os documentos numa única
+    # operação. Se for reprocessamento, não atualiza a lista, pois o código já se encontra nela.
     if not reprocessado:
-        for doc_meta in doc_metadados_js:
-            doc_cod_processamento = doc_meta['Documento__cod_processamento']
-
-            # Se o documento ainda não foi processado com algum código de processamento, retira o código 'a processar'
-            # e grava o 'codproc'
-            if 'a processar' in doc_cod_processamento:
-                doc_cod_processamento = codproc
-            else:  # Se já foi processado com algum código, acrescenta o 'codproc' na string de códigos de processamento
-                doc_cod_processamento += f", {codproc}"
-
-            resultado = c_mongo_meta.alterar('col_metadados_docs', 'Documento__codigo_arq',
-                                             doc_meta['Documento__codigo_arq'], 'Documento__cod_processamento',
-                                             doc_cod_processamento)
-
-            if not resultado:
-                doc_erros.append(doc_meta['Documento__codigo_arq'])
+        codigos_arq = [doc_meta['Documento__codigo_arq'] for doc_meta in doc_metadados_js]
+
+        qtd_marcados = c_mongo_meta.acrescentar_lote('col_metadados_docs', 'Documento__codigo_arq', codigos_arq,
+                                                     'Documento__cod_processamento', codproc)
+
+        # Somente se algum documento não foi encontrado, busca quais foram marcados para descobrir os que faltaram
+        if qtd_marcados < len(codigos_arq):
+            campos = ['Documento__codigo_arq', 'Documento__cod_processamento']
+            docs_marcados = c_mongo_meta.buscar_todos('col_metadados_docs', 'Documento__codigo_arq', codigos_arq,
+                                                      'lista', campos)
+            marcados = {d['Documento__codigo_arq'] for d in docs_marcados
+                        if codproc in d['Documento__cod_processamento']}
+            doc_erros = [c for c in codigos_arq if c not in marcados]
 
     return doc_erros
 
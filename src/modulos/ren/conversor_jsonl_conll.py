@@ -12,6 +12,7 @@ from src.ambiente.parametros_globais import PERMISSION_ERROR, REN_CAMINHO_ARQ_CO
     INVALID_CONTENT, VALUE_ERROR
 from src.ambiente.preparar_ambiente import inicializar_parametros, validar_pastas
 from src.modulos.ren.construtor_datasets import retirar_sentencas_similares
+from src.utils.perfilador import perfilar, registrar_pasta_saida
 
 
 def fatiar_sentenca(sentenca, marcadores_entidades):
@@ -505,6 +506,7 @@ def contabilizar_entidades(caminho, entidades_por_arquivo):
         print(f"\t                 {tag} = {total}")
 
 
+@perfilar
 def converter_jsonl_conll(retirar_sentencas_semelhantes=False, escopo_global_sentencas=True, tamanho_dataset_teste=0.0,
                           concatenar_arquivos=False):
     """
@@ -532,6 +534,9 @@ def converter_jsonl_conll(retirar_sentencas_semelhantes=False, escopo_global_sen
     validar_pastas(parametros)
 
     caminho = parametros['p_caminho_arq_sentencas']
+
+    # Se o perfilador estiver ativo, o perfil é gravado junto com os arquivos CONLL
+    registrar_pasta_saida(caminho)
     sentencas_com_tags = []
     entidades_por_arquivo = {}  # Guarda as entidades por arquivo. Objetivo: de fazer uma contabilidade das entidades
 
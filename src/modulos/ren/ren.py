@@ -14,6 +14,7 @@
 
 import os
 import src.ambiente.preparar_ambiente as pre
+import src.utils.perfilador as perf
 from src.modulos.ren.construtor_datasets import construir_dataset
 from src.ambiente.parametros_globais import REN_CAMINHO_ARQ_CONF, PERMISSION_ERROR
 from src.utils.geradores import gerar_data, gerar_epoch
@@ -53,6 +54,7 @@ def gerar_estatisticas_documentos(data_hora, documentos_sentencas, codproc, cami
     arq_sents.close()
 
 
+@perf.perfilar
 def ren(codproc, qtd_max_sent, reprocessar=False, gerar_estatisticas=False, organizar_em_pastas=False,
         retirar_sentencas_semelhantes=False, escopo_global_sentencas=True):
     """
@@ -96,6 +98,10 @@ def ren(codproc, qtd_max_sent, reprocessar=False, gerar_estatisticas=False, orga
                               retirar_sentencas_semelhantes=retirar_sentencas_semelhantes,
                               escopo_global_sentencas=escopo_global_sentencas, limiar=0.90)
 
+        # Se o perfilador estiver ativo, o perfil é gravado junto com os datasets
+        if caminho_estatisticas:
+            perf.registrar_pasta_saida(caminho_estatisticas)
+
         if codproc == 'ner' and documentos_sentencas and gerar_estatisticas:
             gerar_estatisticas_documentos(data_hora, documentos_sentencas, codproc, caminho_estatisticas)
     else:
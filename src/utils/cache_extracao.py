@@ -0,0 +1,136 @@
+# ----------------------------------------------------------------
+# Cache em disco do texto extraído dos documentos PDF. Evita que
+# um mesmo arquivo seja extraído novamente quando o
+# pré-processamento é executado outra vez
+# ----------------------------------------------------------------
+import os
+import json
+import zlib
+import src.utils.geradores as ger
+from src.ambiente.parametros_globais import VERSAO_EXTRATOR_PDF
+
+# Extensão dos arquivos guardados no cache
+EXTENSAO_CACHE = '.json.zlib'
+
+
+def gerar_chave_cache(caminho_arquivo, hash_arquivo=''):
+    """
+    Gera a chave do cache para um arquivo. A chave é composta pelo hash dos bytes do arquivo e pela versão do extrator,
+    portanto arquivos com o mesmo conteúdo compartilham a mesma entrada no cache
+        :param caminho_arquivo: Caminho do arquivo
+        :param hash_arquivo: Hash dos bytes do arquivo (função "gerar_hash_arquivo_bruto"), se já foi calculado. Nesse
+                             caso o arquivo não é lido novamente
+        :return: Chave do cache ou None se não foi possível ler o arquivo
+    """
+    if not hash_arquivo:
+        try:
+            hash_arquivo = ger.gerar_hash_arquivo_bruto(caminho_arquivo)
+        except OSError:
+            return None
+
+    return f"{hash_arquivo}_v{VERSAO_EXTRATOR_PDF}"
+
+
+def obter_extracao(caminho_cache, chave):
+    """
+    Obtém do cache a extração de um arquivo
+        :param caminho_cache: Pasta onde os arquivos do cache são guardados
+        :param chave: Chave do arquivo no cache
+        :return: Dicionário contendo como chave a página do arquivo e como valor o conteúdo da página; se extraiu tudo e
+        validou o documento; relatório da validação. Retorna None se a extração não estiver no cache
+    """
+    caminho_entrada = os.path.join(caminho_cache, chave + EXTENSAO_CACHE)
+
+    try:
+        with open(caminho_entrada, 'rb') as arq:
+            entrada = json.loads(zlib.decompress(arq.read()).decode('utf-8'))
+
+        # O JSON não guarda chaves inteiras, por isso as páginas foram guardadas como pares [página, conteúdo]
+        doc = {pag: conteudo for pag, conteudo in entrada['paginas']}
+        validado, relatorio = entrada['validado'], entrada['relatorio']
+    except (OSError, zlib.error, ValueError, KeyError, TypeError):
+        # Entrada inexistente, removida por outro processo ou corrompida. Nesses casos o arquivo é extraído novamente
+        return None
+
+    # Marca a entrada como utilizada recentemente, pois a liberação de espaço remove as entradas menos utilizadas
+    try:
+        os.utime(caminho_entrada)
+    except OSError:
+        pass
+
+    return doc, validado, relatorio
+
+
+def guardar_extracao(caminho_cache, chave, doc, validado, relatorio, tamanho_maximo):
+    """
+    Guarda no cache a extração de um arquivo e libera espaço caso o cache ultrapasse o tamanho máximo
+        :param caminho_cache: Pasta onde os arquivos do cache são guardados
+        :param chave: Chave do arquivo no cache
+        :param doc: Dicionário contendo como chave a página do arquivo e como valor o conteúdo da página
+        :param validado: Se extraiu tudo e validou o documento
+        :param relatorio: Relatório da validação
+        :param tamanho_maximo: Tamanho máximo do cache em bytes
+    """
+    entrada = {'paginas': [[pag, conteudo] for pag, conteudo in doc.items()],
+               'validado': validado,
+               'relatorio': relatorio}
+
+    conteudo_comprimido = zlib.compress(json.dumps(entrada, ensure_ascii=False).encode('utf-8'))
+
+    caminho_entrada = os.path.join(caminho_cache, chave + EXTENSAO_CACHE)
+
+    # Grava num arquivo temporário e depois renomeia, para que os outros processos que leem o cache nunca encontrem
+    # uma entrada gravada pela metade
+    caminho_temporario = f"{caminho_entrada}.{os.getpid()}.tmp"
+
+    try:
+        with open(caminho_temporario, 'wb') as arq:
+            arq.write(conteudo_comprimido)
+
+        os.replace(caminho_temporario, caminho_entrada)
+    except OSError:
+        # O cache é apenas uma otimização, então o pré-processamento continua mesmo que não consiga gravar a entrada
+        print(f"\n  *> Erro ao gravar a extração no cache '{caminho_cache}'!", end='')
+        return
+
+    liberar_espaco(caminho_cache, tamanho_maximo)
+
+
+def liberar_espaco(caminho_cache, tamanho_maximo):
+    """
+    Remove as entradas utilizadas há mais tempo até que o cache fique dentro do tamanho máximo
+        :param caminho_cache: Pasta onde os arquivos do cache são guardados
+        :param tamanho_maximo: Tamanho máximo do cache em bytes
+    """
+    entradas = []
+    tamanho_total = 0
+
+    for e in os.scandir(caminho_cache):
+        if e.name.endswith(EXTENSAO_CACHE):
+            try:
+                info = e.stat()
+            except OSError:
+                continue
+
+            entradas.append((info.st_mtime, info.st_size, e.path))
+            tamanho_total += info.st_size
+
+    if tamanho_total <= tamanho_maximo:
+        return
+
+    # Entradas utilizadas há mais tempo primeiro
+    entradas.sort()
+
+    for _, tamanho, caminho in entradas:
+        if tamanho_total <= tamanho_maximo:
+            break
+
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            # Outro processo já removeu a entrada
+            pass
+        except PermissionError:
+            continue
+
+        tamanho_total -= tamanho
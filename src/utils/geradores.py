@@ -25,6 +25,22 @@ def gerar_hash_arquivo(paginas_dump_arq):
     return h.hexdigest()
 
 
+def gerar_hash_arquivo_bruto(caminho_arquivo, tamanho_bloco=1048576):
+    """
+    Gera um hash MD5 baseado nos bytes do arquivo, sem extrair o conteúdo dele
+        :param caminho_arquivo: Caminho do arquivo
+        :param tamanho_bloco: Quantidade de bytes lidos do arquivo por vez (padrão: 1 MB)
+        :return: Hash MD5 dos bytes do arquivo
+    """
+    h = hashlib.md5()
+
+    with open(caminho_arquivo, 'rb') as arq:
+        for bloco in iter(lambda: arq.read(tamanho_bloco), b''):
+            h.update(bloco)
+
+    return h.hexdigest()
+
+
 def gerar_head(paginas_dump_arq, qtd_tokens):
     """
     Gera um head com as primeiras paginas que contém os 'qtd_tokens' tokens (ex.: palavras, sinais de
@@ -140,6 +156,6 @@ def gerar_metadados_doc(codigo_lote, metadados, objeto_arq):
                          usuario_cadastrou=metadados['usuario_cadastrou'], codigo_lote=codigo_lote,
                          nome_arq_original=metadados['nome_arq_original'], url_web=metadados['url_web'],
                          caminho_base=metadados['caminho_base'], caminho_relativo=metadados['caminho_relativo'],
-                         head=head)
+                         head=head, hash_arquivo=metadados['hash_arquivo'])
 
     return doc_meta
@@ -21,27 +21,20 @@ def limpar_db_para_testes(interativo=False):
     if resp == 's' or not interativo:
         print("\nPara fins de testes, excluindo os editais cadastrados...", end='', flush=True)
 
-        from pymongo import MongoClient
-        from pymongo.errors import ConnectionFailure
-        from src.ambiente.parametros_globais import CONNECTION_ERROR
-
-        # Conecta ao banco
-        conexao = MongoClient('localhost', 27017)
-
-        try:
-            conexao.admin.command('ismaster')
-        except ConnectionFailure:
-            print('\nErro ao conectar ao banco de dados MongoDB. Faça testes e verifique:')
-            print('- se o nome do servidor está correto;')
-            print('- se a porta para conexão ao banco está correta;')
-            print('- se o banco está rodando e aceitando conexões.\n')
-            exit(CONNECTION_ERROR)
+        from src.classes.persistencia.conectores.mongodb import obter_cliente, liberar_cliente
+        from src.classes.persistencia.cliente import descartar_indices_criados
+
+        # Conecta ao banco utilizando o cliente compartilhado
+        conexao = obter_cliente('localhost', 27017)
 
         # Apaga os bancos de dados
         conexao.drop_database('db_documentos')
         conexao.drop_database('db_metadados')
 
-        conexao.close()
+        liberar_cliente('localhost', 27017)
+
+        # Os índices foram apagados junto com os bancos, então precisam ser criados novamente na próxima conexão
+        descartar_indices_criados('MongoDB', 'localhost', 27017, ['db_documentos', 'db_metadados'])
 
         print("OK!\n")
     elif resp != "n":
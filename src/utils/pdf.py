@@ -3,125 +3,196 @@
 # ----------------------------------------------------------------
 
 import re
+import math
+import time
 import PyPDF2
+from concurrent.futures import ProcessPoolExecutor
+from PyPDF2.generic import ArrayObject, IndirectObject
 from PyPDF2.utils import PdfReadError
 from pdfminer.high_level import extract_pages
 from pdfminer.layout import LTTextContainer
+from pdfminer.pdfpage import PDFPage
 from pdfminer.pdfparser import PDFSyntaxError
 from zlib import error
 from src.ambiente.parametros_globais import PERCENTUAL_PERMITIDO_PAGINAS_EM_BRANCO, \
     PERCENTUAL_PERMITIDO_PAGINAS_QTD_MINIMA_TERMOS, PERCENTUAL_PERMITIDO_PAGINAS_TERMOS_ESTRANHOS, \
     PERCENTUAL_PERMITIDO_TERMOS_ESTRANHOS, QUANTIDADE_MINIMA_TERMOS_POR_PAGINA, TAMANHO_MAXIMO_PALAVRA, \
-    QUANTIDADE_MAXIMA_NAO_ALFANUM
+    QUANTIDADE_MAXIMA_NAO_ALFANUM, QUANTIDADE_MINIMA_PAGINAS_EXTRACAO_PARALELA, EXTRACAO_FALLBACK_POR_PAGINA
 
 
-def filtrar_documento(doc, filtro):
+# Caracteres que são mantidos no conteúdo dos documentos. Os demais são considerados caracteres estranhos
+CARACTERES_MANTER = 'ªº°§áÁãÃâÂàÀéÉêÊíÍóÓõÕôÔúÚçÇ0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ!' \
+                    '"#$%&\'()*+,-./:;<=>?@[\\]^_`{|}~ \n\r\x0b\x0c'
+
+# Encontra as sequências de caracteres estranhos. É compilada uma única vez, na importação do módulo, pois a busca é
+# feita em C e evita percorrer as páginas caractere por caractere
+CARACTERES_ESTRANHOS = re.compile(f"[^{re.escape(CARACTERES_MANTER)}]+")
+
+# Filtro utilizado para filtrar o conteúdo de um documento e retirar caracteres sozinhos e/ou palavras
+FILTRO_DOCUMENTO = frozenset(['-', '_'])
+
+
+def limpar_pagina(conteudo, filtro):
     """
-    Filtra o conteúdo de um documento e retira caracteres sozinhos e/ou palavras especificados no filtro
-        :param doc: Dicionário com o documento que será filtrado
-        :param filtro: Filtro que será aplicado no documento
+    Limpa o conteúdo de uma página: retira os termos (caracteres sozinhos e/ou palavras) especificados no filtro e
+    remove os caracteres estranhos
+        :param conteudo: Conteúdo da página que será limpo
+        :param filtro: Conjunto com os termos que serão retirados da página
+        :return: Conteúdo da página limpo
     """
-    for pag in doc.keys():
-        conteudo_lst = doc[pag].split()
-        conteudo_filtrado = [c for c in conteudo_lst if c not in filtro]
-        doc[pag] = ' '.join(conteudo_filtrado)
+    conteudo_filtrado = ' '.join([t for t in conteudo.split() if t not in filtro])
+
+    return CARACTERES_ESTRANHOS.sub('', conteudo_filtrado)
 
 
-def remover_caracteres_estranhos(doc):
+def limpar_documento(doc, filtro):
     """
-    Remove caracteres estranhos de um documento, com base numa lista de caracteres que devem ser mantidos
-        :param doc: Dicionário com o documento que será analisado
+    Limpa o conteúdo de um documento (função "limpar_pagina"), tratando cada página uma única vez
+        :param doc: Dicionário com o documento que será limpo
+        :param filtro: Termos que serão retirados do documento
     """
-    caracteres_manter = 'ªº°§áÁãÃâÂàÀéÉêÊíÍóÓõÕôÔúÚçÇ0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ!' \
-                        '"#$%&\'()*+,-./:;<=>?@[\\]^_`{|}~ \n\r\x0b\x0c'
+    # Obs.: Converte o filtro para conjunto, pois a verificação é feita para cada termo da página
+    filtro = frozenset(filtro)
 
     for pag in doc.keys():
-        conteudo_limpo = ''.join([str(c) for c in doc[pag] if c in caracteres_manter])
-        doc[pag] = conteudo_limpo
+        doc[pag] = limpar_pagina(doc[pag], filtro)
+
 
+# Padrões utilizados na avaliação dos termos das páginas. São compilados uma única vez, na importação do módulo, pois a
+# avaliação é feita para cada termo de cada página dos documentos
+VOGAIS = re.compile(r'[aáãâàéeiíoóõúu]')
+NAO_ALFANUM = re.compile(r'[\W]')
 
-def validar_conteudo(doc):
+# Um termo só pode ser estranho se for maior que a maior palavra ou se tiver mais caracteres não alfanuméricos que o
+# permitido. Assim, os termos menores ou iguais a este tamanho não precisam ser avaliados
+TAMANHO_MINIMO_TERMO_ESTRANHO = min(TAMANHO_MAXIMO_PALAVRA, QUANTIDADE_MAXIMA_NAO_ALFANUM)
+
+
+def avaliar_pagina(pagina):
     """
-    Valida o conteúdo de um documento
-        :param doc: Dicionário com o documento que será validado
-        :return: True ou False, relatório da validação
+    Avalia o conteúdo de uma página com as regras utilizadas na validação dos documentos
+        :param pagina: Conteúdo da página que será avaliada
+        :return: Se a página está em branco; se tem menos termos que a quantidade mínima; se tem mais termos estranhos
+        que o permitido
     """
-    qtd_paginas = 0
+    if pagina == '':
+        return True, True, False
+
+    termos_estranhos = 0
+
+    # Para facilitar a busca por caracteres especiais:
+    # - Limpa pontos em sumários (substitui por ' '), pois não estava validando.
+    #   Exs.: Introdução...........5; Conlusão......40.
+    #
+    #   *** NOTA ***: Essa limpeza é apena para validação. A página lida do PDF não sofrerá alterações
+    #
+    #   >> Efeitos colaterais:
+    #         * Limpa pontos no final das palavras, entretanto não prejudica a validação
+    #         * Limpa pontos em números. Exs.: 1.0; 2.2.2; também não prejudica a validação
+    termos = pagina.replace('.', ' ').split()
+
+    qtd_termos = len(termos)
+
+    for t in termos:
+        if len(t) <= TAMANHO_MINIMO_TERMO_ESTRANHO:
+            continue
 
-    if doc:
-        qtd_paginas = len(doc)
+        # Regras para definir se um termo é estranho
+        if len(t) > TAMANHO_MAXIMO_PALAVRA:
+            # Maior palavra em português: pneumoultramicroscopicossilicovulcanoconiótico (46 letras)
+            # Fonte: https://www.bbc.com/portuguese/curiosidades-43938059
+            # É um bom parâmetro! :)
+            termos_estranhos += 1
+            continue
 
-    # Trata quantidade de páginas zerada para evitar erro de divisão por zero
-    if qtd_paginas == 0:
-        return False, {"# Erro = ": "Não foi possível extrair o texto do documento!"}
+        t_minusculo = t.lower()
 
-    validado = True
-    vogais = re.compile(r'[aáãâàéeiíoóõúu]')
-    nao_alfanum = re.compile(r'[\W]')
+        if VOGAIS.search(t_minusculo) is None:
+            # Busca por vogais nas palavras.
+            # Numa página com vários termos, se este termo for uma palavra,
+            # ela tem que ter pelo menos uma vogal (Obs.: linguas portuguesa e inglesa)
 
-    # Contadores para validação
-    paginas_em_branco = 0
-    paginas_menor_qtd_minima_termos = 0
-    paginas_termos_estranhos = 0
+            # Se não tem vogal, considera a possibilidade de ser uma sigla ou número. Exs.: SMTP, 99, D2 ou
+            # caracteres especiais, tais como $, @, %, &, etc., que podem estar sendo utilizados no texto
+            if len(NAO_ALFANUM.findall(t_minusculo)) > QUANTIDADE_MAXIMA_NAO_ALFANUM:
+                termos_estranhos += 1
 
-    for pagina in doc.values():
-        if pagina != '':
-            termos_estranhos = 0
-
-            # Para facilitar a busca por caracteres especiais:
-            # - Limpa pontos em sumários (substitui por ' '), pois não estava validando.
-            #   Exs.: Introdução...........5; Conlusão......40.
-            #
-            #   *** NOTA ***: Essa limpeza é apena para validação. A página lida do PDF não sofrerá alterações
-            #
-            #   >> Efeitos colaterais:
-            #         * Limpa pontos no final das palavras, entretanto não prejudica a validação
-            #         * Limpa pontos em números. Exs.: 1.0; 2.2.2; também não prejudica a validação
-            termos = pagina.replace('.', ' ').split()
-
-            qtd_termos = len(termos)
-
-            # Uma página com poucos termos, em se tratando de editais, pode ser considerada
-            # uma página em branco!
-            if qtd_termos < QUANTIDADE_MINIMA_TERMOS_POR_PAGINA:
-                paginas_menor_qtd_minima_termos += 1
-
-            for t in termos:
-                t_minusculo = t.lower()
-
-                # Regras para definir se um termo é estranho
-                if len(t) > TAMANHO_MAXIMO_PALAVRA:
-                    # Maior palavra em português: pneumoultramicroscopicossilicovulcanoconiótico (46 letras)
-                    # Fonte: https://www.bbc.com/portuguese/curiosidades-43938059
-                    # É um bom parâmetro! :)
-                    termos_estranhos += 1
-
-                elif len(vogais.findall(t_minusculo)) == 0:
-                    # Busca por vogais nas palavras.
-                    # Numa página com vários termos, se este termo for uma palavra,
-                    # ela tem que ter pelo menos uma vogal (Obs.: linguas portuguesa e inglesa)
-
-                    # Se não tem vogal, considera a possibilidade de ser uma sigla ou número. Exs.: SMTP, 99, D2 ou
-                    # caracteres especiais, tais como $, @, %, &, etc., que podem estar sendo utilizados no texto
-                    if len(nao_alfanum.findall(t_minusculo)) > QUANTIDADE_MAXIMA_NAO_ALFANUM:
-                        termos_estranhos += 1
-
-            if termos_estranhos > qtd_termos * PERCENTUAL_PERMITIDO_TERMOS_ESTRANHOS:
-                paginas_termos_estranhos += 1
+    # Uma página com poucos termos, em se tratando de editais, pode ser considerada
+    # uma página em branco!
+    menor_qtd_minima_termos = qtd_termos < QUANTIDADE_MINIMA_TERMOS_POR_PAGINA
 
-        else:
-            paginas_em_branco += 1
-            paginas_menor_qtd_minima_termos += 1
+    return False, menor_qtd_minima_termos, termos_estranhos > qtd_termos * PERCENTUAL_PERMITIDO_TERMOS_ESTRANHOS
 
-    # verifica se não ultrapassou os limites percentuais
 
-    # Para deixar o if menos confuso...
-    p1 = paginas_em_branco > qtd_paginas * PERCENTUAL_PERMITIDO_PAGINAS_EM_BRANCO
-    p2 = paginas_menor_qtd_minima_termos > qtd_paginas * PERCENTUAL_PERMITIDO_PAGINAS_QTD_MINIMA_TERMOS
-    p3 = paginas_termos_estranhos > qtd_paginas * PERCENTUAL_PERMITIDO_PAGINAS_TERMOS_ESTRANHOS
+def iniciar_validacao(qtd_paginas):
+    """
+    Inicia os contadores da validação de um documento. Permite validar as páginas à medida que são extraídas (função
+    "validar_pagina")
+        :param qtd_paginas: Quantidade total de páginas do documento
+        :return: Dicionário com os contadores da validação e o tempo gasto na validação das páginas
+    """
+    return {'qtd_paginas': qtd_paginas,
+            'paginas_avaliadas': 0,
+            'paginas_em_branco': 0,
+            'paginas_menor_qtd_minima_termos': 0,
+            'paginas_termos_estranhos': 0,
+            'tempo_validacao': 0.0}
+
 
-    if p1 or p2 or p3:
-        validado = False
+def verificar_limites(validacao):
+    """
+    Verifica se os contadores da validação ultrapassaram os limites percentuais definidos em parametros_globais.py
+        :param validacao: Dicionário com os contadores da validação (função "iniciar_validacao")
+        :return: Se ultrapassou o limite de páginas em branco; de páginas com menos termos que a quantidade mínima; de
+        páginas com termos estranhos
+    """
+    qtd_paginas = validacao['qtd_paginas']
+
+    p1 = validacao['paginas_em_branco'] > qtd_paginas * PERCENTUAL_PERMITIDO_PAGINAS_EM_BRANCO
+    p2 = validacao['paginas_menor_qtd_minima_termos'] > qtd_paginas * PERCENTUAL_PERMITIDO_PAGINAS_QTD_MINIMA_TERMOS
+    p3 = validacao['paginas_termos_estranhos'] > qtd_paginas * PERCENTUAL_PERMITIDO_PAGINAS_TERMOS_ESTRANHOS
+
+    return p1, p2, p3
+
+
+def validar_pagina(validacao, pagina):
+    """
+    Avalia uma página e atualiza os contadores da validação do documento
+        :param validacao: Dicionário com os contadores da validação (função "iniciar_validacao")
+        :param pagina: Conteúdo da página que será avaliada
+        :return: True se o documento ainda está dentro dos limites. False se algum limite já foi ultrapassado, ou seja,
+        o documento não passará na validação, independente das páginas restantes
+    """
+    inicio = time.perf_counter()
+    em_branco, menor_qtd_minima_termos, termos_estranhos = avaliar_pagina(pagina)
+
+    validacao['paginas_avaliadas'] += 1
+    validacao['paginas_em_branco'] += em_branco
+    validacao['paginas_menor_qtd_minima_termos'] += menor_qtd_minima_termos
+    validacao['paginas_termos_estranhos'] += termos_estranhos
+
+    # Os contadores só aumentam. Então, se um limite foi ultrapassado, o documento já está reprovado
+    dentro_limites = not any(verificar_limites(validacao))
+    validacao['tempo_validacao'] += time.perf_counter() - inicio
+
+    return dentro_limites
+
+
+def gerar_relatorio_validacao(validacao):
+    """
+    Apura os contadores da validação de um documento e gera o relatório
+        :param validacao: Dicionário com os contadores da validação (função "iniciar_validacao")
+        :return: True ou False, relatório da validação
+    """
+    qtd_paginas = validacao['qtd_paginas']
+    paginas_em_branco = validacao['paginas_em_branco']
+    paginas_menor_qtd_minima_termos = validacao['paginas_menor_qtd_minima_termos']
+    paginas_termos_estranhos = validacao['paginas_termos_estranhos']
+
+    # verifica se não ultrapassou os limites percentuais
+    p1, p2, p3 = verificar_limites(validacao)
+
+    validado = not (p1 or p2 or p3)
 
     # Apura os resultados e gera a mensagem de status
     r1 = f"{str(paginas_em_branco / qtd_paginas * 100)}%"
@@ -147,14 +218,214 @@ def validar_conteudo(doc):
                  "  - Percentual de Páginas com termos estranhos = ": r3,
                  }
 
+    if validacao['paginas_avaliadas'] < qtd_paginas:
+        relatorio["  - Validação interrompida = "] = f"Sim, após avaliar {validacao['paginas_avaliadas']} páginas. " \
+                                                      f"Os valores acima são parciais"
+
     return validado, relatorio
 
 
-def ler_pypdf2(arq_pdf, caminho_arquivo):
+def validar_conteudo(doc, interromper=True):
+    """
+    Valida o conteúdo de um documento
+        :param doc: Dicionário com o documento que será validado
+        :param interromper: Se True, interrompe a validação assim que algum limite for ultrapassado
+        :return: True ou False, relatório da validação
+    """
+    qtd_paginas = 0
+
+    if doc:
+        qtd_paginas = len(doc)
+
+    # Trata quantidade de páginas zerada para evitar erro de divisão por zero
+    if qtd_paginas == 0:
+        return False, {"# Erro = ": "Não foi possível extrair o texto do documento!"}
+
+    validacao = iniciar_validacao(qtd_paginas)
+
+    for pagina in doc.values():
+        if not validar_pagina(validacao, pagina) and interromper:
+            break
+
+    return gerar_relatorio_validacao(validacao)
+
+
+def dividir_paginas_em_intervalos(numero_paginas, qtd_processos, primeira_pagina=0):
+    """
+    Divide as páginas de um arquivo PDF em intervalos contíguos, um para cada processo. Ex.: 150 páginas e 4 processos
+    => [0, 38), [38, 76), [76, 114) e [114, 150)
+        :param numero_paginas: Quantidade de páginas do arquivo
+        :param qtd_processos: Quantidade de processos utilizados na extração
+        :param primeira_pagina: Índice da primeira página que será extraída (as anteriores não são divididas)
+        :return: Lista com o início de cada intervalo e lista com o fim de cada intervalo
+    """
+    tamanho_intervalo = math.ceil((numero_paginas - primeira_pagina) / qtd_processos)
+    inicios = list(range(primeira_pagina, numero_paginas, tamanho_intervalo))
+    fins = [min(i + tamanho_intervalo, numero_paginas) for i in inicios]
+
+    return inicios, fins
+
+
+def extrair_paginas_em_paralelo(funcao_extracao, caminho_arquivo, numero_paginas, qtd_processos, primeira_pagina=0):
+    """
+    Divide as páginas de um arquivo PDF em intervalos e extrai cada intervalo num processo separado
+        :param funcao_extracao: Função que extrai um intervalo de páginas (extrair_intervalo_pypdf2 ou
+                                extrair_intervalo_pdfminer)
+        :param caminho_arquivo: Caminho relativo ou caminho absoluto do arquivo
+        :param numero_paginas: Quantidade de páginas do arquivo
+        :param qtd_processos: Quantidade de processos utilizados na extração
+        :param primeira_pagina: Índice da primeira página que será extraída (a primeira página do arquivo é a 0)
+        :return: Dicionário contendo como chave a página do arquivo e como valor o conteúdo da página e se extraiu tudo
+    """
+    documento = {}
+    extraiu_tudo = True
+    inicios, fins = dividir_paginas_em_intervalos(numero_paginas, qtd_processos, primeira_pagina)
+
+    with ProcessPoolExecutor(max_workers=len(inicios)) as executor:
+        # Os resultados chegam na ordem dos intervalos, portanto as páginas são inseridas no dicionário em ordem
+        for documento_parcial, extraiu_tudo_parcial in executor.map(funcao_extracao, [caminho_arquivo] * len(inicios),
+                                                                    inicios, fins):
+            documento.update(documento_parcial)
+            extraiu_tudo = extraiu_tudo and extraiu_tudo_parcial
+
+    return documento, extraiu_tudo
+
+
+def gerar_paginas_em_paralelo(funcao_extracao, caminho_arquivo, numero_paginas, qtd_processos):
+    """
+    Divide as páginas de um arquivo PDF em intervalos, extrai cada intervalo num processo separado e gera as páginas à
+    medida que os intervalos são concluídos
+        :param funcao_extracao: Função que extrai um intervalo de páginas (extrair_intervalo_pypdf2 ou
+                                extrair_intervalo_pdfminer)
+        :param caminho_arquivo: Caminho relativo ou caminho absoluto do arquivo
+        :param numero_paginas: Quantidade de páginas do arquivo
+        :param qtd_processos: Quantidade de processos utilizados na extração
+        :return: Gerador de tuplas com o número da página e o seu conteúdo. Obs.: O conteúdo é None nas páginas de um
+        intervalo que não foi extraído completamente
+    """
+    inicios, fins = dividir_paginas_em_intervalos(numero_paginas, qtd_processos)
+    executor = ProcessPoolExecutor(max_workers=len(inicios))
+
+    try:
+        # Os resultados chegam na ordem dos intervalos, portanto as páginas são geradas em ordem
+        for documento_parcial, extraiu_tudo_parcial in executor.map(funcao_extracao, [caminho_arquivo] * len(inicios),
+                                                                    inicios, fins):
+            for num_pagina, conteudo_pagina in documento_parcial.items():
+                yield num_pagina, conteudo_pagina if extraiu_tudo_parcial else None
+    finally:
+        # Se a geração for interrompida, não espera os intervalos que faltam. Obs.: Os intervalos que ainda não
+        # começaram são cancelados e os que estão em execução terminam nos processos, sem bloquear quem chamou
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def liberar_conteudo_pagina(pdf_lido, pagina):
+    """
+    Retira do cache do PyPDF2 o conteúdo de uma página já extraída. Obs.: O PyPDF2 guarda o conteúdo (inclusive
+    decodificado) de todas as páginas lidas até o arquivo ser fechado, o que faz a memória crescer com o tamanho do
+    documento. Se for necessário, o conteúdo é lido novamente do arquivo.
+    ATENÇÃO: Utiliza o cache interno 'resolvedObjects' do PyPDF2 1.26.0 (versão do requirements.txt). Em outras versões
+    o cache pode não existir ou ter outro formato e, nesse caso, a função não faz nada (a memória só é liberada quando o
+    leitor do arquivo ou do intervalo de páginas é descartado)
+        :param pdf_lido: Arquivo PDF lido pelo PyPDF2
+        :param pagina: Página do arquivo PDF lido pelo PyPDF2
+    """
+    cache = getattr(pdf_lido, 'resolvedObjects', None)
+
+    if not isinstance(cache, dict) or '/Contents' not in pagina:
+        return
+
+    # O conteúdo de uma página pode estar dividido em vários streams
+    conteudo = pagina.raw_get('/Contents')
+    referencias = []
+
+    if isinstance(conteudo, IndirectObject):
+        referencias.append(conteudo)
+        conteudo = conteudo.getObject()
+
+    if isinstance(conteudo, ArrayObject):
+        referencias += [r for r in conteudo if isinstance(r, IndirectObject)]
+
+    for r in referencias:
+        cache.pop((r.generation, r.idnum), None)
+
+
+def gerar_paginas_pypdf2(pdf_lido, paginas):
+    """
+    Gera o texto das páginas de um arquivo PDF lido com o PyPDF2, uma página por vez, à medida que são extraídas
+        :param pdf_lido: Arquivo PDF lido pelo PyPDF2
+        :param paginas: Índices das páginas que serão extraídas (a primeira página é a 0)
+        :return: Gerador de tuplas com o número da página e o seu conteúdo. Obs.: O conteúdo é None se a página não pôde
+        ser extraída
+    """
+    for i in paginas:
+        pagina = pdf_lido.getPage(i)
+
+        try:
+            conteudo_pagina = pagina.extractText()
+        except (error, KeyError):
+            yield i + 1, None
+            continue
+
+        liberar_conteudo_pagina(pdf_lido, pagina)
+
+        # Transforma a página numa string e retira as tabulações e quebras de linhas
+        pag_string = ''.join(conteudo_pagina)
+        pag_string_formatada = re.sub('\t', ' ', pag_string)
+        pag_string_formatada = re.sub('\n', '', pag_string_formatada)
+
+        yield i + 1, pag_string_formatada
+
+
+def extrair_paginas_pypdf2(pdf_lido, caminho_arquivo, paginas):
+    """
+    Extrai o texto de algumas páginas de um arquivo PDF lido com o PyPDF2
+        :param pdf_lido: Arquivo PDF lido pelo PyPDF2
+        :param caminho_arquivo: Caminho relativo ou caminho absoluto do arquivo
+        :param paginas: Índices das páginas que serão extraídas (a primeira página é a 0)
+        :return: Dicionário contendo como chave a página do arquivo e como valor o conteúdo da página e se extraiu tudo.
+        Obs.: As páginas que não puderam ser extraídas ficam vazias no dicionário
+    """
+    extraiu_tudo = True
+    documento = {}
+
+    # Obtêm as páginas do documento PDF lido e as formata
+    for num_pagina, conteudo_pagina in gerar_paginas_pypdf2(pdf_lido, paginas):
+        if conteudo_pagina is None:
+            print(f"\n  *> Erro ao extrair a página {num_pagina} do arquivo '{caminho_arquivo}'!", end='')
+            extraiu_tudo = False
+
+            # Guarda a página vazia para manter a ordem das páginas e para que ela possa ser extraída novamente
+            # com o pdfminer
+            documento[num_pagina] = ''
+            continue
+
+        # Adiciona o número da página como chave e o conteúdo como valor
+        documento[num_pagina] = conteudo_pagina
+
+    return documento, extraiu_tudo
+
+
+def extrair_intervalo_pypdf2(caminho_arquivo, inicio, fim):
+    """
+    Extrai o texto de um intervalo de páginas de um arquivo PDF com o PyPDF2. Obs.: Executada pelos processos da
+    extração paralela, por isso abre o arquivo novamente
+        :param caminho_arquivo: Caminho relativo ou caminho absoluto do arquivo
+        :param inicio: Índice da primeira página do intervalo (a primeira página do arquivo é a 0)
+        :param fim: Índice da página seguinte à última página do intervalo
+        :return: Dicionário contendo como chave a página do arquivo e como valor o conteúdo da página e se extraiu tudo
+    """
+    with open(caminho_arquivo, 'rb') as arq_pdf:
+        pdf_lido = PyPDF2.PdfFileReader(arq_pdf, strict=False)
+        return extrair_paginas_pypdf2(pdf_lido, caminho_arquivo, range(inicio, fim))
+
+
+def ler_pypdf2(arq_pdf, caminho_arquivo, qtd_processos=1):
     """
     Lê um arquivo no formato PDF com o PyPDF2
         :param arq_pdf: Arquivo PDF aberto
         :param caminho_arquivo: Caminho relativo ou caminho absoluto do arquivo
+        :param qtd_processos: Quantidade de processos utilizados para extrair as páginas em paralelo. Obs.: Só tem
+                              efeito em arquivos com pelo menos QUANTIDADE_MINIMA_PAGINAS_EXTRACAO_PARALELA páginas
         :return: Dicionário contendo como chave a página do arquivo e como valor o conteúdo da página e se extraiu tudo
     """
     numero_paginas = 0
@@ -175,33 +446,73 @@ def ler_pypdf2(arq_pdf, caminho_arquivo):
         print(f"\n  *> Erro ao ler o arquivo PDF. O arquivo '{caminho_arquivo}' contém valores inválidos!", end='')
         extraiu_tudo = False
 
-    # Obtêm as páginas do documento PDF lido e as formata
-    for i in range(numero_paginas):
-        pagina = pdf_lido.getPage(i)
-
-        try:
-            conteudo_pagina = pagina.extractText()
-        except (error, KeyError):
-            print(f"\n  *> Erro ao extrair a página {i + 1} do arquivo '{caminho_arquivo}'!", end='')
-            extraiu_tudo = False
-            continue
-
-        # Transforma a página numa string e retira as tabulações e quebras de linhas
-        pag_string = ''.join(conteudo_pagina)
-        pag_string_formatada = re.sub('\t', ' ', pag_string)
-        pag_string_formatada = re.sub('\n', '', pag_string_formatada)
+    if numero_paginas > 0:
+        # Em documentos pequenos não compensa o custo de criar os processos
+        if qtd_processos > 1 and numero_paginas >= QUANTIDADE_MINIMA_PAGINAS_EXTRACAO_PARALELA:
+            documento, extraiu_paginas = extrair_paginas_em_paralelo(extrair_intervalo_pypdf2, caminho_arquivo,
+                                                                     numero_paginas, qtd_processos)
+        else:
+            documento, extraiu_paginas = extrair_paginas_pypdf2(pdf_lido, caminho_arquivo, range(numero_paginas))
 
-        # Adiciona o número da página como chave e o conteúdo como valor
-        documento[i + 1] = pag_string_formatada
+        extraiu_tudo = extraiu_tudo and extraiu_paginas
 
     return documento, extraiu_tudo, corrompido
 
 
-def ler_pdfminer(arq_pdf, caminho_arquivo):
+def completar_pypdf2(arq_pdf, caminho_arquivo, paginas_extraidas, pagina_interrompida, qtd_processos=1):
     """
-    Lê um arquivo no formato PDF com o pdfminer
+    Completa com o PyPDF2 a leitura de um arquivo PDF que foi interrompida pela função "gerar_paginas_pdf", extraindo
+    somente as páginas seguintes à página onde a leitura parou
         :param arq_pdf: Arquivo PDF aberto
         :param caminho_arquivo: Caminho relativo ou caminho absoluto do arquivo
+        :param paginas_extraidas: Dicionário com as páginas já extraídas e limpas (função "limpar_pagina")
+        :param pagina_interrompida: Tupla com o número da página onde a leitura parou e o seu conteúdo limpo (None se a
+                                    página não pôde ser extraída)
+        :param qtd_processos: Quantidade de processos utilizados para extrair as páginas em paralelo. Obs.: Só tem
+                              efeito se faltarem pelo menos QUANTIDADE_MINIMA_PAGINAS_EXTRACAO_PARALELA páginas
+        :return: Dicionário contendo como chave a página do arquivo e como valor o conteúdo limpo da página, se extraiu
+        tudo e se o arquivo está corrompido
+    """
+    num_interrompida, conteudo_interrompida = pagina_interrompida
+    documento = dict(paginas_extraidas)
+    extraiu_tudo = conteudo_interrompida is not None
+
+    if extraiu_tudo:
+        documento[num_interrompida] = conteudo_interrompida
+    else:
+        print(f"\n  *> Erro ao extrair a página {num_interrompida} do arquivo '{caminho_arquivo}'!", end='')
+
+        # Guarda a página vazia para manter a ordem das páginas e para que ela possa ser extraída com o pdfminer
+        documento[num_interrompida] = ''
+
+    # O arquivo já foi aberto pela função "gerar_paginas_pdf", então não precisa tratar os erros de abertura
+    pdf_lido = PyPDF2.PdfFileReader(arq_pdf, strict=False)
+    numero_paginas = pdf_lido.getNumPages()
+
+    # Obs.: Os índices começam em 0, então o índice 'num_interrompida' é o da página seguinte à página interrompida
+    if num_interrompida < numero_paginas:
+        if qtd_processos > 1 and numero_paginas - num_interrompida >= QUANTIDADE_MINIMA_PAGINAS_EXTRACAO_PARALELA:
+            doc_restante, extraiu_restante = extrair_paginas_em_paralelo(extrair_intervalo_pypdf2, caminho_arquivo,
+                                                                         numero_paginas, qtd_processos,
+                                                                         num_interrompida)
+        else:
+            doc_restante, extraiu_restante = extrair_paginas_pypdf2(pdf_lido, caminho_arquivo,
+                                                                    range(num_interrompida, numero_paginas))
+
+        limpar_documento(doc_restante, FILTRO_DOCUMENTO)
+        documento.update(doc_restante)
+        extraiu_tudo = extraiu_tudo and extraiu_restante
+
+    return documento, extraiu_tudo, False
+
+
+def extrair_paginas_pdfminer(arq_pdf, caminho_arquivo, paginas=None):
+    """
+    Extrai o texto das páginas de um arquivo PDF com o pdfminer
+        :param arq_pdf: Arquivo PDF aberto ou caminho do arquivo
+        :param caminho_arquivo: Caminho relativo ou caminho absoluto do arquivo
+        :param paginas: Índices das páginas que serão extraídas (a primeira página é a 0), em ordem crescente. Se não
+                        for informado, extrai todas as páginas
         :return: Dicionário contendo como chave a página do arquivo e como valor o conteúdo da página e se extraiu tudo
     """
     pdf_lido = None
@@ -209,7 +520,7 @@ def ler_pdfminer(arq_pdf, caminho_arquivo):
     documento = {}
 
     try:
-        pdf_lido = extract_pages(arq_pdf)
+        pdf_lido = extract_pages(arq_pdf, page_numbers=paginas)
     except PDFSyntaxError:
         print(f"\n  *> Erro ao ler o arquivo PDF. O arquivo '{caminho_arquivo}' está corrompido ou mal formado!",
               end='')
@@ -220,10 +531,8 @@ def ler_pdfminer(arq_pdf, caminho_arquivo):
 
     # Obtêm as páginas do documento PDF lido e as formata
     if pdf_lido:
-        num_pagina = 1
-
         try:
-            for layout_pagina in pdf_lido:
+            for indice, layout_pagina in enumerate(pdf_lido):
                 texto_pagina = ""
 
                 for elemento in layout_pagina:
@@ -235,9 +544,10 @@ def ler_pdfminer(arq_pdf, caminho_arquivo):
                 pag_string_formatada = re.sub('\t', ' ', pag_string)
                 pag_string_formatada = re.sub('\n', ' ', pag_string_formatada)
 
-                # Adiciona o número da página como chave e o conteúdo como valor
+                # Adiciona o número da página como chave e o conteúdo como valor. Obs.: Se foram escolhidas algumas
+                # páginas, o pdfminer as devolve na ordem do documento
+                num_pagina = indice + 1 if paginas is None else paginas[indice] + 1
                 documento[num_pagina] = pag_string_formatada
-                num_pagina += 1
         except TypeError:
             print(f"\n  *> Erro ao ler o arquivo PDF. Não foi possível extrair as páginas do arquivo "
                   f"'{caminho_arquivo}'.", end='')
@@ -246,10 +556,57 @@ def ler_pdfminer(arq_pdf, caminho_arquivo):
     return documento, extraiu_tudo
 
 
-def ler_pdf(caminho_arquivo):
+def extrair_intervalo_pdfminer(caminho_arquivo, inicio, fim):
+    """
+    Extrai o texto de um intervalo de páginas de um arquivo PDF com o pdfminer. Obs.: Executada pelos processos da
+    extração paralela
+        :param caminho_arquivo: Caminho relativo ou caminho absoluto do arquivo
+        :param inicio: Índice da primeira página do intervalo (a primeira página do arquivo é a 0)
+        :param fim: Índice da página seguinte à última página do intervalo
+        :return: Dicionário contendo como chave a página do arquivo e como valor o conteúdo da página e se extraiu tudo
+    """
+    return extrair_paginas_pdfminer(caminho_arquivo, caminho_arquivo, list(range(inicio, fim)))
+
+
+def ler_pdfminer(arq_pdf, caminho_arquivo, qtd_processos=1):
+    """
+    Lê um arquivo no formato PDF com o pdfminer
+        :param arq_pdf: Arquivo PDF aberto
+        :param caminho_arquivo: Caminho relativo ou caminho absoluto do arquivo
+        :param qtd_processos: Quantidade de processos utilizados para extrair as páginas em paralelo. Obs.: Só tem
+                              efeito em arquivos com pelo menos QUANTIDADE_MINIMA_PAGINAS_EXTRACAO_PARALELA páginas
+        :return: Dicionário contendo como chave a página do arquivo e como valor o conteúdo da página e se extraiu tudo
+    """
+    numero_paginas = 0
+
+    # Só conta as páginas se puder extrair em paralelo
+    if qtd_processos > 1:
+        try:
+            numero_paginas = sum(1 for _ in PDFPage.get_pages(arq_pdf))
+        except (PDFSyntaxError, ValueError, TypeError):
+            numero_paginas = 0  # Deixa o tratamento do erro para a extração sequencial
+
+        arq_pdf.seek(0)
+
+    if numero_paginas >= QUANTIDADE_MINIMA_PAGINAS_EXTRACAO_PARALELA:
+        return extrair_paginas_em_paralelo(extrair_intervalo_pdfminer, caminho_arquivo, numero_paginas,
+                                           qtd_processos)
+    else:
+        return extrair_paginas_pdfminer(arq_pdf, caminho_arquivo)
+
+
+def ler_pdf(caminho_arquivo, qtd_processos=1, fallback_por_pagina=EXTRACAO_FALLBACK_POR_PAGINA, paginas_extraidas=None,
+            pagina_interrompida=None):
     """
     Lê um arquivo no formato PDF
         :param caminho_arquivo: Caminho relativo ou caminho absoluto do arquivo
+        :param qtd_processos: Quantidade de processos utilizados para extrair as páginas de arquivos grandes em paralelo
+        :param fallback_por_pagina: Se o PyPDF2 não extrair ou não validar o documento, extrai novamente com o pdfminer
+                                    somente as páginas com problema. Caso contrário, extrai o documento inteiro
+        :param paginas_extraidas: Páginas já extraídas e limpas pela função "gerar_paginas_pdf", que não são extraídas
+                                  novamente pelo PyPDF2. Só é utilizado junto com o parâmetro 'pagina_interrompida'
+        :param pagina_interrompida: Página onde a função "gerar_paginas_pdf" parou (ver a chave 'pagina_interrompida'
+                                    da validação). Se não for informada, o arquivo é lido desde a primeira página
         :return: Dicionário contendo como chave a página do arquivo e como valor o conteúdo da página;
         se extraiu tudo e validou o documento; relatório da validação
     """
@@ -259,9 +616,6 @@ def ler_pdf(caminho_arquivo):
     extraiu_tudo = True
     validado = False
 
-    # Filtro utilizado para filtrar o conteúdo de um documento e retirar caracteres sozinhos e/ou palavras
-    filtro = ['-', '_']
-
     try:
         arq_pdf = open(caminho_arquivo, 'rb')
     except FileNotFoundError:
@@ -272,27 +626,122 @@ def ler_pdf(caminho_arquivo):
         print(f"\n  *> Erro ao abrir o arquivo. '{caminho_arquivo}' é um diretório!", end='')
 
     if arq_pdf:
-        documento, extraiu_tudo, corrompido = ler_pypdf2(arq_pdf, caminho_arquivo)
+        # As páginas são limpas assim que são obtidas, pois a limpeza não pode ser aplicada duas vezes na mesma página
+        if pagina_interrompida is not None:
+            documento, extraiu_tudo, corrompido = completar_pypdf2(arq_pdf, caminho_arquivo, paginas_extraidas or {},
+                                                                   pagina_interrompida, qtd_processos)
+        else:
+            documento, extraiu_tudo, corrompido = ler_pypdf2(arq_pdf, caminho_arquivo, qtd_processos)
+            limpar_documento(documento, FILTRO_DOCUMENTO)
 
         if extraiu_tudo:
-            filtrar_documento(documento, filtro)
-            remover_caracteres_estranhos(documento)
             validado, relatorio = validar_conteudo(documento)
 
         # Caso não tenha extraido o PDF ou não validado, tenta com outro leitor. Obs.: Fiz dessa forma pois o PyPDF2 é
         # mais rápido que o pdfminer, entretando não consegue ler alguns PDFs que o pdfminer consegue!
         # Veja: https://stackoverflow.com/questions/26494211/extracting-text-from-a-pdf-file-using-pdfminer-in-python
         if (not extraiu_tudo or not validado) and not corrompido:
-            print("\n                 Não conseguiu extrair com o PyPDF2! Tentando extrair com o pdfminer...", end='')
-            documento, extraiu_tudo = ler_pdfminer(arq_pdf, caminho_arquivo)
+            # Se o PyPDF2 obteve as páginas do documento, extrai novamente somente as páginas com problema, pois o
+            # pdfminer é bem mais lento
+            if fallback_por_pagina and documento:
+                # Páginas que o PyPDF2 não conseguiu extrair (ficaram vazias) ou que não passaram nas regras de
+                # validação
+                paginas_invalidas = [pag for pag, conteudo in documento.items() if any(avaliar_pagina(conteudo))]
+
+                print(f"\n                 Não conseguiu extrair {len(paginas_invalidas)} página(s) com o PyPDF2! "
+                      f"Tentando extrair essas páginas com o pdfminer...", end='')
 
-            if extraiu_tudo:
-                filtrar_documento(documento, filtro)
-                remover_caracteres_estranhos(documento)
-                validado, relatorio = validar_conteudo(documento)
+                doc_pdfminer, extraiu_pdfminer = extrair_paginas_pdfminer(arq_pdf, caminho_arquivo,
+                                                                          [pag - 1 for pag in paginas_invalidas])
+
+                limpar_documento(doc_pdfminer, FILTRO_DOCUMENTO)
+
+                # Junta as páginas extraídas pelos dois leitores. Obs.: As páginas já existem no dicionário, portanto a
+                # ordem delas não é alterada
+                documento.update(doc_pdfminer)
+
+                # As páginas que o PyPDF2 não conseguiu extrair estão entre as páginas inválidas
+                if extraiu_pdfminer and len(doc_pdfminer) == len(paginas_invalidas):
+                    extraiu_tudo = True
+
+                if extraiu_tudo:
+                    validado, relatorio = validar_conteudo(documento)
+                else:
+                    relatorio = {"# Erro = ": "Não foi possível extrair completamente o texto do documento!"}
             else:
-                relatorio = {"# Erro = ": "Não foi possível extrair completamente o texto do documento!"}
+                print("\n                 Não conseguiu extrair com o PyPDF2! Tentando extrair com o pdfminer...",
+                      end='')
+                documento, extraiu_tudo = ler_pdfminer(arq_pdf, caminho_arquivo, qtd_processos)
+
+                if extraiu_tudo:
+                    limpar_documento(documento, FILTRO_DOCUMENTO)
+                    validado, relatorio = validar_conteudo(documento)
+                else:
+                    relatorio = {"# Erro = ": "Não foi possível extrair completamente o texto do documento!"}
 
         arq_pdf.close()
 
     return documento, extraiu_tudo and validado, relatorio
+
+
+def gerar_paginas_pdf(caminho_arquivo, validacao, qtd_processos=1):
+    """
+    Gera as páginas de um arquivo PDF à medida que são extraídas com o PyPDF2, já limpas (função "limpar_pagina") e
+    validadas (função "validar_pagina"), para que o documento inteiro não precise ficar na memória durante a leitura.
+    Obs.: Para na primeira página que não pôde ser extraída ou assim que o documento ultrapassa algum limite da
+    validação. Nesses casos a leitura tem que ser completada com a função "ler_pdf" (parâmetros 'paginas_extraidas' e
+    'pagina_interrompida'), que extrai somente as páginas seguintes, tenta novamente com o pdfminer e informa os erros
+        :param caminho_arquivo: Caminho relativo ou caminho absoluto do arquivo
+        :param validacao: Dicionário com os contadores da validação (função "iniciar_validacao"). A quantidade de
+                          páginas é preenchida após abrir o arquivo, a chave 'concluida' indica se todas as páginas
+                          foram geradas dentro dos limites da validação e a chave 'pagina_interrompida' guarda o número
+                          e o conteúdo limpo (None se não pôde ser extraída) da página onde a geração parou
+        :param qtd_processos: Quantidade de processos utilizados para extrair as páginas de arquivos grandes em paralelo
+        :return: Gerador de tuplas com o número da página e o seu conteúdo
+    """
+    validacao['concluida'] = False
+    validacao['pagina_interrompida'] = None
+
+    try:
+        arq_pdf = open(caminho_arquivo, 'rb')
+    except (FileNotFoundError, PermissionError, IsADirectoryError):
+        return
+
+    with arq_pdf:
+        try:
+            pdf_lido = PyPDF2.PdfFileReader(arq_pdf, strict=False)
+            numero_paginas = pdf_lido.getNumPages()
+        except (PdfReadError, ValueError):
+            return
+
+        if numero_paginas == 0:
+            return
+
+        validacao['qtd_paginas'] = numero_paginas
+
+        # Em documentos pequenos não compensa o custo de criar os processos
+        if qtd_processos > 1 and numero_paginas >= QUANTIDADE_MINIMA_PAGINAS_EXTRACAO_PARALELA:
+            paginas = gerar_paginas_em_paralelo(extrair_intervalo_pypdf2, caminho_arquivo, numero_paginas,
+                                                qtd_processos)
+        else:
+            paginas = gerar_paginas_pypdf2(pdf_lido, range(numero_paginas))
+
+        try:
+            for num_pagina, conteudo_pagina in paginas:
+                if conteudo_pagina is None:
+                    validacao['pagina_interrompida'] = (num_pagina, None)
+                    return
+
+                conteudo_pagina = limpar_pagina(conteudo_pagina, FILTRO_DOCUMENTO)
+
+                if not validar_pagina(validacao, conteudo_pagina):
+                    validacao['pagina_interrompida'] = (num_pagina, conteudo_pagina)
+                    return
+
+                yield num_pagina, conteudo_pagina
+        finally:
+            # Encerra a extração mesmo que a geração tenha sido interrompida. Obs.: Na extração paralela, os intervalos
+            # que ainda não começaram são cancelados, sem esperar os que estão em execução
+            paginas.close()
+
+    validacao['concluida'] = True
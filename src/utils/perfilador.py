@@ -0,0 +1,160 @@
+# ----------------------------------------------------------------
+# Perfilador opcional dos pontos de entrada do sistema. É ativado
+# pela variável de ambiente EDITAIS_PERFIL, por exemplo:
+#
+#   EDITAIS_PERFIL=cprofile python interface_prog.py
+#   EDITAIS_PERFIL=pyinstrument EDITAIS_PERFIL_PASTA=/tmp python gerar_dataset_anotacao.py
+#
+# Sem a variável, as funções não são alteradas (custo zero)
+# ----------------------------------------------------------------
+import os
+import io
+import pstats
+import cProfile
+import functools
+import importlib.util
+from src.utils.geradores import gerar_data, gerar_epoch
+
+# Perfilador utilizado: 'cprofile' ou 'pyinstrument'. Vazio desativa. Obs.: A variável é lida na importação do módulo
+PERFILADOR = os.environ.get('EDITAIS_PERFIL', '').strip().lower()
+
+# Pasta onde os perfis são gravados. Se vazia, utiliza a pasta de saída informada pela própria execução (função
+# "registrar_pasta_saida") ou a pasta atual
+PASTA_PERFIL = os.environ.get('EDITAIS_PERFIL_PASTA', '').strip()
+
+# Quantidade de funções listadas no resumo do cProfile
+QUANTIDADE_FUNCOES_RESUMO = 60
+
+# Pasta de saída da execução que está sendo perfilada
+_execucao = {'pasta_saida': ''}
+
+
+def registrar_pasta_saida(caminho):
+    """
+    Informa a pasta de saída da execução atual, para que o perfil seja gravado junto com os arquivos gerados (ex.: a
+    pasta dos datasets). Obs.: Sem efeito se o perfilador não estiver ativo
+        :param caminho: Caminho da pasta de saída
+    """
+    if PERFILADOR:
+        _execucao['pasta_saida'] = caminho
+
+
+def obter_caminho_perfil(nome_funcao, extensao):
+    """
+    Monta o caminho do arquivo do perfil, com data e hora no nome para não sobrescrever os perfis anteriores
+        :param nome_funcao: Nome da função perfilada
+        :param extensao: Extensão do arquivo
+        :return: Caminho do arquivo do perfil
+    """
+    pasta = PASTA_PERFIL or _execucao['pasta_saida'] or os.getcwd()
+    data_hora = gerar_data(gerar_epoch(), '%Y-%m-%d_%H%M%Shs')
+
+    try:
+        os.makedirs(pasta, exist_ok=True)
+    except PermissionError:
+        print(f"\nNão foi possível criar a pasta '{pasta}' para gravar o perfil. Utilizando a pasta atual.")
+        pasta = os.getcwd()
+
+    return os.path.join(pasta, f"perfil_{nome_funcao}_{data_hora}{extensao}")
+
+
+def gravar_perfil_cprofile(perfil, nome_funcao):
+    """
+    Grava o perfil do cProfile no formato do pstats (para snakeviz, etc.) e um resumo em texto
+        :param perfil: Objeto cProfile.Profile com a execução perfilada
+        :param nome_funcao: Nome da função perfilada
+    """
+    caminho_perfil = obter_caminho_perfil(nome_funcao, '.prof')
+    perfil.dump_stats(caminho_perfil)
+
+    resumo = io.StringIO()
+    pstats.Stats(perfil, stream=resumo).sort_stats('cumulative').print_stats(QUANTIDADE_FUNCOES_RESUMO)
+
+    with open(caminho_perfil[:-len('.prof')] + '.txt', 'w') as arq_resumo:
+        arq_resumo.write(resumo.getvalue())
+
+    print(f"\nPerfil de '{nome_funcao}' gravado em '{caminho_perfil}'")
+
+
+def executar_cprofile(funcao, args, kwargs):
+    """
+    Executa uma função com o cProfile e grava o perfil, mesmo que a função encerre o sistema (exit)
+        :param funcao: Função perfilada
+        :param args: Argumentos posicionais da função
+        :param kwargs: Argumentos nomeados da função
+        :return: Retorno da função
+    """
+    perfil = cProfile.Profile()
+    perfil.enable()
+
+    try:
+        return funcao(*args, **kwargs)
+    finally:
+        perfil.disable()
+        gravar_perfil_cprofile(perfil, funcao.__name__)
+
+
+def executar_pyinstrument(funcao, args, kwargs):
+    """
+    Executa uma função com o pyinstrument e grava o perfil em HTML, mesmo que a função encerre o sistema (exit)
+        :param funcao: Função perfilada
+        :param args: Argumentos posicionais da função
+        :param kwargs: Argumentos nomeados da função
+        :return: Retorno da função
+    """
+    from pyinstrument import Profiler
+
+    perfil = Profiler()
+    perfil.start()
+
+    try:
+        return funcao(*args, **kwargs)
+    finally:
+        perfil.stop()
+        caminho_perfil = obter_caminho_perfil(funcao.__name__, '.html')
+
+        with open(caminho_perfil, 'w') as arq_perfil:
+            arq_perfil.write(perfil.output_html())
+
+        print(f"\nPerfil de '{funcao.__name__}' gravado em '{caminho_perfil}'")
+
+
+def escolher_perfilador():
+    """
+    Escolhe a função que executa o perfilador configurado na variável de ambiente EDITAIS_PERFIL
+        :return: Função que executa o perfilador (None se o perfilador estiver desativado)
+    """
+    if not PERFILADOR:
+        return None
+
+    if PERFILADOR == 'pyinstrument':
+        if importlib.util.find_spec('pyinstrument') is not None:
+            return executar_pyinstrument
+
+        print("\nO pacote 'pyinstrument' não está instalado. Utilizando o cProfile.")
+    elif PERFILADOR != 'cprofile':
+        print(f"\nPerfilador '{PERFILADOR}' inválido (opções: 'cprofile' ou 'pyinstrument'). Utilizando o cProfile.")
+
+    return executar_cprofile
+
+
+# Escolhido uma única vez, na importação do módulo
+EXECUTAR_PERFILADOR = escolher_perfilador()
+
+
+def perfilar(funcao):
+    """
+    Decorador dos pontos de entrada do sistema. Se o perfilador estiver ativo (variável de ambiente EDITAIS_PERFIL),
+    executa a função perfilada e grava o perfil. Obs.: Somente o processo principal é perfilado, os processos criados
+    pela função (ex.: leitura paralela dos arquivos) não aparecem no perfil
+        :param funcao: Função que será perfilada
+        :return: A própria função, se o perfilador estiver desativado, ou a função perfilada
+    """
+    if EXECUTAR_PERFILADOR is None:
+        return funcao
+
+    @functools.wraps(funcao)
+    def funcao_perfilada(*args, **kwargs):
+        return EXECUTAR_PERFILADOR(funcao, args, kwargs)
+
+    return funcao_perfilada
@@ -0,0 +1,183 @@
+# ----------------------------------------------------------------
+# Funções para executar tarefas num processo supervisionado, com
+# limite de tempo e de memória
+# ----------------------------------------------------------------
+
+import os
+import sys
+import time
+import signal
+import multiprocessing
+from src.ambiente.parametros_globais import SUPERVISOR_INTERVALO_VERIFICACAO_MEMORIA
+
+# Obs.: A memória dos processos é lida do /proc, por isso o limite de memória só é aplicado no Linux
+CAMINHO_PROC = '/proc'
+
+
+def memoria_monitorada():
+    """
+    Verifica se a memória dos processos supervisionados pode ser medida neste sistema
+        :return: True se a memória pode ser medida
+    """
+    return os.path.isfile(os.path.join(CAMINHO_PROC, 'self', 'stat'))
+
+
+def obter_memoria_grupo(id_grupo):
+    """
+    Obtém a memória residente (RSS) de todos os processos de um grupo. Obs.: Ao contrário do espaço de endereçamento,
+    a memória residente não conta as bibliotecas herdadas e não utilizadas, nem a memória reservada e não utilizada
+        :param id_grupo: Identificador do grupo de processos
+        :return: Soma da memória residente dos processos do grupo em bytes
+    """
+    tamanho_pagina = os.sysconf('SC_PAGE_SIZE')
+    memoria = 0
+
+    for pid in os.listdir(CAMINHO_PROC):
+        if not pid.isdigit():
+            continue
+
+        try:
+            with open(os.path.join(CAMINHO_PROC, pid, 'stat'), 'rb') as arq:
+                stat = arq.read()
+        except OSError:
+            # O processo terminou durante a leitura
+            continue
+
+        # O nome do processo (2º campo) pode ter espaços e fica entre parênteses, por isso os campos são separados
+        # somente depois dele. Após o nome: estado, processo pai, grupo, ... e a memória residente (em páginas) na
+        # 22ª posição
+        campos = stat[stat.rfind(b')') + 2:].split()
+
+        if int(campos[2]) == id_grupo:
+            memoria += int(campos[21]) * tamanho_pagina
+
+    return memoria
+
+
+def executar_tarefa(conexao, funcao, args):
+    """
+    Executa uma tarefa no processo supervisionado e envia o resultado para o supervisor
+        :param conexao: Conexão (Pipe) por onde o resultado é enviado
+        :param funcao: Função que será executada
+        :param args: Tupla com os argumentos da função
+    """
+    # Cria um grupo de processos para que os processos criados pela tarefa (ex.: extração paralela das páginas) também
+    # sejam medidos e encerrados caso a tarefa ultrapasse os limites
+    if hasattr(os, 'setpgid'):
+        os.setpgid(0, 0)
+
+    try:
+        resultado = ('OK', funcao(*args))
+    except MemoryError:
+        resultado = ('MEMORIA', None)
+    except SystemExit as e:
+        # A tarefa pediu para encerrar o sistema. Quem decide é o supervisor
+        resultado = ('EXIT', e.code)
+
+    # As mensagens impressas pela tarefa têm que aparecer antes das mensagens do supervisor
+    sys.stdout.flush()
+
+    try:
+        conexao.send(resultado)
+    except MemoryError:
+        conexao.send(('MEMORIA', None))
+
+    conexao.close()
+
+
+def encerrar_processo(processo, tempo_espera=0):
+    """
+    Encerra um processo supervisionado e os processos criados por ele
+        :param processo: Processo que será encerrado
+        :param tempo_espera: Tempo em segundos que aguarda o processo terminar normalmente antes de encerrá-lo
+    """
+    if tempo_espera > 0:
+        processo.join(tempo_espera)
+
+        if not processo.is_alive():
+            return
+
+    try:
+        os.killpg(processo.pid, signal.SIGKILL)
+    except (AttributeError, ProcessLookupError, PermissionError):
+        # Sem suporte a grupos de processos (Windows) ou o grupo ainda não foi criado
+        processo.kill()
+
+    processo.join()
+
+
+def executar_supervisionado(funcao, args, tempo_maximo=0, memoria_maxima=0):
+    """
+    Executa uma função num processo separado, que é encerrado se ultrapassar o tempo máximo ou a memória máxima
+        :param funcao: Função que será executada. Obs.: Tem que ser definida no nível do módulo, pois é enviada para o
+                       outro processo
+        :param args: Tupla com os argumentos da função
+        :param tempo_maximo: Tempo máximo de execução em segundos. Com o valor 0 o tempo não é limitado
+        :param memoria_maxima: Memória residente máxima em bytes, somando o processo e os processos criados por ele
+                               (ex.: extração paralela das páginas). Com o valor 0 a memória não é limitada. Obs.: Só é
+                               aplicada no Linux
+        :return: Se a função foi concluída dentro dos limites; retorno da função (None se não foi concluída); mensagem
+        com o motivo da interrupção (vazia se foi concluída)
+    """
+    if not memoria_monitorada():
+        memoria_maxima = 0
+
+    # Sem limites não compensa o custo de criar o processo
+    if tempo_maximo <= 0 and memoria_maxima <= 0:
+        return True, funcao(*args), ''
+
+    recebe, envia = multiprocessing.Pipe(duplex=False)
+    processo = multiprocessing.Process(target=executar_tarefa, args=(envia, funcao, args))
+    processo.start()
+
+    # O grupo também é criado aqui, pois a memória pode ser medida antes do processo supervisionado criá-lo
+    try:
+        os.setpgid(processo.pid, processo.pid)
+    except (AttributeError, OSError):
+        pass
+
+    # Somente o processo supervisionado envia. Assim, se ele terminar sem enviar nada, a leitura recebe EOFError
+    envia.close()
+
+    inicio = time.monotonic()
+    situacao, retorno = None, None
+    recebido = False
+
+    try:
+        while situacao is None:
+            espera = SUPERVISOR_INTERVALO_VERIFICACAO_MEMORIA if memoria_maxima > 0 else None
+
+            if tempo_maximo > 0:
+                restante = tempo_maximo - (time.monotonic() - inicio)
+
+                if restante <= 0:
+                    situacao = 'TEMPO'
+                    break
+
+                espera = restante if espera is None else min(espera, restante)
+
+            if recebe.poll(espera):
+                situacao, retorno = recebe.recv()
+                recebido = True
+            elif memoria_maxima > 0 and obter_memoria_grupo(processo.pid) > memoria_maxima:
+                situacao = 'MEMORIA'
+    except EOFError:
+        # Ex.: O processo foi encerrado pelo sistema operacional por falta de memória
+        situacao, retorno = 'FINALIZADO', None
+    finally:
+        recebe.close()
+
+    # Se enviou o resultado, o processo está terminando normalmente
+    encerrar_processo(processo, 5 if recebido else 0)
+
+    if situacao == 'EXIT':
+        exit(retorno)
+
+    if situacao == 'OK':
+        return True, retorno, ''
+    elif situacao == 'TEMPO':
+        return False, None, f"Ultrapassou o tempo máximo de {tempo_maximo} segundos"
+    elif situacao == 'MEMORIA':
+        return False, None, f"Ultrapassou a memória máxima de {memoria_maxima // (1024 * 1024)} MB"
+    else:
+        return False, None, f"O processo terminou inesperadamente (código de saída {processo.exitcode})"
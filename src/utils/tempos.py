@@ -0,0 +1,84 @@
+# ----------------------------------------------------------------
+# Funções para medir o tempo das etapas do pré-processamento e
+# resumir os tempos dos documentos de um lote em percentis
+# ----------------------------------------------------------------
+import math
+import time
+from contextlib import contextmanager
+
+# Etapas do pré-processamento, na ordem em que acontecem
+ETAPAS_PREPROC = ['extrair', 'validar', 'seccionar', 'hash', 'consultar', 'serializar', 'inserir', 'mover']
+
+# Percentis calculados para cada etapa no lote
+PERCENTIS = [50, 90, 99]
+
+
+def acumular_tempo(tempos, etapa, tempo):
+    """
+    Soma um tempo ao tempo já medido de uma etapa
+        :param tempos: Dicionário contendo como chave a etapa e como valor o tempo em segundos
+        :param etapa: Nome da etapa (ver ETAPAS_PREPROC)
+        :param tempo: Tempo em segundos
+    """
+    tempos[etapa] = tempos.get(etapa, 0.0) + tempo
+
+
+@contextmanager
+def medir_etapa(tempos, etapa):
+    """
+    Mede o tempo do bloco "with" e soma ao tempo da etapa. Obs.: A etapa pode ser medida várias vezes no mesmo
+    documento, ex.: as várias gravações no banco de dados
+        :param tempos: Dicionário contendo como chave a etapa e como valor o tempo em segundos
+        :param etapa: Nome da etapa (ver ETAPAS_PREPROC)
+    """
+    inicio = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        acumular_tempo(tempos, etapa, time.perf_counter() - inicio)
+
+
+def calcular_percentil(valores_ordenados, percentil):
+    """
+    Calcula um percentil pelo método do posto mais próximo (nearest-rank)
+        :param valores_ordenados: Lista de valores em ordem crescente
+        :param percentil: Percentil entre 0 e 100
+        :return: Valor do percentil ou None se a lista estiver vazia
+    """
+    if not valores_ordenados:
+        return None
+
+    posto = max(math.ceil(percentil / 100 * len(valores_ordenados)), 1)
+
+    return valores_ordenados[posto - 1]
+
+
+def resumir_tempos(tempos_etapas):
+    """
+    Resume os tempos dos documentos de cada etapa em percentis
+        :param tempos_etapas: Dicionário contendo como chave a etapa e como valor a lista dos tempos de cada documento
+        :return: Dicionário contendo como chave a etapa e como valor um dicionário com a quantidade de documentos, o
+        tempo total, os percentis e o tempo máximo, em segundos
+    """
+    resumo = {}
+
+    # Mantém a ordem das etapas do pré-processamento e inclui no final as etapas que não estão em ETAPAS_PREPROC
+    etapas = [e for e in ETAPAS_PREPROC if e in tempos_etapas]
+    etapas += [e for e in tempos_etapas if e not in ETAPAS_PREPROC]
+
+    for etapa in etapas:
+        valores = sorted(tempos_etapas[etapa])
+
+        if not valores:
+            continue
+
+        resumo_etapa = {'qtd_docs': len(valores), 'total': round(sum(valores), 6)}
+
+        for p in PERCENTIS:
+            resumo_etapa[f'p{p}'] = round(calcular_percentil(valores, p), 6)
+
+        resumo_etapa['max'] = round(valores[-1], 6)
+        resumo[etapa] = resumo_etapa
+
+    return resumo
@@ -0,0 +1,132 @@
+# ----------------------------------------------------------------
+# Testes do cache em disco do texto extraído dos documentos PDF
+#
+# Uso (na raiz do projeto): python -m unittest discover -s tests -t .
+# ----------------------------------------------------------------
+
+import os
+import json
+import zlib
+import tempfile
+import unittest
+import src.utils.cache_extracao as cache
+from src.ambiente.parametros_globais import VERSAO_EXTRATOR_PDF
+
+DOC = {1: 'Conteúdo da primeira página', 2: 'Conteúdo da segunda página'}
+RELATORIO = {'paginas_em_branco': 0}
+TAMANHO_ILIMITADO = 1024 * 1024 * 1024
+
+
+class TestCacheExtracao(unittest.TestCase):
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        self.caminho_cache = self.pasta.name
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def caminho_entrada(self, chave):
+        return os.path.join(self.caminho_cache, chave + cache.EXTENSAO_CACHE)
+
+    def gravar_entrada(self, chave, conteudo):
+        with open(self.caminho_entrada(chave), 'wb') as arq:
+            arq.write(conteudo)
+
+    def test_chave_nao_muda_quando_somente_a_data_do_arquivo_muda(self):
+        caminho_arquivo = os.path.join(self.caminho_cache, 'edital.pdf')
+
+        with open(caminho_arquivo, 'wb') as arq:
+            arq.write(b'%PDF-1.4 conteudo do edital')
+
+        chave = cache.gerar_chave_cache(caminho_arquivo)
+        os.utime(caminho_arquivo, (1000, 1000))
+
+        self.assertEqual(cache.gerar_chave_cache(caminho_arquivo), chave)
+        self.assertTrue(chave.endswith(f"_v{VERSAO_EXTRATOR_PDF}"))
+
+        with open(caminho_arquivo, 'ab') as arq:
+            arq.write(b' alterado')
+
+        self.assertNotEqual(cache.gerar_chave_cache(caminho_arquivo), chave)
+
+    def test_chave_com_hash_ja_calculado(self):
+        caminho_arquivo = os.path.join(self.caminho_cache, 'edital.pdf')
+
+        with open(caminho_arquivo, 'wb') as arq:
+            arq.write(b'%PDF-1.4 conteudo do edital')
+
+        chave = cache.gerar_chave_cache(caminho_arquivo)
+        hash_arquivo = chave[:-len(f"_v{VERSAO_EXTRATOR_PDF}")]
+
+        # Com o hash informado, o arquivo não é lido
+        os.remove(caminho_arquivo)
+        self.assertEqual(cache.gerar_chave_cache(caminho_arquivo, hash_arquivo), chave)
+
+    def test_chave_de_arquivo_inexistente(self):
+        self.assertIsNone(cache.gerar_chave_cache(os.path.join(self.caminho_cache, 'inexistente.pdf')))
+
+    def test_guardar_e_obter_extracao(self):
+        cache.guardar_extracao(self.caminho_cache, 'chave', DOC, True, RELATORIO, TAMANHO_ILIMITADO)
+
+        # As páginas voltam com as chaves inteiras
+        self.assertEqual(cache.obter_extracao(self.caminho_cache, 'chave'), (DOC, True, RELATORIO))
+        self.assertIsNone(cache.obter_extracao(self.caminho_cache, 'outra_chave'))
+
+    def test_liberar_espaco_remove_entradas_utilizadas_ha_mais_tempo(self):
+        for i, chave in enumerate(['a', 'b', 'c']):
+            cache.guardar_extracao(self.caminho_cache, chave, DOC, True, RELATORIO, TAMANHO_ILIMITADO)
+            os.utime(self.caminho_entrada(chave), (1000 * (i + 1), 1000 * (i + 1)))
+
+        # A entrada 'a' passa a ser a utilizada mais recentemente, então 'b' é a utilizada há mais tempo
+        self.assertIsNotNone(cache.obter_extracao(self.caminho_cache, 'a'))
+
+        # Todas as entradas têm o mesmo tamanho, então o cache comporta somente três delas
+        tamanho_entrada = os.path.getsize(self.caminho_entrada('a'))
+        cache.guardar_extracao(self.caminho_cache, 'd', DOC, True, RELATORIO, 3 * tamanho_entrada)
+
+        self.assertFalse(os.path.exists(self.caminho_entrada('b')))
+
+        for chave in ['a', 'c', 'd']:
+            self.assertIsNotNone(cache.obter_extracao(self.caminho_cache, chave))
+
+    def test_liberar_espaco_dentro_do_tamanho_maximo(self):
+        for chave in ['a', 'b']:
+            cache.guardar_extracao(self.caminho_cache, chave, DOC, True, RELATORIO, TAMANHO_ILIMITADO)
+
+        cache.liberar_espaco(self.caminho_cache, 2 * os.path.getsize(self.caminho_entrada('a')))
+
+        self.assertEqual(len(os.listdir(self.caminho_cache)), 2)
+
+    def test_entrada_truncada(self):
+        cache.guardar_extracao(self.caminho_cache, 'chave', DOC, True, RELATORIO, TAMANHO_ILIMITADO)
+
+        with open(self.caminho_entrada('chave'), 'rb') as arq:
+            conteudo = arq.read()
+
+        self.gravar_entrada('chave', conteudo[:len(conteudo) // 2])
+        self.assertIsNone(cache.obter_extracao(self.caminho_cache, 'chave'))
+
+        self.gravar_entrada('chave', b'')
+        self.assertIsNone(cache.obter_extracao(self.caminho_cache, 'chave'))
+
+    def test_entrada_corrompida(self):
+        entradas_corrompidas = [b'conteudo que nao foi comprimido',
+                                zlib.compress(b'\xff\xfe'),  # Não é UTF-8
+                                zlib.compress(b'{"paginas": [[1, '),  # JSON incompleto
+                                zlib.compress(json.dumps({'paginas': [[1, 'a']]}).encode('utf-8')),  # Sem chaves
+                                zlib.compress(json.dumps({'paginas': [1, 2], 'validado': True,
+                                                          'relatorio': {}}).encode('utf-8')),  # Páginas sem pares
+                                zlib.compress(json.dumps([1, 2]).encode('utf-8'))]  # Não é um dicionário
+
+        for conteudo in entradas_corrompidas:
+            with self.subTest(conteudo=conteudo):
+                self.gravar_entrada('chave', conteudo)
+                self.assertIsNone(cache.obter_extracao(self.caminho_cache, 'chave'))
+
+        # A entrada corrompida é substituída quando o arquivo é extraído e guardado novamente
+        cache.guardar_extracao(self.caminho_cache, 'chave', DOC, False, RELATORIO, TAMANHO_ILIMITADO)
+        self.assertEqual(cache.obter_extracao(self.caminho_cache, 'chave'), (DOC, False, RELATORIO))
+
+
+if __name__ == '__main__':
+    unittest.main()
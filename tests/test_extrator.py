@@ -0,0 +1,56 @@
+# ----------------------------------------------------------------
+# Testes da extração das seções do conteúdo dos editais
+#
+# Uso (na raiz do projeto): python -m unittest discover -s tests -t .
+# ----------------------------------------------------------------
+
+import unittest
+import src.modulos.preproc.extrator as ext
+
+# Conteúdo de um edital com dois itens (1.1. e 1.2.) grudados no texto que vem logo depois deles
+PAGINAS_TEXTO_GRUDADO = ['EDITAL 1. DO OBJETO A presente licitação tem por objeto a aquisição de materiais. 1.1.Os '
+                         'materiais serão entregues no almoxarifado. 1.2.O prazo de entrega é de trinta dias. 2. DO '
+                         'PAGAMENTO O pagamento será feito em até trinta dias.']
+
+# Descrições das subseções antes da reconstrução dos termos numa única passada: O k-ésimo texto grudado era inserido k
+# termos antes da sua seção, então o 'O' de '1.2.O' ia parar no final da descrição da seção 1.1.
+DESCRICOES_ANTERIORES = {'1.1.': 'Os materiais serão entregues no almoxarifado. O',
+                         '1.2.': 'prazo de entrega é de trinta dias.'}
+
+
+def extrair_descricoes(paginas):
+    """
+    Extrai as seções do conteúdo e devolve a descrição de cada uma
+        :param paginas: Lista com o texto de cada página do documento
+        :return: Dicionário com a descrição de cada seção extraída
+    """
+    termos = ext.separar_em_termos(dict(enumerate(paginas, 1)))
+    secoes_extraidas = ext.extrair_secoes(ext.encontrar_secoes_candidatas(termos))
+    ext.preencher_descricao(secoes_extraidas, termos)
+
+    # [0] = Seção; [3] = Descrição
+    return {secao[0]: secao[3] for secao in secoes_extraidas}
+
+
+class TestTextoGrudadoNaSecao(unittest.TestCase):
+    def test_texto_grudado_fica_logo_apos_a_secao(self):
+        termos = ext.separar_em_termos(dict(enumerate(PAGINAS_TEXTO_GRUDADO, 1)))
+        ext.encontrar_secoes_candidatas(termos)
+        textos = [t[0] for t in termos]
+
+        self.assertEqual(textos[textos.index('1.1.') + 1], 'Os')
+        self.assertEqual(textos[textos.index('1.2.') + 1], 'O')
+
+    def test_descricao_das_subsecoes(self):
+        descricoes = extrair_descricoes(PAGINAS_TEXTO_GRUDADO)
+
+        self.assertEqual(descricoes['1.1.'], 'Os materiais serão entregues no almoxarifado.')
+        self.assertEqual(descricoes['1.2.'], 'O prazo de entrega é de trinta dias.')
+
+        # As descrições gravadas pela versão anterior da extração são diferentes
+        for secao, descricao in DESCRICOES_ANTERIORES.items():
+            self.assertNotEqual(descricoes[secao], descricao)
+
+
+if __name__ == '__main__':
+    unittest.main()
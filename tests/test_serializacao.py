@@ -0,0 +1,138 @@
+# ----------------------------------------------------------------
+# Testes da serialização e desserialização dos objetos persistidos
+# no banco de dados e da representação das seções como spans
+#
+# Uso (na raiz do projeto): python -m unittest discover -s tests -t .
+# ----------------------------------------------------------------
+
+import json
+import unittest
+import src.modulos.preproc.extrator as ext
+import src.classes.persistencia.serializacao as ser
+from src.classes.documentos import Edital, Secao, Subsecao, materializar_span
+from src.classes.metadados import Documento
+
+# Conteúdo de um edital com uma subseção (1.2.) que começa numa página e termina na seguinte
+PAGINAS_EDITAL = ['EDITAL DE PREGÃO 1. DO OBJETO A presente licitação tem por objeto a aquisição de materiais. '
+                  '1.1. Os materiais serão entregues no almoxarifado. 1.2. O prazo de entrega é de trinta dias',
+                  'corridos a partir do pedido. 2. DAS CONDIÇÕES DE PARTICIPAÇÃO Poderão participar as empresas do '
+                  'ramo. 2.1. Não poderão participar empresas suspensas. 3. DO PAGAMENTO O pagamento será feito em '
+                  'até trinta dias.']
+
+
+def criar_edital(com_spans):
+    """
+    Extrai as seções do conteúdo de teste e cria o edital
+        :param com_spans: Se os títulos e as descrições são guardados como spans sobre o conteúdo do edital
+        :return: Edital com as seções agrupadas
+    """
+    paginas = list(PAGINAS_EDITAL)
+    termos = ext.separar_em_termos(dict(enumerate(paginas, 1)), com_spans)
+    secoes_extraidas = ext.extrair_secoes(ext.encontrar_secoes_candidatas(termos))
+    ext.preencher_descricao(secoes_extraidas, termos)
+    secoes = ext.agrupar_secoes(secoes_extraidas, paginas if com_spans else None)
+
+    return Edital('edital_teste', 'cod_arq', 'cod_lote', secoes, paginas)
+
+
+class TestConverterCodProcessamento(unittest.TestCase):
+    def test_formato_antigo_a_processar(self):
+        self.assertEqual(ser.converter_cod_processamento('a processar'), [])
+
+    def test_formato_antigo_com_codigos(self):
+        self.assertEqual(ser.converter_cod_processamento('ner, classificacao'), ['ner', 'classificacao'])
+        self.assertEqual(ser.converter_cod_processamento('ner'), ['ner'])
+
+    def test_formato_antigo_vazio(self):
+        self.assertEqual(ser.converter_cod_processamento(''), [])
+
+    def test_formato_atual_nao_e_alterado(self):
+        self.assertEqual(ser.converter_cod_processamento([]), [])
+        self.assertEqual(ser.converter_cod_processamento(['ner', 'classificacao']), ['ner', 'classificacao'])
+
+    def test_desserializar_documento_formato_antigo(self):
+        doc_js = ser.serializar(Documento('doc_teste'))
+        doc_js['Documento__cod_processamento'] = 'a processar'
+        self.assertEqual(ser.desserializar(doc_js).cod_processamento, [])
+
+        doc_js['Documento__cod_processamento'] = 'ner, classificacao'
+        self.assertEqual(ser.desserializar(doc_js).cod_processamento, ['ner', 'classificacao'])
+
+    def test_desserializar_documento_formato_atual(self):
+        doc = Documento('doc_teste')
+        doc.cod_processamento = ['ner']
+        self.assertEqual(ser.desserializar(ser.serializar(doc)).cod_processamento, ['ner'])
+
+
+class TestMaterializarSpan(unittest.TestCase):
+    def test_span_numa_pagina(self):
+        self.assertEqual(materializar_span(['abc def ghi'], [1, 4, 1, 7]), 'def')
+
+    def test_span_entre_duas_paginas(self):
+        self.assertEqual(materializar_span(['abc def', 'ghi jkl'], [1, 4, 2, 3]), 'def ghi')
+
+    def test_span_passando_por_paginas_inteiras(self):
+        self.assertEqual(materializar_span(['abc def', 'ghi', 'jkl mno'], [1, 4, 3, 3]), 'def ghi jkl')
+
+    def test_span_vazio(self):
+        self.assertEqual(materializar_span(['abc'], [1, 2, 1, 2]), '')
+
+
+class TestDefaultParserSpans(unittest.TestCase):
+    def test_secao_com_span(self):
+        paginas = ['1. DO OBJETO Aquisição de materiais']
+        secao = Secao('1. ')
+        secao.definir_span_titulo([1, 3, 1, 35], paginas)
+
+        secao_js = ser.default_parser_spans(secao)
+        self.assertEqual(secao_js['Secao__span_titulo'], [1, 3, 1, 35])
+        self.assertNotIn('Secao__titulo', secao_js)
+
+        # O parser padrão continua guardando o texto
+        self.assertEqual(ser.default_parser(secao)['Secao__titulo'], 'DO OBJETO Aquisição de materiais')
+
+    def test_subsecao_sem_span_guarda_texto(self):
+        subsecao = Subsecao('1.1. ')
+        subsecao.descricao = 'Os materiais serão entregues no almoxarifado.'
+
+        subsecao_js = ser.default_parser_spans(subsecao)
+        self.assertEqual(subsecao_js['Subsecao__descricao'], 'Os materiais serão entregues no almoxarifado.')
+        self.assertNotIn('Subsecao__span_descricao', subsecao_js)
+
+    def test_objeto_sem_spans_utiliza_parser_padrao(self):
+        doc = Documento('doc_teste')
+        self.assertEqual(ser.default_parser_spans(doc), ser.default_parser(doc))
+
+
+class TestSerializarComSpans(unittest.TestCase):
+    def test_serializar_guarda_spans(self):
+        edital_js = ser.serializar(criar_edital(True), com_spans=True)
+        secoes_js = edital_js['Edital__secoes']
+
+        self.assertTrue(all('Secao__span_titulo' in s for s in secoes_js))
+        self.assertTrue(all('Subsecao__span_descricao' in sub for s in secoes_js for sub in s['Secao__subsecoes']))
+
+        # A subseção 1.2. começa na página 1 e termina na página 2
+        self.assertEqual(secoes_js[0]['Secao__subsecoes'][1]['Subsecao__span_descricao'][0], 1)
+        self.assertEqual(secoes_js[0]['Secao__subsecoes'][1]['Subsecao__span_descricao'][2], 2)
+
+    def test_desserializar_spans(self):
+        edital = ser.desserializar(ser.serializar(criar_edital(True), com_spans=True))
+        subsecao = edital.secoes[0].subsecoes[1]
+
+        self.assertEqual(subsecao.span_descricao, [1, 148, 2, 28])
+        self.assertEqual(subsecao.descricao, 'O prazo de entrega é de trinta dias corridos a partir do pedido.')
+        self.assertEqual(edital.secoes[1].titulo, 'DAS CONDIÇÕES DE PARTICIPAÇÃO Poderão participar as empresas do '
+                                                  'ramo.')
+
+    def test_ida_e_volta_preserva_texto(self):
+        original = criar_edital(False)
+        edital = ser.desserializar(ser.serializar(criar_edital(True), com_spans=True))
+
+        # Serializado sem spans, o edital desserializado tem o mesmo texto do edital extraído sem spans
+        self.assertEqual(json.dumps(ser.serializar(edital), ensure_ascii=False),
+                         json.dumps(ser.serializar(original), ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+# ----------------------------------------------------------------
+# Testes do resumo dos tempos das etapas do pré-processamento em
+# percentis
+#
+# Uso (na raiz do projeto): python -m unittest discover -s tests -t .
+# ----------------------------------------------------------------
+
+import unittest
+import src.utils.tempos as tms
+import src.classes.persistencia.serializacao as ser
+from src.classes.metadados import Lote
+
+
+class TestCalcularPercentil(unittest.TestCase):
+    def test_lista_vazia(self):
+        self.assertIsNone(tms.calcular_percentil([], 50))
+
+    def test_uma_amostra(self):
+        for p in [0, 1, 50, 90, 99, 100]:
+            with self.subTest(percentil=p):
+                self.assertEqual(tms.calcular_percentil([0.5], p), 0.5)
+
+    def test_quantidade_par(self):
+        # Pelo posto mais próximo, a mediana de uma quantidade par é o menor dos dois valores centrais
+        self.assertEqual(tms.calcular_percentil([1, 2, 3, 4], 50), 2)
+        self.assertEqual(tms.calcular_percentil([1, 2, 3, 4], 75), 3)
+        self.assertEqual(tms.calcular_percentil([1, 2, 3, 4], 90), 4)
+        self.assertEqual(tms.calcular_percentil([1, 2, 3, 4], 100), 4)
+
+    def test_quantidade_impar(self):
+        self.assertEqual(tms.calcular_percentil([1, 2, 3, 4, 5], 50), 3)
+        self.assertEqual(tms.calcular_percentil([1, 2, 3, 4, 5], 0), 1)
+
+    def test_muitas_amostras(self):
+        valores = list(range(1, 101))
+        self.assertEqual([tms.calcular_percentil(valores, p) for p in tms.PERCENTIS], [50, 90, 99])
+
+
+class TestResumirTempos(unittest.TestCase):
+    def test_sem_tempos(self):
+        self.assertEqual(tms.resumir_tempos({}), {})
+
+    def test_etapa_sem_tempos_e_ignorada(self):
+        self.assertEqual(list(tms.resumir_tempos({'extrair': [], 'validar': [0.1]})), ['validar'])
+
+    def test_uma_amostra(self):
+        self.assertEqual(tms.resumir_tempos({'extrair': [0.25]}),
+                         {'extrair': {'qtd_docs': 1, 'total': 0.25, 'p50': 0.25, 'p90': 0.25, 'p99': 0.25,
+                                      'max': 0.25}})
+
+    def test_quantidade_par_fora_de_ordem(self):
+        self.assertEqual(tms.resumir_tempos({'extrair': [4.0, 1.0, 3.0, 2.0]}),
+                         {'extrair': {'qtd_docs': 4, 'total': 10.0, 'p50': 2.0, 'p90': 4.0, 'p99': 4.0,
+                                      'max': 4.0}})
+
+    def test_ordem_das_etapas(self):
+        resumo = tms.resumir_tempos({'etapa_nova': [1.0], 'mover': [1.0], 'extrair': [1.0]})
+        self.assertEqual(list(resumo), ['extrair', 'mover', 'etapa_nova'])
+
+
+class TestPercentisLote(unittest.TestCase):
+    def test_lote_sem_documentos(self):
+        self.assertEqual(Lote('lote_teste').obter_estatisticas()['percentis_etapas'], {})
+
+    def test_lote_com_documentos(self):
+        lote = Lote('lote_teste')
+
+        for tempo in [0.3, 0.1, 0.4, 0.2]:
+            lote.inserir_tempos({'extrair': tempo})
+
+        lote.inserir_tempos({'extrair': 0.5, 'mover': 0.01})
+
+        percentis = lote.obter_estatisticas()['percentis_etapas']
+        self.assertEqual(percentis['extrair']['qtd_docs'], 5)
+        self.assertEqual(percentis['extrair']['p50'], 0.3)
+        self.assertEqual(percentis['extrair']['max'], 0.5)
+        self.assertEqual(percentis['mover']['p99'], 0.01)
+
+    def test_lote_desserializado_mantem_os_tempos(self):
+        lote = Lote('lote_teste', 'EDITAL', 1.0, 2.0)
+
+        for tempo in [0.3, 0.1, 0.4, 0.2]:
+            lote.inserir_tempos({'extrair': tempo, 'mover': tempo / 10})
+
+        lote_js = ser.serializar(lote)
+        lote_desserializado = ser.desserializar(lote_js)
+
+        self.assertEqual(lote_desserializado.tempos_etapas, lote.tempos_etapas)
+        self.assertEqual(ser.serializar(lote_desserializado)['Lote__percentis_etapas'],
+                         lote_js['Lote__percentis_etapas'])
+
+    def test_lote_persistido_antes_da_medicao_dos_tempos(self):
+        lote_js = ser.serializar(Lote('lote_teste', 'EDITAL', 1.0, 2.0))
+        del lote_js['Lote__tempos_etapas']
+        del lote_js['Lote__percentis_etapas']
+
+        self.assertEqual(ser.desserializar(lote_js).tempos_etapas, {})
+
+
+if __name__ == '__main__':
+    unittest.main()